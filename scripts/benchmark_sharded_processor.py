@@ -0,0 +1,89 @@
+"""
+Benchmark ShardedStreamProcessor scaling against the single-process StreamProcessor
+
+Usage:
+    python scripts/benchmark_sharded_processor.py
+    python scripts/benchmark_sharded_processor.py --symbols 200 --cycles 500 --shards 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processing.sharded_processor import ShardedStreamProcessor
+from src.processing.stream_processor import StreamProcessor
+
+
+def make_batches(symbols: int, cycles: int, batch_cycles: int, seed: int = 0) -> List[List[Tuple]]:
+    """Synthetic random-walk ticks, grouped into batches of ``batch_cycles`` cycles"""
+    rng = np.random.default_rng(seed)
+    names = [f"SYM{i:04d}" for i in range(symbols)]
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (cycles, symbols)), axis=0))
+    start = datetime(2024, 1, 2, 9, 30)
+    
+    batches = []
+    for first in range(0, cycles, batch_cycles):
+        batch = []
+        for cycle in range(first, min(first + batch_cycles, cycles)):
+            timestamp = start + timedelta(seconds=cycle)
+            batch.extend((name, float(price), timestamp) for name, price in zip(names, prices[cycle]))
+        batches.append(batch)
+    return batches
+
+
+def run(processor, batches: List[List[Tuple]]) -> Tuple[float, list]:
+    """Return wall time and signals for feeding every batch"""
+    signals = []
+    start = time.perf_counter()
+    for batch in batches:
+        signals.extend(processor.process_batch(batch))
+    return time.perf_counter() - start, signals
+
+
+def signal_keys(signals) -> list:
+    return [(signal.symbol, signal.timestamp, signal.z_score) for signal in signals]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--cycles', type=int, default=300)
+    parser.add_argument('--batch-cycles', type=int, default=10, help="Cycles sent per process_batch call")
+    parser.add_argument('--window', type=int, default=100)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    
+    batches = make_batches(args.symbols, args.cycles, args.batch_cycles)
+    ticks = sum(len(batch) for batch in batches)
+    
+    # Fresh processors per repeat so every run starts from empty buffers
+    timings = [run(StreamProcessor(window_size=args.window), batches) for _ in range(args.repeats)]
+    single_time = min(elapsed for elapsed, _ in timings)
+    expected = signal_keys(timings[0][1])
+    
+    print(f"Symbols: {args.symbols} | Ticks: {ticks:,} | Batches: {len(batches)} | CPUs: {os.cpu_count()}")
+    print(f"single process  {single_time * 1000:9.1f} ms | {ticks / single_time:12,.0f} ticks/s")
+    
+    for shards in args.shards:
+        best = float('inf')
+        matches = True
+        for _ in range(args.repeats):
+            with ShardedStreamProcessor(num_shards=shards, window_size=args.window) as sharded:
+                elapsed, signals = run(sharded, batches)
+            best = min(best, elapsed)
+            matches = matches and signal_keys(signals) == expected
+        
+        print(f"{shards:2d} shard(s)     {best * 1000:9.1f} ms | {ticks / best:12,.0f} ticks/s "
+              f"| speedup {single_time / best:.2f}x | signals match: {matches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
 """Alerts package"""
 from .alert_engine import AlertEngine, AlertSeverity
+from .dispatcher import AlertDispatcher, DeliveryResult
+from .rate_limiter import AlertRateLimiter, SlidingWindowCounter
+from .alert_history import AlertHistory
 from .notifiers.slack_notifier import SlackNotifier
 from .notifiers.email_notifier import EmailNotifier
 
 __all__ = [
     'AlertEngine',
     'AlertSeverity',
+    'AlertDispatcher',
+    'DeliveryResult',
+    'AlertRateLimiter',
+    'SlidingWindowCounter',
+    'AlertHistory',
     'SlackNotifier',
     'EmailNotifier'
 ]
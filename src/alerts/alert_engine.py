@@ -1,11 +1,14 @@
 """
 Alert engine for market signals
 """
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from enum import Enum
 from datetime import datetime
 import uuid
 import logging
+from .dispatcher import AlertDispatcher
+from .rate_limiter import AlertRateLimiter, DEFAULT_RATE_LIMITING
+from .alert_history import AlertHistory
 
 logger = logging.getLogger(__name__)
 
@@ -19,13 +22,32 @@ class AlertSeverity(Enum):
 
 
 class AlertEngine:
-    """Alert generation and dispatch system"""
+    """
+    Alert generation and dispatch system
     
-    def __init__(self, config: Dict = None):
+    Alerts are handed to an AlertDispatcher, so ``evaluate_alerts`` returns
+    without waiting for notifiers; delivery outcomes are reported through
+    ``dispatcher.subscribe`` and ``dispatcher.get_metrics``.
+    
+    Signals pass the rate_limiting rules (hourly limits per scenario,
+    severity and channel, a daily limit per scenario, per-scenario
+    cooldown) before an alert is created.
+    Suppressed alerts are counted and sent as one summary alert per
+    ``summary_interval_minutes``.
+    """
+    
+    def __init__(self, config: Dict = None, clock: Callable[[], datetime] = None, dispatcher: AlertDispatcher = None):
         self.config = config or {}
+        self.clock = clock or datetime.now
         self.alert_rules = self._load_alert_rules()
         self.notifiers = {}
-        self.alert_history = []
+        history_config = self.config.get('history', {})
+        self.alert_history = AlertHistory(
+            max_alerts=history_config.get('max_alerts', 10000),
+            spill_path=history_config.get('spill_path')
+        )
+        self.dispatcher = dispatcher or AlertDispatcher(self.config.get('dispatch', {}))
+        self.rate_limiter = AlertRateLimiter(self.alert_rules['rate_limiting'], clock=self.clock)
         
     def _load_alert_rules(self) -> Dict:
         """Load alert rules from config"""
@@ -34,11 +56,12 @@ class AlertEngine:
                 'info': 0.0,
                 'warning': 0.4,
                 'critical': 0.6,
-                'emergency': 0.8
+                'emergency': 0.8,
+                **self.config.get('severity_thresholds', {})
             },
             'rate_limiting': {
-                'max_alerts_per_hour': 10,
-                'cooldown_minutes': 15
+                **DEFAULT_RATE_LIMITING,
+                **self.config.get('rate_limiting', {})
             }
         }
     
@@ -48,9 +71,12 @@ class AlertEngine:
         
         Args:
             name: Notifier name (e.g., 'slack', 'email')
-            notifier: Notifier instance
+            notifier: Notifier instance; its worker count and timeout come
+                from the channel's config section (workers, timeout_seconds,
+                max_pending)
         """
         self.notifiers[name] = notifier
+        self.dispatcher.register_channel(name, notifier, self.config.get('channels', {}).get(name))
         logger.info(f"Registered notifier: {name}")
     
     def evaluate_alerts(self, signals: List) -> List[Dict]:
@@ -61,7 +87,7 @@ class AlertEngine:
             signals: List of Signal objects
             
         Returns:
-            List of generated alerts
+            List of generated alerts (suppressed ones excluded)
         """
         alerts = []
         
@@ -69,12 +95,20 @@ class AlertEngine:
             severity = self._calculate_severity(signal)
             
             if severity.value >= AlertSeverity.WARNING.value:
+                if not self.rate_limiter.allow(signal.scenario, severity.name):
+                    logger.debug(f"Alert for {signal.scenario} ({severity.name}) suppressed by rate limiting")
+                    continue
+                
                 alert = self._create_alert(signal, severity)
                 alerts.append(alert)
                 
-                # Dispatch alert
+                # Queue for delivery
                 self._dispatch_alert(alert)
         
+        summary = self.rate_limiter.pop_summary()
+        if summary is not None:
+            self._dispatch_summary(summary)
+        
         logger.info(f"Generated {len(alerts)} alerts from {len(signals)} signals")
         return alerts
     
@@ -121,7 +155,7 @@ class AlertEngine:
         
         alert = {
             'id': alert_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self.clock().isoformat(),
             'severity': severity.name,
             'scenario': signal.scenario,
             'confidence': signal.confidence,
@@ -168,7 +202,7 @@ class AlertEngine:
     
     def _dispatch_alert(self, alert: Dict):
         """
-        Dispatch alert to configured channels
+        Queue alert for delivery on configured channels
         
         Args:
             alert: Alert dictionary
@@ -185,26 +219,86 @@ class AlertEngine:
         elif severity == AlertSeverity.WARNING:
             channels_to_use = ['slack']
         
-        # Send to each channel
-        for channel in channels_to_use:
-            if channel in self.notifiers:
-                try:
-                    self.notifiers[channel].send(alert)
-                    logger.info(f"Alert {alert['id']} sent to {channel}")
-                except Exception as e:
-                    logger.error(f"Failed to send alert to {channel}: {e}")
+        channels_to_use = [channel for channel in channels_to_use if channel in self.notifiers]
+        self.dispatcher.dispatch(alert, self.rate_limiter.allow_channels(alert, channels_to_use))
+    
+    def _dispatch_summary(self, summary: Dict):
+        """
+        Send the suppressed-alert summary (not rate limited)
+        
+        Args:
+            summary: Summary from AlertRateLimiter.pop_summary
+        """
+        triggers = [
+            f"{scenario.replace('_', ' ').title()}: {count}건"
+            for scenario, count in sorted(summary['by_scenario'].items(), key=lambda item: -item[1])
+        ]
+        reasons = ', '.join(f"{reason} {count}" for reason, count in summary['by_reason'].items())
+        
+        alert = {
+            'id': str(uuid.uuid4()),
+            'timestamp': self.clock().isoformat(),
+            'severity': AlertSeverity.INFO.name,
+            'scenario': 'suppressed_alerts',
+            'confidence': 1.0,
+            'message': (
+                f"📊 **Suppressed Alerts**\n\n"
+                f"{summary['period_start']:%Y-%m-%d %H:%M} ~ {summary['period_end']:%Y-%m-%d %H:%M}: "
+                f"{summary['suppressed']}건 억제 ({reasons})\n\n" + ''.join(f"• {trigger}\n" for trigger in triggers)
+            ),
+            'triggers': triggers,
+            'recommendation': "억제된 알림은 대시보드에서 확인하세요.",
+            'metadata': {'rate_limiting': summary}
+        }
+        
+        logger.info(f"Rate limiting suppressed {summary['suppressed']} alerts/deliveries: {summary['by_reason']}")
+        channels = [channel for channel in self.alert_rules['rate_limiting']['summary_channels'] if channel in self.notifiers]
+        self.dispatcher.dispatch(alert, channels)
     
-    def get_recent_alerts(self, limit: int = 10) -> List[Dict]:
+    def shutdown(self, wait: bool = True):
+        """
+        Stop alert delivery and close the history spill file
+        
+        Args:
+            wait: Deliver queued alerts first
+        """
+        self.dispatcher.shutdown(wait=wait)
+        self.alert_history.close()
+    
+    def get_recent_alerts(
+        self,
+        limit: int = 10,
+        scenario: str = None,
+        severity: str = None,
+        since: datetime = None,
+        until: datetime = None
+    ) -> List[Dict]:
         """
         Get recent alerts
         
         Args:
             limit: Maximum number of alerts to return
+            scenario: Only alerts of this scenario
+            severity: Only alerts of this severity (e.g., 'CRITICAL')
+            since: Only alerts at or after this time
+            until: Only alerts at or before this time
+            
+        Returns:
+            List of recent alerts, oldest first
+        """
+        return self.alert_history.query(limit, scenario=scenario, severity=severity, since=since, until=until)
+    
+    def get_alert(self, alert_id: str) -> Optional[Dict]:
+        """
+        Get an alert from history by id
+        
+        Args:
+            alert_id: Alert id
             
         Returns:
-            List of recent alerts
+            Alert dictionary or None if not in memory
         """
-        return self.alert_history[-limit:]
+        return self.alert_history.get(alert_id)
     
     def clear_history(self):
         """Clear alert history"""
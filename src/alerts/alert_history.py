@@ -0,0 +1,229 @@
+"""
+Bounded alert history with scenario and severity indexes
+"""
+from typing import Dict, Iterator, List, Optional
+from collections import deque
+from datetime import datetime
+import json
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AlertHistory:
+    """
+    Ring buffer of recent alerts with secondary indexes
+    
+    Alerts are numbered in arrival order and kept in a fixed array of
+    ``max_alerts`` slots; the newest overwrites the oldest. Indexes by
+    scenario, by severity and by (scenario, severity) hold the sequence
+    numbers of their alerts in arrival order, so eviction pops the front of
+    three deques and "last N alerts of scenario X at severity Y" walks N
+    entries from the back. An alert id index maps ids of kept alerts to
+    their sequence numbers. Memory is capped by ``max_alerts``.
+    
+    With ``spill_path`` every evicted alert is appended to a local JSON lines
+    file, so the full history stays available for offline analysis.
+    """
+    
+    def __init__(self, max_alerts: int = 10000, spill_path: str = None):
+        """
+        Args:
+            max_alerts: Alerts kept in memory
+            spill_path: JSON lines file receiving evicted alerts (default: none)
+        """
+        if max_alerts < 1:
+            raise ValueError("max_alerts must be positive")
+        
+        self.max_alerts = max_alerts
+        self.spill_path = spill_path
+        self._slots: List[Optional[tuple]] = [None] * max_alerts  # (alert, timestamp)
+        self._next = 0     # sequence number of the next alert
+        self._oldest = 0   # sequence number of the oldest kept alert
+        self._by_scenario: Dict[str, deque] = {}
+        self._by_severity: Dict[str, deque] = {}
+        self._by_key: Dict[tuple, deque] = {}
+        self._by_id: Dict[str, int] = {}
+        self._spill = None
+        self.spilled = 0
+        self._lock = threading.Lock()
+        
+        if spill_path:
+            directory = os.path.dirname(spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+    
+    def append(self, alert: Dict):
+        """
+        Add an alert, evicting the oldest when full
+        
+        Args:
+            alert: Alert dictionary ('scenario', 'severity', 'timestamp')
+        """
+        timestamp = self._parse_timestamp(alert.get('timestamp'))
+        scenario = alert['scenario']
+        severity = alert['severity']
+        
+        with self._lock:
+            if self._next - self._oldest == self.max_alerts:
+                self._evict()
+            
+            sequence = self._next
+            self._slots[sequence % self.max_alerts] = (alert, timestamp)
+            self._by_scenario.setdefault(scenario, deque()).append(sequence)
+            self._by_severity.setdefault(severity, deque()).append(sequence)
+            self._by_key.setdefault((scenario, severity), deque()).append(sequence)
+            if alert.get('id') is not None:
+                self._by_id[alert['id']] = sequence
+            self._next += 1
+    
+    def get(self, alert_id: str) -> Optional[Dict]:
+        """
+        Look up a kept alert by id
+        
+        Args:
+            alert_id: Alert id
+            
+        Returns:
+            Alert dictionary or None if unknown or evicted
+        """
+        with self._lock:
+            sequence = self._by_id.get(alert_id)
+            return self._slots[sequence % self.max_alerts][0] if sequence is not None else None
+    
+    def query(
+        self,
+        limit: int = 10,
+        scenario: str = None,
+        severity: str = None,
+        since: datetime = None,
+        until: datetime = None
+    ) -> List[Dict]:
+        """
+        Most recent alerts matching the filters
+        
+        Args:
+            limit: Maximum number of alerts (None: all matching)
+            scenario: Scenario filter
+            severity: Severity filter (AlertSeverity name, any case)
+            since: Earliest alert timestamp (inclusive)
+            until: Latest alert timestamp (inclusive)
+            
+        Returns:
+            Matching alerts, oldest first
+        """
+        severity = severity.upper() if severity else None
+        
+        with self._lock:
+            if scenario is not None and severity is not None:
+                sequences = self._by_key.get((scenario, severity), ())
+            elif scenario is not None:
+                sequences = self._by_scenario.get(scenario, ())
+            elif severity is not None:
+                sequences = self._by_severity.get(severity, ())
+            else:
+                sequences = range(self._oldest, self._next)
+            
+            matches = []
+            for sequence in reversed(sequences):
+                if limit is not None and len(matches) >= limit:
+                    break
+                
+                alert, timestamp = self._slots[sequence % self.max_alerts]
+                if until is not None and timestamp is not None and timestamp > until:
+                    continue
+                # Arrival order is time order, so nothing older can match
+                if since is not None and timestamp is not None and timestamp < since:
+                    break
+                matches.append(alert)
+        
+        matches.reverse()
+        return matches
+    
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """
+        Alerts in memory per scenario and per severity
+        
+        Returns:
+            {'scenario': {...}, 'severity': {...}}
+        """
+        with self._lock:
+            return {
+                'scenario': {key: len(sequences) for key, sequences in self._by_scenario.items()},
+                'severity': {key: len(sequences) for key, sequences in self._by_severity.items()}
+            }
+    
+    def clear(self):
+        """Drop all alerts in memory (spilled alerts are kept on disk)"""
+        with self._lock:
+            self._slots = [None] * self.max_alerts
+            self._oldest = self._next
+            self._by_scenario.clear()
+            self._by_severity.clear()
+            self._by_key.clear()
+            self._by_id.clear()
+    
+    def close(self):
+        """Close the spill file"""
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+    
+    def __len__(self) -> int:
+        return self._next - self._oldest
+    
+    def __iter__(self) -> Iterator[Dict]:
+        with self._lock:
+            alerts = [self._slots[sequence % self.max_alerts][0] for sequence in range(self._oldest, self._next)]
+        return iter(alerts)
+    
+    def _evict(self):
+        """Remove the oldest alert from the buffer and indexes"""
+        sequence = self._oldest
+        slot = sequence % self.max_alerts
+        alert, _ = self._slots[slot]
+        self._slots[slot] = None
+        self._oldest += 1
+        
+        scenario = alert['scenario']
+        severity = alert['severity']
+        for index, key in (
+            (self._by_scenario, scenario),
+            (self._by_severity, severity),
+            (self._by_key, (scenario, severity))
+        ):
+            sequences = index[key]
+            sequences.popleft()
+            if not sequences:
+                del index[key]
+        
+        # A later alert may have reused the id
+        if self._by_id.get(alert.get('id')) == sequence:
+            del self._by_id[alert['id']]
+        
+        if self.spill_path:
+            self._write_spill(alert)
+    
+    def _write_spill(self, alert: Dict):
+        """Append an evicted alert to the spill file"""
+        try:
+            if self._spill is None:
+                self._spill = open(self.spill_path, 'a', encoding='utf-8')
+            self._spill.write(json.dumps(alert, ensure_ascii=False, default=str) + '\n')
+            self._spill.flush()
+            self.spilled += 1
+        except Exception as e:
+            logger.error(f"Failed to spill alert {alert.get('id')} to {self.spill_path}: {e}")
+    
+    @staticmethod
+    def _parse_timestamp(value) -> Optional[datetime]:
+        """Alert timestamp as datetime (alerts carry ISO strings)"""
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
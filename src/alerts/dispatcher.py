@@ -0,0 +1,274 @@
+"""
+Non-blocking alert delivery over per-channel worker pools
+"""
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError, wait as wait_all
+from dataclasses import dataclass
+import inspect
+import threading
+import time
+import logging
+from ..metrics import StageMetrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL_CONFIG = {
+    'workers': 2,           # concurrent deliveries on the channel
+    'timeout_seconds': 10,  # per-delivery deadline, also passed to the notifier
+    'max_pending': 100      # queued + running deliveries before new ones are dropped
+}
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of one alert delivery to one channel"""
+    alert_id: str
+    channel: str
+    success: bool
+    latency_ms: float
+    error: Optional[str] = None
+
+
+class _Channel:
+    """Notifier with its own worker pool and counters"""
+    
+    def __init__(self, name: str, notifier, workers: int, timeout: float, max_pending: int):
+        self.name = name
+        self.notifier = notifier
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.pending = 0
+        self.timeouts = 0
+        self.metrics = StageMetrics()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"alerts-{name}")
+        # Notifier calls run here so a worker can give up on them at the deadline;
+        # the spare threads keep serving while abandoned calls still hang
+        self.calls = ThreadPoolExecutor(max_workers=2 * workers, thread_name_prefix=f"alerts-{name}-send")
+        
+        # Notifiers without a timeout parameter rely on their own
+        try:
+            self.accepts_timeout = 'timeout' in inspect.signature(notifier.send).parameters
+        except (TypeError, ValueError):
+            self.accepts_timeout = False
+
+
+class AlertDispatcher:
+    """
+    Deliver alerts to notification channels without blocking the caller
+    
+    Every channel gets a bounded thread pool, so a slow mail server only
+    occupies the email workers while Slack deliveries and signal evaluation
+    carry on. ``dispatch`` submits one delivery per channel and returns at
+    once; deliveries beyond a channel's ``max_pending`` are dropped and
+    reported as failed. Each notifier is called with the channel's timeout
+    and returns whether the delivery succeeded. The timeout is also a
+    deadline counted from the start of the notifier call: a delivery still
+    running when it expires is reported as failed and frees its worker,
+    even if the notifier ignores the timeout. Abandoned calls keep their
+    sender thread until they return, so each channel has twice as many
+    sender threads as workers; a delivery that cannot get one within the
+    timeout fails too. Alerts dispatched after ``shutdown`` are not queued.
+    
+    Outcomes are passed to subscribers as DeliveryResult (from the worker
+    threads) and counted per channel in ``get_metrics``.
+    """
+    
+    def __init__(self, config: Dict = None):
+        """
+        Args:
+            config: Defaults for every channel (workers, timeout_seconds,
+                max_pending)
+        """
+        self.config = {**DEFAULT_CHANNEL_CONFIG, **(config or {})}
+        self.channels: Dict[str, _Channel] = {}
+        self.subscribers: List[Callable[[DeliveryResult], None]] = []
+        self._futures = set()
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    def register_channel(self, name: str, notifier, config: Dict = None):
+        """
+        Register a notifier as a delivery channel
+        
+        Args:
+            name: Channel name (e.g., 'slack', 'email')
+            notifier: Object with send(alert[, timeout]) -> bool
+            config: Channel overrides of workers, timeout_seconds, max_pending
+        """
+        options = {**self.config, **{key: value for key, value in (config or {}).items() if key in self.config}}
+        
+        previous = self.channels.get(name)
+        self.channels[name] = _Channel(
+            name,
+            notifier,
+            workers=max(int(options['workers']), 1),
+            timeout=float(options['timeout_seconds']),
+            max_pending=max(int(options['max_pending']), 1)
+        )
+        if previous is not None:
+            previous.pool.shutdown(wait=False)
+            previous.calls.shutdown(wait=False)
+    
+    def subscribe(self, callback: Callable[[DeliveryResult], None]):
+        """
+        Register a consumer for delivery results
+        
+        Args:
+            callback: Called with each DeliveryResult (on a worker thread)
+        """
+        self.subscribers.append(callback)
+    
+    def dispatch(self, alert: Dict, channels: List[str]) -> List[str]:
+        """
+        Queue an alert for delivery
+        
+        Args:
+            alert: Alert dictionary
+            channels: Channel names (unregistered ones are skipped)
+            
+        Returns:
+            Channels the alert was queued on (none after shutdown)
+        """
+        queued = []
+        for name in channels:
+            channel = self.channels.get(name)
+            if channel is None:
+                continue
+            
+            with self._lock:
+                if self._closed:
+                    logger.warning(f"Alert dispatcher is shut down, dropped alert {alert['id']}")
+                    return queued
+                full = channel.pending >= channel.max_pending
+                if not full:
+                    channel.pending += 1
+            
+            if full:
+                channel.metrics.dropped += 1
+                logger.warning(f"Channel '{name}' has {channel.pending} pending deliveries, dropped alert {alert['id']}")
+                self._emit(DeliveryResult(alert['id'], name, False, 0.0, 'queue full'))
+                continue
+            
+            try:
+                future = channel.pool.submit(self._deliver, channel, alert)
+            except RuntimeError:
+                # Pool shut down after the check above
+                with self._lock:
+                    channel.pending -= 1
+                logger.warning(f"Channel '{name}' is shut down, dropped alert {alert['id']}")
+                continue
+            with self._lock:
+                self._futures.add(future)
+            future.add_done_callback(self._discard)
+            queued.append(name)
+        
+        return queued
+    
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait for queued deliveries
+        
+        Args:
+            timeout: Maximum seconds to wait (default: no limit)
+            
+        Returns:
+            True if nothing is pending any more
+        """
+        with self._lock:
+            futures = list(self._futures)
+        _, not_done = wait_all(futures, timeout=timeout)
+        return not not_done
+    
+    def shutdown(self, wait: bool = True):
+        """
+        Stop all channel pools
+        
+        Args:
+            wait: Finish queued deliveries first
+        """
+        with self._lock:
+            self._closed = True
+        for channel in self.channels.values():
+            channel.pool.shutdown(wait=wait)
+            # Calls past their deadline are abandoned rather than joined
+            channel.calls.shutdown(wait=False)
+        logger.info("Alert dispatcher stopped")
+    
+    def get_metrics(self) -> Dict[str, Dict]:
+        """
+        Get per-channel delivery counters and latency
+        
+        Returns:
+            Channel name -> metrics ('errors' counts failed deliveries,
+            'timeouts' those of them that missed the deadline)
+        """
+        metrics = {}
+        for name, channel in self.channels.items():
+            summary = channel.metrics.summary()
+            summary['pending'] = channel.pending
+            summary['timeouts'] = channel.timeouts
+            summary['workers'] = channel.workers
+            summary['timeout_seconds'] = channel.timeout
+            metrics[name] = summary
+        return metrics
+    
+    def _deliver(self, channel: _Channel, alert: Dict):
+        """Send one alert on a channel worker and report the outcome"""
+        start = time.perf_counter()
+        error = None
+        started = threading.Event()
+        
+        def send():
+            started.set()
+            if channel.accepts_timeout:
+                return channel.notifier.send(alert, timeout=channel.timeout)
+            return channel.notifier.send(alert)
+        
+        try:
+            call = channel.calls.submit(send)
+            try:
+                # The deadline runs from the start of the call, not from its submission
+                if not started.wait(channel.timeout):
+                    raise FutureTimeoutError()
+                sent = call.result(timeout=channel.timeout)
+            except FutureTimeoutError:
+                call.cancel()
+                with self._lock:
+                    channel.timeouts += 1
+                if not started.is_set():
+                    raise TimeoutError(f"no free sender within {channel.timeout:g}s")
+                raise TimeoutError(f"no response within {channel.timeout:g}s")
+            # Notifiers returning nothing report failures by raising
+            success = sent is None or bool(sent)
+            if not success:
+                error = 'notifier reported failure'
+        except Exception as e:
+            success = False
+            error = str(e)
+        finally:
+            with self._lock:
+                channel.pending -= 1
+        
+        latency = time.perf_counter() - start
+        channel.metrics.record(latency, error=not success)
+        
+        if success:
+            logger.info(f"Alert {alert['id']} sent to {channel.name}")
+        else:
+            logger.error(f"Failed to send alert {alert['id']} to {channel.name}: {error}")
+        
+        self._emit(DeliveryResult(alert['id'], channel.name, success, latency * 1000, error))
+    
+    def _discard(self, future: Future):
+        """Forget a finished delivery"""
+        with self._lock:
+            self._futures.discard(future)
+    
+    def _emit(self, result: DeliveryResult):
+        """Deliver a result to subscribers"""
+        for callback in self.subscribers:
+            try:
+                callback(result)
+            except Exception as e:
+                logger.error(f"Delivery subscriber failed for {result.channel}: {e}")
@@ -21,7 +21,8 @@ class EmailNotifier:
         password: str,
         from_address: str,
         to_addresses: List[str],
-        use_tls: bool = True
+        use_tls: bool = True,
+        timeout: float = 30
     ):
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
@@ -30,23 +31,30 @@ class EmailNotifier:
         self.from_address = from_address
         self.to_addresses = to_addresses
         self.use_tls = use_tls
+        self.timeout = timeout
     
-    def send(self, alert: Dict):
+    def send(self, alert: Dict, timeout: float = None) -> bool:
         """
         Send alert via email
         
         Args:
             alert: Alert dictionary
+            timeout: Socket timeout in seconds for each SMTP operation
+                (default: self.timeout)
+            
+        Returns:
+            True if the message was handed to the SMTP server
         """
         try:
             msg = self._create_email(alert)
+            timeout = timeout or self.timeout
             
             # Connect to SMTP server
             if self.use_tls:
-                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=timeout)
                 server.starttls()
             else:
-                server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
+                server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=timeout)
             
             server.login(self.username, self.password)
             
@@ -55,9 +63,11 @@ class EmailNotifier:
             server.quit()
             
             logger.info(f"Alert sent via email: {alert['id']}")
+            return True
         
         except Exception as e:
             logger.error(f"Failed to send email notification: {e}")
+            return False
     
     def _create_email(self, alert: Dict) -> MIMEMultipart:
         """
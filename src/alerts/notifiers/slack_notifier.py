@@ -11,17 +11,22 @@ logger = logging.getLogger(__name__)
 class SlackNotifier:
     """Send alerts to Slack"""
     
-    def __init__(self, webhook_url: str, channel: str = None, username: str = "Money Flow Bot"):
+    def __init__(self, webhook_url: str, channel: str = None, username: str = "Money Flow Bot", timeout: float = 10):
         self.webhook_url = webhook_url
         self.channel = channel
         self.username = username
+        self.timeout = timeout
     
-    def send(self, alert: Dict):
+    def send(self, alert: Dict, timeout: float = None) -> bool:
         """
         Send alert to Slack
         
         Args:
             alert: Alert dictionary
+            timeout: Request timeout in seconds (default: self.timeout)
+            
+        Returns:
+            True if Slack accepted the message
         """
         try:
             payload = self._format_slack_message(alert)
@@ -29,16 +34,19 @@ class SlackNotifier:
             response = requests.post(
                 self.webhook_url,
                 json=payload,
-                timeout=10
+                timeout=timeout or self.timeout
             )
             
             if response.status_code != 200:
                 logger.error(f"Slack API error: {response.status_code} - {response.text}")
-            else:
-                logger.info(f"Alert sent to Slack: {alert['id']}")
+                return False
+            
+            logger.info(f"Alert sent to Slack: {alert['id']}")
+            return True
         
         except Exception as e:
             logger.error(f"Failed to send Slack notification: {e}")
+            return False
     
     def _format_slack_message(self, alert: Dict) -> Dict:
         """
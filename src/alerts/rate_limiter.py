@@ -0,0 +1,281 @@
+"""
+Alert rate limiting with bucketed sliding windows and per-scenario cooldown
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import Counter
+from datetime import datetime
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_RANK = {'INFO': 1, 'WARNING': 2, 'CRITICAL': 3, 'EMERGENCY': 4}
+
+DEFAULT_RATE_LIMITING = {
+    'enabled': True,
+    'max_alerts_per_hour': 10,     # per scenario
+    'max_alerts_per_day': None,    # per scenario (None: unlimited)
+    'cooldown_minutes': 15,        # repeats of a scenario at the same or lower severity
+    'severity_limits': {},         # severity -> alerts per hour across scenarios
+    'channel_limits': {},          # channel -> deliveries per hour
+    'exempt_severities': ['EMERGENCY'],
+    'window_buckets': 60,          # buckets per hour window
+    'summary_interval_minutes': 60,
+    'summary_channels': ['slack']
+}
+
+
+class SlidingWindowCounter:
+    """
+    Event count over a trailing window kept in fixed-size buckets
+    
+    The window is split into ``buckets`` slots of equal width in a circular
+    array with a running total. Advancing the clock zeroes only the slots
+    that expired, at most ``buckets`` of them, so adding and counting are
+    constant time regardless of the event rate. Counts are accurate to one
+    bucket width.
+    """
+    
+    __slots__ = ('width', 'counts', 'head', 'total')
+    
+    def __init__(self, window_seconds: float, buckets: int = 60):
+        self.width = window_seconds / buckets
+        self.counts = [0] * buckets
+        self.head: Optional[int] = None  # index of the newest bucket
+        self.total = 0
+    
+    def count(self, now: float) -> int:
+        """Events in the window ending at ``now`` (epoch seconds)"""
+        self._advance(now)
+        return self.total
+    
+    def add(self, now: float, amount: int = 1):
+        """Record events at ``now`` (epoch seconds)"""
+        self._advance(now)
+        self.counts[self.head % len(self.counts)] += amount
+        self.total += amount
+    
+    def _advance(self, now: float):
+        """Expire buckets that left the window"""
+        bucket = int(now // self.width)
+        if self.head is None:
+            self.head = bucket
+            return
+        
+        # Out-of-order times count towards the newest bucket
+        if bucket <= self.head:
+            return
+        
+        size = len(self.counts)
+        if bucket - self.head >= size:
+            self.counts = [0] * size
+            self.total = 0
+        else:
+            for index in range(self.head + 1, bucket + 1):
+                slot = index % size
+                self.total -= self.counts[slot]
+                self.counts[slot] = 0
+        self.head = bucket
+
+
+class AlertRateLimiter:
+    """
+    Enforce alerts-per-hour limits and per-scenario cooldown
+    
+    An alert is suppressed when its scenario already alerted within the
+    cooldown at the same or a higher severity (escalations pass), when its
+    scenario reached the hourly or daily limit, or when its severity
+    reached the hourly limit. Each notification
+    channel has its own hourly limit applied per delivery. Severities in
+    ``exempt_severities`` skip the alert checks but still count.
+    
+    Suppressed alerts and deliveries are counted by scenario, severity,
+    channel and reason. ``pop_summary`` returns and resets these counts
+    once per ``summary_interval_minutes``.
+    """
+    
+    HOUR = 3600.0
+    DAY = 86400.0
+    
+    def __init__(self, rules: Dict = None, clock: Callable[[], datetime] = None):
+        """
+        Args:
+            rules: rate_limiting rules (see DEFAULT_RATE_LIMITING)
+            clock: Time source (default: datetime.now)
+        """
+        self.rules = {**DEFAULT_RATE_LIMITING, **(rules or {})}
+        self.clock = clock or datetime.now
+        self.enabled = bool(self.rules['enabled'])
+        self.cooldown = float(self.rules['cooldown_minutes'] or 0) * 60
+        self.exempt = {severity.upper() for severity in self.rules['exempt_severities'] or []}
+        self.buckets = max(int(self.rules['window_buckets']), 1)
+        
+        self.scenario_limit = self.rules['max_alerts_per_hour']
+        self.scenario_daily_limit = self.rules['max_alerts_per_day']
+        self.severity_limits = {key.upper(): value for key, value in (self.rules['severity_limits'] or {}).items()}
+        self.channel_limits = dict(self.rules['channel_limits'] or {})
+        
+        self._counters: Dict[Tuple[str, str], SlidingWindowCounter] = {}  # (kind, key) -> counter
+        self._last_alert: Dict[str, Tuple[float, int]] = {}             # scenario -> (time, severity rank)
+        self._suppressed: Counter = Counter()                            # (scenario, severity, channel, reason) -> count
+        self._summary_start: Optional[datetime] = None
+        self._lock = threading.Lock()
+    
+    def allow(self, scenario: str, severity: str) -> bool:
+        """
+        Check an alert and record it if allowed
+        
+        Args:
+            scenario: Signal scenario
+            severity: AlertSeverity name
+            
+        Returns:
+            False if the alert is suppressed
+        """
+        if not self.enabled:
+            return True
+        
+        now = self._now()
+        rank = SEVERITY_RANK.get(severity, 0)
+        
+        with self._lock:
+            scenario_counter = self._counter('scenario', scenario)
+            daily_counter = self._counter('scenario_day', scenario, self.DAY)
+            severity_counter = self._counter('severity', severity)
+            
+            reason = None
+            if severity not in self.exempt:
+                last = self._last_alert.get(scenario)
+                if last is not None and now - last[0] < self.cooldown and rank <= last[1]:
+                    reason = 'cooldown'
+                elif self._exceeded(scenario_counter, self.scenario_limit, now):
+                    reason = 'scenario_limit'
+                elif self._exceeded(daily_counter, self.scenario_daily_limit, now):
+                    reason = 'daily_limit'
+                elif self._exceeded(severity_counter, self.severity_limits.get(severity), now):
+                    reason = 'severity_limit'
+            
+            if reason is not None:
+                self._suppressed[(scenario, severity, None, reason)] += 1
+                return False
+            
+            scenario_counter.add(now)
+            daily_counter.add(now)
+            severity_counter.add(now)
+            self._last_alert[scenario] = (now, rank)
+            return True
+    
+    def allow_channels(self, alert: Dict, channels: List[str]) -> List[str]:
+        """
+        Filter the channels of an alert by their hourly limits
+        
+        Args:
+            alert: Alert dictionary
+            channels: Candidate channel names
+            
+        Returns:
+            Channels the alert may be delivered on (recorded as sent)
+        """
+        if not self.enabled:
+            return list(channels)
+        
+        now = self._now()
+        allowed = []
+        
+        with self._lock:
+            for channel in channels:
+                counter = self._counter('channel', channel)
+                if self._exceeded(counter, self.channel_limits.get(channel), now):
+                    self._suppressed[(alert['scenario'], alert['severity'], channel, 'channel_limit')] += 1
+                    continue
+                counter.add(now)
+                allowed.append(channel)
+        
+        return allowed
+    
+    def pop_summary(self, force: bool = False) -> Optional[Dict]:
+        """
+        Suppression summary for the elapsed period
+        
+        Args:
+            force: Ignore summary_interval_minutes
+            
+        Returns:
+            Summary dict (period_start, period_end, suppressed, by_scenario,
+            by_severity, by_channel, by_reason) or None if the period has
+            not elapsed or nothing was suppressed
+        """
+        now = self.clock()
+        
+        with self._lock:
+            if self._summary_start is None:
+                self._summary_start = now
+            
+            elapsed = (now - self._summary_start).total_seconds()
+            if not force and elapsed < float(self.rules['summary_interval_minutes']) * 60:
+                return None
+            
+            start = self._summary_start
+            suppressed = self._suppressed
+            self._suppressed = Counter()
+            self._summary_start = now
+        
+        if not suppressed:
+            return None
+        
+        summary = {
+            'period_start': start,
+            'period_end': now,
+            'suppressed': sum(suppressed.values()),
+            'by_scenario': Counter(),
+            'by_severity': Counter(),
+            'by_channel': Counter(),
+            'by_reason': Counter()
+        }
+        for (scenario, severity, channel, reason), count in suppressed.items():
+            summary['by_scenario'][scenario] += count
+            summary['by_severity'][severity] += count
+            if channel is not None:
+                summary['by_channel'][channel] += count
+            summary['by_reason'][reason] += count
+        
+        for key in ('by_scenario', 'by_severity', 'by_channel', 'by_reason'):
+            summary[key] = dict(summary[key])
+        return summary
+    
+    def get_suppressed_counts(self) -> Dict[str, int]:
+        """
+        Suppressions in the current summary period by reason
+        
+        Returns:
+            Reason -> count
+        """
+        with self._lock:
+            counts = Counter()
+            for (_, _, _, reason), count in self._suppressed.items():
+                counts[reason] += count
+            return dict(counts)
+    
+    def reset(self):
+        """Forget all counters, cooldowns and suppressions"""
+        with self._lock:
+            self._counters.clear()
+            self._last_alert.clear()
+            self._suppressed.clear()
+            self._summary_start = None
+    
+    def _counter(self, kind: str, key: str, window: float = HOUR) -> SlidingWindowCounter:
+        """Window counter (hourly by default) of a scenario, severity or channel"""
+        counter = self._counters.get((kind, key))
+        if counter is None:
+            counter = self._counters[(kind, key)] = SlidingWindowCounter(window, self.buckets)
+        return counter
+    
+    @staticmethod
+    def _exceeded(counter: SlidingWindowCounter, limit: Optional[int], now: float) -> bool:
+        """Whether the counter reached its limit (None or 0: unlimited)"""
+        return bool(limit) and counter.count(now) >= limit
+    
+    def _now(self) -> float:
+        """Clock time in epoch seconds"""
+        return self.clock().timestamp()
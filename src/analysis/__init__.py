@@ -1,12 +1,26 @@
 """Analysis package"""
-from .anomaly_detector import AnomalyDetector, Anomaly
+from .anomaly_detector import AnomalyDetector, Anomaly, AnomalyAccumulator
 from .signal_generator import SignalGenerator, Signal
-from .risk_scorer import RiskScorer
+from .rule_engine import RuleEngine, DEFAULT_SCENARIOS
+from .signal_state import SignalStateStore, ScenarioState
+from .risk_scorer import RiskScorer, IncrementalRiskScorer
+from .model_manager import IsolationForestManager
+from .parallel_detector import ParallelAnomalyDetector
+from .threshold_sweep import ThresholdSweep
 
 __all__ = [
     'AnomalyDetector',
     'Anomaly',
+    'AnomalyAccumulator',
     'SignalGenerator',
     'Signal',
-    'RiskScorer'
+    'RuleEngine',
+    'DEFAULT_SCENARIOS',
+    'SignalStateStore',
+    'ScenarioState',
+    'RiskScorer',
+    'IncrementalRiskScorer',
+    'IsolationForestManager',
+    'ParallelAnomalyDetector',
+    'ThresholdSweep'
 ]
@@ -1,15 +1,20 @@
 """
 Anomaly detection system
 """
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
+from datetime import datetime
 from sklearn.ensemble import IsolationForest
+import heapq
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import logging
+from .model_manager import IsolationForestManager
 
 logger = logging.getLogger(__name__)
 
+SEVERITY_RANK = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+
 
 @dataclass
 class Anomaly:
@@ -22,13 +27,137 @@ class Anomaly:
     details: Dict
 
 
+class AnomalyAccumulator:
+    """
+    Bounded top-K of anomalies merged by (symbol, timestamp)
+    
+    Detections of the same key from any method collapse into one entry
+    holding the highest score and severity; the entry keeps the details of
+    its best detection and records every contributing method (and column,
+    for detections naming one). A min-heap
+    ordered by (score, -arrival) evicts the weakest entry once capacity is
+    reached, so ties favour earlier arrivals exactly like a stable sort.
+    Keys that were rejected or evicted are forgotten, which keeps memory at
+    O(K) regardless of input size.
+    """
+    
+    def __init__(self, capacity: int = 50):
+        self.capacity = capacity
+        self._entries: Dict[tuple, list] = {}  # key -> [anomaly, seq, version]
+        self._heap: List[tuple] = []            # (score, -seq, version, key), stale if version moved
+        self._seq = 0
+        self._version = 0
+    
+    def add(self, anomaly: Anomaly):
+        """
+        Merge one detection
+        
+        Args:
+            anomaly: Detected anomaly
+        """
+        key = (anomaly.symbol, anomaly.timestamp)
+        entry = self._entries.get(key)
+        
+        if entry is not None:
+            merged = self._merge(entry[0], anomaly)
+            if merged.score != entry[0].score:
+                self._version += 1
+                entry[2] = self._version
+                self._push(merged.score, entry[1], key)
+            entry[0] = merged
+            return
+        
+        if len(self._entries) >= self.capacity:
+            weakest = self._peek()
+            if weakest is None or (anomaly.score, -self._seq) <= weakest[:2]:
+                self._seq += 1
+                return
+            heapq.heappop(self._heap)
+            del self._entries[weakest[3]]
+        
+        self._version += 1
+        self._entries[key] = [anomaly, self._seq, self._version]
+        self._push(anomaly.score, self._seq, key)
+        self._seq += 1
+    
+    def extend(self, anomalies: Iterable[Anomaly]):
+        """Merge a sequence of detections"""
+        for anomaly in anomalies:
+            self.add(anomaly)
+    
+    def results(self) -> List[Anomaly]:
+        """
+        Get the retained anomalies
+        
+        Returns:
+            Anomalies sorted by score (descending), earlier arrivals first on ties
+        """
+        entries = sorted(self._entries.values(), key=lambda entry: (-entry[0].score, entry[1]))
+        return [entry[0] for entry in entries]
+    
+    def clear(self):
+        """Drop all entries"""
+        self._entries.clear()
+        self._heap.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _push(self, score: float, seq: int, key: tuple):
+        heapq.heappush(self._heap, (score, -seq, self._version, key))
+        
+        # Drop stale heap items left behind by merges
+        if len(self._heap) > 2 * self.capacity + 16:
+            self._heap = [
+                item for item in self._heap
+                if item[3] in self._entries and self._entries[item[3]][2] == item[2]
+            ]
+            heapq.heapify(self._heap)
+    
+    def _peek(self) -> Optional[tuple]:
+        """Weakest live heap item"""
+        while self._heap:
+            item = self._heap[0]
+            entry = self._entries.get(item[3])
+            if entry is not None and entry[2] == item[2]:
+                return item
+            heapq.heappop(self._heap)
+        return None
+    
+    def _merge(self, current: Anomaly, anomaly: Anomaly) -> Anomaly:
+        """Combine two detections of the same key"""
+        best, other = (anomaly, current) if anomaly.score > current.score else (current, anomaly)
+        
+        methods = list(current.details.get('methods', [current.anomaly_type]))
+        if anomaly.anomaly_type not in methods:
+            methods.append(anomaly.anomaly_type)
+        
+        method_scores = dict(current.details.get('method_scores', {current.anomaly_type: current.score}))
+        method_scores[anomaly.anomaly_type] = max(method_scores.get(anomaly.anomaly_type, anomaly.score), anomaly.score)
+        
+        details = {**best.details, 'methods': methods, 'method_scores': method_scores}
+        columns = list(current.details.get('columns', [current.details['column']] if 'column' in current.details else []))
+        if 'column' in anomaly.details and anomaly.details['column'] not in columns:
+            columns.append(anomaly.details['column'])
+        if columns:
+            details['columns'] = columns
+        
+        severity = max(current.severity, anomaly.severity, key=lambda level: SEVERITY_RANK.get(level, 0))
+        return replace(best, severity=severity, details=details)
+
+
 class AnomalyDetector:
     """Multi-method anomaly detection"""
     
-    def __init__(self, config: Dict = None):
+    def __init__(self, config: Dict = None, clock: Callable[[], datetime] = None):
         self.config = config or {}
+        self.clock = clock or datetime.now
         self.z_threshold = self.config.get('z_score_threshold', 2.0)
         self.contamination = self.config.get('isolation_forest_contamination', 0.1)
+        self.max_anomalies = self.config.get('max_anomalies', 50)
+        self.statistical_mode = self.config.get('statistical_mode', 'global')  # 'global' or 'rolling'
+        self.window_size = self.config.get('window_size', 100)
+        self.rolling_streams = {}  # stream_id -> rolling statistical state
         
         # Initialize Isolation Forest
         self.isolation_forest = IsolationForest(
@@ -36,121 +165,456 @@ class AnomalyDetector:
             random_state=42
         )
         self.model_trained = False
+        self.ml_streams = {}  # stream_id -> incremental ML scoring state
+        
+        # Persisted models with background refits (inline fit-once without model_dir)
+        self.model_manager = None
+        if self.config.get('model_dir'):
+            self.model_manager = IsolationForestManager(
+                model_dir=self.config['model_dir'],
+                contamination=self.contamination,
+                retrain_interval=self.config.get('retrain_interval', 86400),
+                drift_threshold=self.config.get('drift_threshold', 3.0),
+                max_train_rows=self.config.get('max_train_rows', 50000),
+                drift_window=self.config.get('drift_window', 500),
+                min_drift_samples=self.config.get('min_drift_samples', 200),
+                clock=self.clock
+            )
     
-    def detect_anomalies(self, data: pd.DataFrame) -> List[Anomaly]:
+    def detect_anomalies(self, data: pd.DataFrame, stream_id: str = None, instrument: str = 'market') -> List[Anomaly]:
         """
         Detect anomalies using multiple methods
         
+        Every method's detections are reported for the instrument the frame
+        describes, so statistical, ML and pattern hits on the same row merge
+        into one anomaly. Statistical and pattern hits keep the column they
+        flagged in details['column'].
+        
         Args:
             data: DataFrame with market data
+            stream_id: Input stream identifier enabling incremental ML (and
+                rolling statistical) scoring of rows added since the
+                previous call; ML anomalies of earlier rows still in the
+                frame are served from a cache
+            instrument: Symbol (or group) the frame describes
             
         Returns:
             List of detected anomalies
         """
-        anomalies = []
+        # Merge detections by (instrument, timestamp) into a bounded top-K
+        accumulator = AnomalyAccumulator(self.max_anomalies)
         
         # Statistical anomaly detection
-        stat_anomalies = self._statistical_detection(data)
-        anomalies.extend(stat_anomalies)
+        accumulator.extend(self._for_instrument(self._statistical_detection(data, stream_id), instrument))
         
         # ML-based detection (if enough data)
         if len(data) >= 100:
-            ml_anomalies = self._ml_detection(data)
-            anomalies.extend(ml_anomalies)
+            accumulator.extend(self._for_instrument(self._ml_detection(data, stream_id), instrument, column=False))
         
         # Pattern-based detection
-        pattern_anomalies = self._pattern_detection(data)
-        anomalies.extend(pattern_anomalies)
+        accumulator.extend(self._for_instrument(self._pattern_detection(data), instrument))
         
-        # Remove duplicates and prioritize
-        anomalies = self._deduplicate_and_prioritize(anomalies)
+        anomalies = accumulator.results()
         
         logger.info(f"Detected {len(anomalies)} anomalies")
         return anomalies
     
-    def _statistical_detection(self, data: pd.DataFrame) -> List[Anomaly]:
+    def _for_instrument(self, anomalies: Iterable[Anomaly], instrument: str, column: bool = True) -> Iterable[Anomaly]:
+        """
+        Report detections under the frame's instrument
+        
+        Args:
+            anomalies: Detections of one method
+            instrument: Symbol (or group) the frame describes
+            column: Whether the detection's symbol names a frame column
+            
+        Returns:
+            Copies of the detections (cached ones are left untouched)
+        """
+        for anomaly in anomalies:
+            details = {**anomaly.details, 'column': anomaly.symbol} if column else anomaly.details
+            yield replace(anomaly, symbol=instrument, details=details)
+    
+    def _statistical_detection(self, data: pd.DataFrame, stream_id: str = None) -> List[Anomaly]:
         """
         Statistical anomaly detection using Z-score
         
+        Z-scores of all numeric columns are computed as one array and only
+        the top ``max_anomalies`` are materialized, since no more than that
+        can survive prioritization. Ties keep column-then-row order.
+        
         Args:
             data: Market data
+            stream_id: Input stream identifier (rolling mode scores only
+                rows appended since the previous call)
             
         Returns:
             List of statistical anomalies
         """
-        anomalies = []
+        columns = [column for column in data.select_dtypes(include=[np.number]).columns if column != 'timestamp']
+        if not columns or data.empty:
+            return []
         
-        for column in data.select_dtypes(include=[np.number]).columns:
-            if column == 'timestamp':
-                continue
-            
-            values = data[column].dropna()
-            if len(values) < 30:
+        if self.statistical_mode == 'rolling':
+            return self._rolling_statistical_detection(data, columns, stream_id)
+        
+        # Column-major so flat positions follow column, then row order
+        values = np.asfortranarray(data[columns].to_numpy(dtype=np.float64))
+        means = np.full(len(columns), np.nan)
+        stds = np.full(len(columns), np.nan)
+        
+        for i in range(len(columns)):
+            column_values = values[:, i]
+            column_values = column_values[~np.isnan(column_values)]
+            if len(column_values) < 30:
                 continue
             
-            mean = values.mean()
-            std = values.std()
-            
+            std = column_values.std(ddof=1)
             if std == 0:
                 continue
             
-            z_scores = np.abs((values - mean) / std)
+            means[i] = column_values.mean()
+            stds[i] = std
+        
+        with np.errstate(invalid='ignore'):
+            z_scores = np.abs((values - means) / stds)
+        
+        timestamps = data['timestamp'] if 'timestamp' in data.columns else data.index.to_series()
+        return self._statistical_anomalies(
+            timestamps,
+            columns,
+            values,
+            z_scores,
+            np.broadcast_to(means, values.shape),
+            np.broadcast_to(stds, values.shape)
+        )
+    
+    def _rolling_statistical_detection(self, data: pd.DataFrame, columns: List, stream_id: str = None) -> List[Anomaly]:
+        """
+        Z-scores of each row against its trailing window
+        
+        Every value is compared with the ``window_size`` rows before it, so
+        results do not depend on how much history is passed in. With a
+        stream_id and timestamp column, only rows newer than the stream's
+        last call are scored and reported; the trailing rows needed as
+        context are kept from the previous call.
+        
+        Args:
+            data: Market data
+            columns: Numeric columns to scan
+            stream_id: Input stream identifier
             
-            # Find anomalies
-            anomaly_indices = z_scores[z_scores > self.z_threshold].index
+        Returns:
+            List of statistical anomalies (of new rows only with a stream)
+        """
+        values = data[columns].to_numpy(dtype=np.float64)
+        timestamps = data['timestamp'] if 'timestamp' in data.columns else data.index.to_series()
+        
+        if stream_id is None or 'timestamp' not in data.columns:
+            z_scores, means, stds = self._rolling_zscores(values, self.window_size)
+            return self._statistical_anomalies(timestamps, columns, values, z_scores, means, stds)
+        
+        state = self.rolling_streams.get(stream_id)
+        if state is None or state['columns'] != columns:
+            state = {
+                'columns': columns,
+                'tail': np.empty((0, len(columns))),  # last window_size rows already scored
+                'scored_until': None
+            }
+            self.rolling_streams[stream_id] = state
+        
+        mask = np.ones(len(data), dtype=bool) if state['scored_until'] is None else (timestamps > state['scored_until']).to_numpy()
+        if not mask.any():
+            return []
+        
+        history = len(state['tail'])
+        combined = np.vstack([state['tail'], values[mask]])
+        z_scores, means, stds = self._rolling_zscores(combined, self.window_size)
+        
+        new_timestamps = timestamps[mask]
+        state['tail'] = combined[-self.window_size:]
+        state['scored_until'] = new_timestamps.max()
+        return self._statistical_anomalies(
+            new_timestamps,
+            columns,
+            combined[history:],
+            z_scores[history:],
+            means[history:],
+            stds[history:]
+        )
+    
+    def _rolling_zscores(self, values: np.ndarray, window: int, min_periods: int = 30):
+        """
+        Trailing-window z-scores via cumulative sums
+        
+        Window sums of x and x^2 are differences of prefix sums, so the
+        whole array costs O(n) regardless of the window. Values are shifted
+        by each column's first observation to limit cancellation in the
+        sum-of-squares variance.
+        
+        Args:
+            values: (rows, columns) array, NaN for missing
+            window: Number of preceding rows forming each row's baseline
+            min_periods: Minimum non-NaN values in the window
             
-            for idx in anomaly_indices:
-                z_score = z_scores[idx]
-                severity = self._calculate_severity(z_score)
-                
-                anomalies.append(Anomaly(
-                    symbol=column,
-                    timestamp=str(data.loc[idx, 'timestamp']) if 'timestamp' in data.columns else str(idx),
-                    anomaly_type='statistical',
-                    severity=severity,
-                    score=min(float(z_score) * 20, 100),  # Convert to 0-100 scale
-                    details={
-                        'z_score': float(z_score),
-                        'value': float(values[idx]),
-                        'mean': float(mean),
-                        'std': float(std)
-                    }
-                ))
+        Returns:
+            Absolute z-scores, window means and window stds (NaN where the
+            window is too short or flat), each shaped like values
+        """
+        n = len(values)
+        valid = ~np.isnan(values)
+        
+        first = np.argmax(valid, axis=0)
+        reference = values[first, np.arange(values.shape[1])]
+        reference = np.where(np.isnan(reference), 0.0, reference)
+        
+        shifted = np.where(valid, values - reference, 0.0)
+        zero = np.zeros((1, values.shape[1]))
+        sums = np.vstack([zero, np.cumsum(shifted, axis=0)])
+        squares = np.vstack([zero, np.cumsum(shifted * shifted, axis=0)])
+        counts = np.vstack([zero, np.cumsum(valid, axis=0)])
+        
+        # Row t uses rows [t - window, t)
+        end = np.arange(n)
+        start = np.maximum(end - window, 0)
+        window_sum = sums[end] - sums[start]
+        window_squares = squares[end] - squares[start]
+        window_count = counts[end] - counts[start]
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = window_sum / window_count
+            variance = (window_squares - window_sum * mean) / (window_count - 1)
+            std = np.sqrt(np.maximum(variance, 0.0))
+            usable = (window_count >= min_periods) & (std > 0)
+            std = np.where(usable, std, np.nan)
+            mean = np.where(usable, mean + reference, np.nan)
+            z_scores = np.abs(values - mean) / std
+        
+        return z_scores, mean, std
+    
+    def _statistical_anomalies(
+        self,
+        timestamps: pd.Series,
+        columns: List,
+        values: np.ndarray,
+        z_scores: np.ndarray,
+        means: np.ndarray,
+        stds: np.ndarray
+    ) -> List[Anomaly]:
+        """
+        Materialize the top ``max_anomalies`` flagged z-scores
+        
+        Args:
+            timestamps: Row timestamps (or index labels)
+            columns: Column names
+            values: (rows, columns) values
+            z_scores: Absolute z-scores shaped like values
+            means: Baseline means shaped like values
+            stds: Baseline stds shaped like values
+            
+        Returns:
+            List of statistical anomalies in column-then-row order
+        """
+        with np.errstate(invalid='ignore'):
+            flagged = np.flatnonzero((z_scores > self.z_threshold).ravel(order='F'))
+        
+        if len(flagged) == 0:
+            return []
+        
+        flat_z = z_scores.ravel(order='F')[flagged]
+        scores = np.minimum(flat_z * 20, 100)  # Convert to 0-100 scale
+        keep = self._top_k(scores, self.max_anomalies)
+        
+        rows, cols = np.unravel_index(flagged[keep], values.shape, order='F')
+        
+        anomalies = []
+        for row, col, z_score in zip(rows, cols, flat_z[keep]):
+            anomalies.append(Anomaly(
+                symbol=columns[col],
+                timestamp=str(timestamps.iloc[row]),
+                anomaly_type='statistical',
+                severity=self._calculate_severity(z_score),
+                score=min(float(z_score) * 20, 100),
+                details={
+                    'z_score': float(z_score),
+                    'value': float(values[row, col]),
+                    'mean': float(means[row, col]),
+                    'std': float(stds[row, col])
+                }
+            ))
         
         return anomalies
     
-    def _ml_detection(self, data: pd.DataFrame) -> List[Anomaly]:
+    def _top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        Positions of the k highest scores, ties broken by position
+        
+        Args:
+            scores: Candidate scores
+            k: Number to keep
+            
+        Returns:
+            Selected positions in ascending order
+        """
+        if len(scores) <= k:
+            return np.arange(len(scores))
+        
+        cutoff = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > cutoff)
+        at_cutoff = np.flatnonzero(scores == cutoff)[:k - len(above)]
+        return np.sort(np.concatenate([above, at_cutoff]))
+    
+    def _ml_detection(self, data: pd.DataFrame, stream_id: str = None) -> List[Anomaly]:
         """
         ML-based anomaly detection using Isolation Forest
         
         Args:
             data: Market data
+            stream_id: Input stream identifier; with a timestamp column this
+                scores only rows newer than the stream's last scored row
             
         Returns:
             List of ML-detected anomalies
         """
-        anomalies = []
-        
         # Prepare features
         numeric_data = data.select_dtypes(include=[np.number])
         
         if numeric_data.empty or len(numeric_data) < 100:
-            return anomalies
+            return []
+        
+        if stream_id is not None and 'timestamp' in data.columns:
+            return self._incremental_ml_detection(data, numeric_data, stream_id)
         
         # Fill NaN values
         numeric_data = numeric_data.fillna(numeric_data.mean())
         
         # Train or predict
+        model = self._get_model(numeric_data, lambda: numeric_data)
+        if model is None:
+            return []
+        
+        anomaly_scores = model.score_samples(numeric_data)
+        
+        if self.model_manager is not None:
+            self.model_manager.observe_scores(numeric_data, anomaly_scores)
+        
+        return self._ml_anomalies(data, numeric_data, anomaly_scores, model.offset_)
+    
+    def _incremental_ml_detection(self, data: pd.DataFrame, numeric_data: pd.DataFrame, stream_id: str) -> List[Anomaly]:
+        """
+        Score rows newer than the stream's last scored timestamp, plus rows with NaNs
+        
+        NaNs are filled with the column means of the input frame, as in
+        whole-frame scoring. Since those means move with the frame, rows
+        with NaNs are rescored on every call; complete rows are scored once.
+        Anomalies of complete rows from earlier cycles are served from a
+        per-stream cache keyed by (symbol, timestamp) and dropped once their
+        rows fall before the start of the input frame, so the result matches
+        scoring the whole frame with the same model. A swapped-in model
+        rescores the whole frame once.
+        
+        Args:
+            data: Market data with a timestamp column
+            numeric_data: Numeric columns of data
+            stream_id: Input stream identifier
+            
+        Returns:
+            ML anomalies for all rows of data
+        """
+        timestamps = data['timestamp']
+        columns = list(numeric_data.columns)
+        state = self.ml_streams.get(stream_id)
+        
+        if state is None or state['columns'] != columns:
+            state = {
+                'columns': columns,
+                'scored_until': None,  # newest row scored by 'model'
+                'model': None,
+                'anomalies': {}        # (symbol, timestamp) -> Anomaly of a complete row
+            }
+            self.ml_streams[stream_id] = state
+        
+        means = numeric_data.mean()
+        model = self._get_model(numeric_data.iloc[:0], lambda: numeric_data.fillna(means))
+        if model is None:
+            return []
+        
+        if model is not state['model']:
+            state['model'] = model
+            state['scored_until'] = None
+            state['anomalies'] = {}
+        
+        new = np.ones(len(data), dtype=bool) if state['scored_until'] is None else (timestamps > state['scored_until']).to_numpy()
+        incomplete = numeric_data.isna().any(axis=1).to_numpy()
+        mask = new | incomplete
+        
+        # Anomalies of incomplete rows depend on this frame's means and are not cached
+        transient = []
+        if mask.any():
+            new_data = data[mask]
+            features = numeric_data[mask].fillna(means)
+            anomaly_scores = model.score_samples(features)
+            
+            if self.model_manager is not None and new.any():
+                scored_new = new[mask]
+                self.model_manager.observe_scores(
+                    features[scored_new], anomaly_scores[scored_new], lambda: numeric_data.fillna(means)
+                )
+            
+            anomalies = self._ml_anomalies(new_data, features, anomaly_scores, model.offset_)
+            rows = np.where(anomaly_scores - model.offset_ < 0)[0]
+            for row, anomaly in zip(rows, anomalies):
+                if incomplete[mask][row]:
+                    transient.append(anomaly)
+                else:
+                    state['anomalies'][(anomaly.symbol, new_data['timestamp'].iloc[row])] = anomaly
+            if new.any():
+                state['scored_until'] = timestamps[new].max()
+        
+        # Forget anomalies whose rows left the input window
+        oldest = timestamps.min()
+        state['anomalies'] = {key: anomaly for key, anomaly in state['anomalies'].items() if key[1] >= oldest}
+        return list(state['anomalies'].values()) + transient
+    
+    def _get_model(self, features: pd.DataFrame, training) -> Optional[IsolationForest]:
+        """
+        Get the fitted model for a feature frame
+        
+        Args:
+            features: Feature frame (its columns define the schema)
+            training: Callable returning the NaN-filled training frame
+            
+        Returns:
+            Fitted model, or None while a managed model is being trained
+        """
+        if self.model_manager is not None:
+            return self.model_manager.get_model(features, training)
+        
         if not self.model_trained:
-            self.isolation_forest.fit(numeric_data)
+            self.isolation_forest.fit(training())
             self.model_trained = True
+        return self.isolation_forest
+    
+    def _ml_anomalies(self, data: pd.DataFrame, numeric_data: pd.DataFrame, anomaly_scores: np.ndarray, offset: float) -> List[Anomaly]:
+        """
+        Build anomalies from one score_samples pass
         
-        # Predict anomalies
-        predictions = self.isolation_forest.predict(numeric_data)
-        anomaly_scores = self.isolation_forest.score_samples(numeric_data)
+        A row is anomalous where IsolationForest.predict would return -1,
+        i.e. where its score falls below the model offset.
         
-        # Find anomalies (prediction = -1)
-        anomaly_indices = np.where(predictions == -1)[0]
+        Args:
+            data: Scored rows of market data
+            numeric_data: NaN-filled features of those rows
+            anomaly_scores: score_samples output
+            offset: Fitted model offset_
+            
+        Returns:
+            List of ML-detected anomalies
+        """
+        anomalies = []
+        
+        # Find anomalies (decision function < 0)
+        anomaly_indices = np.where(anomaly_scores - offset < 0)[0]
         
         for idx in anomaly_indices:
             score = abs(anomaly_scores[idx]) * 100
@@ -220,18 +684,16 @@ class AnomalyDetector:
         else:
             return 'low'
     
-    def _deduplicate_and_prioritize(self, anomalies: List[Anomaly]) -> List[Anomaly]:
+    def _deduplicate_and_prioritize(self, anomalies: Iterable[Anomaly]) -> List[Anomaly]:
         """
         Remove duplicates and prioritize anomalies
         
         Args:
-            anomalies: List of anomalies
+            anomalies: Anomalies from any detection method
             
         Returns:
-            Deduplicated and sorted list
+            Top anomalies merged by (symbol, timestamp), sorted by score
         """
-        # Sort by score (descending)
-        sorted_anomalies = sorted(anomalies, key=lambda x: x.score, reverse=True)
-        
-        # Keep top anomalies
-        return sorted_anomalies[:50]  # Limit to top 50
+        accumulator = AnomalyAccumulator(self.max_anomalies)
+        accumulator.extend(anomalies)
+        return accumulator.results()
@@ -0,0 +1,268 @@
+"""
+Persisted IsolationForest lifecycle with background refits
+"""
+from typing import Callable, Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from datetime import datetime
+from sklearn.ensemble import IsolationForest
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+import joblib
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IsolationForestManager:
+    """
+    Owns fitted IsolationForest models keyed by feature schema
+    
+    A model is only valid for the feature columns (and dtypes) it was fitted
+    on, so every model is stored under a hash of that schema plus the model
+    parameters. Models found in ``model_dir`` are loaded at startup. Fits run
+    on a single background worker and the fitted model replaces the previous
+    one in one reference swap, so ``get_model`` only waits on training when
+    no model exists for a schema at all (cold start without a persisted
+    model), which is fitted inline once.
+    
+    A refit is scheduled when the model is older than ``retrain_interval``
+    or when the scores of recent data drift from the training baseline: the
+    mean of the last ``drift_window`` scores must differ from the training
+    mean by more than ``drift_threshold`` standard errors (training std /
+    sqrt(n)), tested only once ``min_drift_samples`` scores have been seen
+    since the model was fitted. A single outlying row therefore never
+    counts as drift, however small the scored batches are. A batch of at
+    least ``min_drift_samples`` scores is tested on its own, since full
+    rescoring passes overlapping frames.
+    """
+    
+    def __init__(
+        self,
+        model_dir: str,
+        contamination: float = 0.1,
+        retrain_interval: float = 86400,
+        drift_threshold: float = 3.0,
+        max_train_rows: int = 50000,
+        random_state: int = 42,
+        drift_window: int = 500,
+        min_drift_samples: int = 200,
+        clock: Callable[[], datetime] = None
+    ):
+        self.model_dir = model_dir
+        self.contamination = contamination
+        self.retrain_interval = retrain_interval  # seconds
+        self.drift_threshold = drift_threshold    # standard errors of the window mean
+        self.max_train_rows = max_train_rows
+        self.random_state = random_state
+        self.drift_window = drift_window
+        self.min_drift_samples = min_drift_samples
+        self.clock = clock or datetime.now
+        
+        self._models: Dict[str, Dict] = {}  # schema hash -> model bundle
+        self._recent: Dict[str, tuple] = {}  # schema hash -> (bundle trained_at, deque of recent scores)
+        self._lock = threading.Lock()
+        self._cold_fit_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='isolation-forest-fit')
+        self._pending: Dict[str, Future] = {}
+        
+        os.makedirs(model_dir, exist_ok=True)
+        self.load_models()
+    
+    def schema_hash(self, features: pd.DataFrame) -> str:
+        """
+        Hash of feature columns, dtypes and model parameters
+        
+        Args:
+            features: Numeric feature frame
+            
+        Returns:
+            Hex digest
+        """
+        schema = {
+            'columns': [str(column) for column in features.columns],
+            'dtypes': [str(dtype) for dtype in features.dtypes],
+            'contamination': self.contamination,
+            'random_state': self.random_state
+        }
+        return hashlib.sha256(json.dumps(schema, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def load_models(self) -> int:
+        """
+        Load persisted models from the model directory
+        
+        Returns:
+            Number of loaded models
+        """
+        loaded = 0
+        for path in glob.glob(os.path.join(self.model_dir, 'isolation_forest-*.joblib')):
+            try:
+                bundle = joblib.load(path)
+            except Exception as e:
+                logger.error(f"Failed to load model {path}: {e}")
+                continue
+            
+            with self._lock:
+                current = self._models.get(bundle['schema_hash'])
+                if current is None or bundle['trained_at'] > current['trained_at']:
+                    self._models[bundle['schema_hash']] = bundle
+                    loaded += 1
+        
+        if loaded:
+            logger.info(f"Loaded {loaded} IsolationForest models from {self.model_dir}")
+        return loaded
+    
+    def get_model(self, features: pd.DataFrame, training: Callable[[], pd.DataFrame] = None) -> Optional[IsolationForest]:
+        """
+        Get the current model for a feature schema, scheduling refits as needed
+        
+        Refits run in the background. Without any model for this schema
+        (no persisted model) one is fitted inline, so detection is not blind
+        after a cold start.
+        
+        Args:
+            features: Numeric feature frame (NaN filled)
+            training: Callable returning the training frame if a fit is
+                scheduled (default: features)
+            
+        Returns:
+            Fitted IsolationForest, or None if the inline fit failed
+        """
+        key = self.schema_hash(features)
+        bundle = self._models.get(key)
+        
+        if bundle is None:
+            with self._cold_fit_lock:
+                bundle = self._models.get(key)
+                if bundle is None:
+                    logger.info("No model for feature schema, fitting inline")
+                    frame = training() if training is not None else features
+                    bundle = self._fit(key, frame.tail(self.max_train_rows).copy())
+            return bundle['model'] if bundle is not None else None
+        
+        if self._now() - bundle['trained_at'] >= self.retrain_interval:
+            self.request_fit(features, reason='scheduled retrain', training=training)
+        
+        return bundle['model']
+    
+    def observe_scores(self, features: pd.DataFrame, scores: np.ndarray, training: Callable[[], pd.DataFrame] = None):
+        """
+        Check recent scores for drift against the training baseline
+        
+        Args:
+            features: Feature frame that was scored
+            scores: score_samples output for those rows
+            training: Callable returning the training frame for a refit
+        """
+        key = self.schema_hash(features)
+        bundle = self._models.get(key)
+        if bundle is None or len(scores) == 0:
+            return
+        
+        with self._lock:
+            trained_at, recent = self._recent.get(key, (None, None))
+            if recent is None or trained_at != bundle['trained_at']:
+                # New model: start a fresh window against its baseline
+                recent = deque(maxlen=self.drift_window)
+                self._recent[key] = (bundle['trained_at'], recent)
+            if len(scores) >= self.min_drift_samples:
+                # A batch that is evidence enough on its own replaces the
+                # window, so rescored overlapping frames are not counted twice
+                recent.clear()
+            recent.extend(np.asarray(scores, dtype=float)[-self.drift_window:])
+            
+            if len(recent) < self.min_drift_samples:
+                return
+            
+            window = np.fromiter(recent, dtype=float, count=len(recent))
+        
+        standard_error = (bundle['score_std'] or 1e-12) / np.sqrt(len(window))
+        drift = abs(float(window.mean()) - bundle['score_mean']) / standard_error
+        if drift > self.drift_threshold and self.request_fit(features, reason=f'score drift {drift:.1f} se', training=training):
+            # Require a full window of fresh evidence before the next check
+            with self._lock:
+                recent.clear()
+    
+    def request_fit(self, features: pd.DataFrame, reason: str = '', training: Callable[[], pd.DataFrame] = None) -> bool:
+        """
+        Schedule a background fit
+        
+        Args:
+            features: Feature frame defining the schema
+            reason: Logged reason
+            training: Callable returning the training frame (default:
+                features); the most recent rows are used
+            
+        Returns:
+            False if a fit for this schema is already running
+        """
+        key = self.schema_hash(features)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None and not pending.done():
+                return False
+            
+            frame = training() if training is not None else features
+            self._pending[key] = self._executor.submit(self._fit, key, frame.tail(self.max_train_rows).copy())
+        
+        logger.info(f"Scheduled IsolationForest fit ({reason})")
+        return True
+    
+    def wait(self, timeout: float = None):
+        """Wait for scheduled fits to finish"""
+        with self._lock:
+            pending = list(self._pending.values())
+        for future in pending:
+            future.result(timeout=timeout)
+    
+    def close(self):
+        """Stop the background worker"""
+        self._executor.shutdown(wait=True)
+    
+    def _fit(self, key: str, features: pd.DataFrame) -> Optional[Dict]:
+        """Fit, persist and swap in a model (on the background worker, or inline on cold start)"""
+        try:
+            start = time.perf_counter()
+            model = IsolationForest(contamination=self.contamination, random_state=self.random_state)
+            model.fit(features)
+            scores = model.score_samples(features)
+            
+            bundle = {
+                'model': model,
+                'schema_hash': key,
+                'features': [str(column) for column in features.columns],
+                'trained_at': self._now(),
+                'n_samples': len(features),
+                'score_mean': float(np.mean(scores)),
+                'score_std': float(np.std(scores))
+            }
+            self._save(bundle)
+            
+            with self._lock:
+                self._models[key] = bundle
+            
+            logger.info(
+                f"Fitted IsolationForest on {len(features)} rows "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+            return bundle
+        except Exception as e:
+            logger.error(f"IsolationForest fit failed: {e}")
+            return None
+    
+    def _now(self) -> float:
+        """Clock time in epoch seconds"""
+        return self.clock().timestamp()
+    
+    def _save(self, bundle: Dict):
+        """Write a model bundle via temporary file and atomic rename"""
+        path = os.path.join(self.model_dir, f"isolation_forest-{bundle['schema_hash'][:16]}.joblib")
+        tmp_path = f"{path}.tmp"
+        joblib.dump(bundle, tmp_path)
+        os.replace(tmp_path, path)
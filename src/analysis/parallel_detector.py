@@ -0,0 +1,265 @@
+"""
+Process-parallel anomaly detection across symbols
+"""
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import hashlib
+import os
+import shutil
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+import logging
+from .anomaly_detector import AnomalyDetector, AnomalyAccumulator, Anomaly
+
+logger = logging.getLogger(__name__)
+
+# Per-process detector config and loaded group models (keyed by model path)
+_worker_config: Dict = {}
+_worker_models: Dict = {}
+
+
+def _init_worker(config: Dict):
+    global _worker_config
+    _worker_config = config
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block owned by the parent"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: pool workers share the parent's resource tracker,
+        # so attaching only re-registers a name the parent already owns
+        return shared_memory.SharedMemory(name=name)
+
+
+def _detect_group(task: Dict) -> Tuple[List[Anomaly], bool]:
+    """
+    Rebuild one group's frame from shared memory and run detection on it
+    
+    Returns:
+        Anomalies and whether the group's model was fitted (and saved to
+        task['model_path']) by this call
+    """
+    block = _attach(task['shm_name'])
+    try:
+        rows, cols = task['shape']
+        values = np.ndarray(
+            (rows, cols),
+            dtype=np.float64,
+            buffer=block.buf,
+            offset=task['values_offset']
+        ).copy()
+        
+        frame = pd.DataFrame(values, columns=task['columns'], index=task['index'])
+        
+        if task['timestamp_unit'] is not None:
+            ticks = np.ndarray(
+                (rows,),
+                dtype=np.int64,
+                buffer=block.buf,
+                offset=task['timestamp_offset']
+            ).copy()
+            timestamps = pd.Series(ticks.view(f"datetime64[{task['timestamp_unit']}]"), index=frame.index)
+            if task['timestamp_tz'] is not None:
+                timestamps = timestamps.dt.tz_localize('UTC').dt.tz_convert(task['timestamp_tz'])
+            frame['timestamp'] = timestamps
+        elif task['timestamps'] is not None:
+            frame['timestamp'] = task['timestamps']
+    finally:
+        block.close()
+    
+    group = task['group']
+    path = task['model_path']
+    detector = AnomalyDetector(_worker_config)
+    
+    # The group's model is fitted once and shared through its file, so
+    # results do not depend on which worker serves the group
+    if task['model_ready']:
+        if path not in _worker_models:
+            _worker_models[path] = joblib.load(path)
+        detector.isolation_forest = _worker_models[path]
+        detector.model_trained = True
+    
+    anomalies = detector.detect_anomalies(frame, instrument=group)
+    
+    fitted = not task['model_ready'] and detector.model_trained
+    if fitted:
+        tmp_path = f"{path}.tmp"
+        joblib.dump(detector.isolation_forest, tmp_path)
+        os.replace(tmp_path, path)
+        _worker_models[path] = detector.isolation_forest
+    return anomalies, fitted
+
+
+class ParallelAnomalyDetector:
+    """
+    Run AnomalyDetector over many symbols or groups in a process pool
+    
+    Numeric columns (and datetime timestamps) of every frame are packed
+    into one shared memory block; workers map their slice instead of
+    receiving pickled DataFrames. Results are merged through an
+    AnomalyAccumulator into a single prioritized list.
+    
+    Each group gets one IsolationForest, fitted on the group's first frame
+    with enough rows (as a serial fit-once AnomalyDetector per group would)
+    and written to a private model directory. Later calls pass its path and
+    workers load it once per process, so results are the same whichever
+    worker serves a group. Persisted models (model_dir) are not used.
+    
+    Anomalies are reported under their group as the symbol (the flagged
+    column is in details['column']), so the same column in different
+    frames stays distinct and each group's methods merge per row.
+    """
+    
+    def __init__(self, config: Dict = None, max_workers: int = None):
+        self.config = config or {}
+        self.max_workers = max_workers
+        self.max_anomalies = self.config.get('max_anomalies', 50)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._model_dir: Optional[str] = None
+        self._fitted: set = set()  # groups whose model file exists
+    
+    def detect(self, frames: Dict[str, pd.DataFrame]) -> List[Anomaly]:
+        """
+        Detect anomalies in every frame concurrently
+        
+        Args:
+            frames: Group or symbol name -> market data frame
+            
+        Returns:
+            Top anomalies across all frames, sorted by score
+        """
+        frames = {group: frame for group, frame in frames.items() if not frame.empty}
+        if not frames:
+            return []
+        
+        block, tasks = self._pack(frames)
+        try:
+            results = self._pool().map(_detect_group, tasks)
+            accumulator = AnomalyAccumulator(self.max_anomalies)
+            for task, (anomalies, fitted) in zip(tasks, results):
+                if fitted:
+                    self._fitted.add(task['group'])
+                accumulator.extend(anomalies)
+        finally:
+            block.close()
+            block.unlink()
+        
+        anomalies = accumulator.results()
+        logger.info(f"Detected {len(anomalies)} anomalies across {len(frames)} groups")
+        return anomalies
+    
+    def detect_by_symbol(self, data: pd.DataFrame, symbol_column: str = 'symbol') -> List[Anomaly]:
+        """
+        Split a long frame by symbol and detect anomalies per symbol
+        
+        Args:
+            data: Long-format market data
+            symbol_column: Column holding the symbol
+            
+        Returns:
+            Top anomalies across all symbols, sorted by score
+        """
+        frames = {
+            str(symbol): group.drop(columns=[symbol_column]).reset_index(drop=True)
+            for symbol, group in data.groupby(symbol_column, sort=False)
+        }
+        return self.detect(frames)
+    
+    def close(self):
+        """Shut down the worker pool and remove the group models"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        
+        if self._model_dir is not None:
+            shutil.rmtree(self._model_dir, ignore_errors=True)
+            self._model_dir = None
+            self._fitted.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            worker_config = {key: value for key, value in self.config.items() if key != 'model_dir'}
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(worker_config,)
+            )
+        return self._executor
+    
+    def _model_path(self, group: str) -> str:
+        """Model file of a group"""
+        if self._model_dir is None:
+            self._model_dir = tempfile.mkdtemp(prefix='anomaly-models-')
+        name = hashlib.sha256(group.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self._model_dir, f"isolation_forest-{name}.joblib")
+    
+    def _pack(self, frames: Dict[str, pd.DataFrame]):
+        """Copy all frames into one shared memory block and describe each slice"""
+        layouts = []
+        size = 0
+        
+        for group, frame in frames.items():
+            columns = [column for column in frame.select_dtypes(include=[np.number]).columns if column != 'timestamp']
+            rows = len(frame)
+            
+            timestamp_unit = None
+            timestamp_tz = None
+            timestamps = None
+            if 'timestamp' in frame.columns:
+                series = frame['timestamp']
+                if pd.api.types.is_datetime64_any_dtype(series):
+                    timestamp_tz = str(series.dt.tz) if series.dt.tz is not None else None
+                    if timestamp_tz is not None:
+                        series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+                    timestamps = series.to_numpy()
+                    timestamp_unit = np.datetime_data(timestamps.dtype)[0]
+                else:
+                    timestamps = series.tolist()
+            
+            values_offset = size
+            size += 8 * rows * len(columns)
+            timestamp_offset = size
+            if timestamp_unit is not None:
+                size += 8 * rows
+            
+            layouts.append((group, frame, columns, values_offset, timestamp_offset, timestamp_unit, timestamp_tz, timestamps))
+        
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        tasks = []
+        
+        for group, frame, columns, values_offset, timestamp_offset, timestamp_unit, timestamp_tz, timestamps in layouts:
+            rows = len(frame)
+            target = np.ndarray((rows, len(columns)), dtype=np.float64, buffer=block.buf, offset=values_offset)
+            target[:] = frame[columns].to_numpy(dtype=np.float64)
+            
+            if timestamp_unit is not None:
+                ticks = np.ndarray((rows,), dtype=np.int64, buffer=block.buf, offset=timestamp_offset)
+                ticks[:] = timestamps.view(np.int64)
+            
+            tasks.append({
+                'group': group,
+                'model_path': self._model_path(group),
+                'model_ready': group in self._fitted,
+                'shm_name': block.name,
+                'shape': (rows, len(columns)),
+                'columns': columns,
+                'values_offset': values_offset,
+                'index': None if isinstance(frame.index, pd.RangeIndex) and frame.index.start == 0 and frame.index.step == 1 else frame.index,
+                'timestamp_offset': timestamp_offset,
+                'timestamp_unit': timestamp_unit,
+                'timestamp_tz': timestamp_tz,
+                'timestamps': timestamps if timestamp_unit is None else None
+            })
+        
+        return block, tasks
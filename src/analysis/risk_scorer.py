@@ -1,18 +1,97 @@
 """
 Risk scoring system
 """
-from typing import Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
+import operator
+import threading
+import numpy as np
+import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Comparisons usable in component ladders; each works on scalars and arrays
+COMPARISONS: Dict[str, Callable[[Any, float], Any]] = {
+    '<': operator.lt,
+    '>': operator.gt,
+    'abs>': lambda value, threshold: abs(value) > threshold,
+    'truthy': lambda value, _: value.astype(bool) if isinstance(value, np.ndarray) else bool(value)
+}
+
+# Component -> (base score, terms). Each term reads one state key (with its
+# default when missing) and adds the points of the first matching ladder
+# step, else its 'otherwise' points. Component scores are capped at 100.
+RISK_COMPONENTS: Dict[str, Tuple[float, List[Dict]]] = {
+    'market_volatility': (0, [
+        # VIX-based scoring
+        {'key': 'vix', 'default': 15, 'otherwise': 95,
+         'ladder': [('<', 15, 10), ('<', 20, 25), ('<', 30, 50), ('<', 40, 75)]},
+        # Adjust for VIX trend
+        {'key': 'vix_change_5d', 'default': 0, 'ladder': [('>', 20, 15)]}
+    ]),
+    'liquidity_risk': (20, [
+        # Bid-ask spreads
+        {'key': 'spread_widening', 'default': False, 'ladder': [('truthy', None, 25)]},
+        # Trading volume: low volume, panic volume
+        {'key': 'volume_ratio', 'default': 1.0, 'ladder': [('<', 0.7, 20), ('>', 1.5, 15)]},
+        # MOVE index (bond volatility)
+        {'key': 'move_index', 'default': 80, 'ladder': [('>', 150, 30), ('>', 120, 15)]}
+    ]),
+    'credit_risk': (15, [
+        # High yield spread
+        {'key': 'hyg_spread', 'default': 3.0, 'ladder': [('>', 7, 40), ('>', 5, 25), ('>', 4, 10)]},
+        # Investment grade spread
+        {'key': 'ig_spread', 'default': 1.0, 'ladder': [('>', 2, 20), ('>', 1.5, 10)]},
+        # Default rate trend
+        {'key': 'default_rate_change', 'default': 0, 'ladder': [('>', 0.5, 25)]}
+    ]),
+    'currency_risk': (20, [
+        # Dollar strength
+        {'key': 'dxy_change_1m', 'default': 0, 'ladder': [('>', 5, 30), ('>', 3, 15)]},
+        # Emerging market currencies
+        {'key': 'em_fx_stress', 'default': False, 'ladder': [('truthy', None, 25)]},
+        # Carry trade unwind (rapid yen movement)
+        {'key': 'usdjpy_change_1w', 'default': 0, 'ladder': [('abs>', 3, 20)]}
+    ]),
+    'geopolitical_risk': (30, [
+        # This would typically integrate news sentiment analysis;
+        # oil volatility and gold are placeholder proxies
+        {'key': 'oil_volatility', 'default': 0, 'ladder': [('>', 5, 25)]},
+        {'key': 'gold_change_1m', 'default': 0, 'ladder': [('>', 10, 20)]}
+    ])
+}
+
+# (threshold, level) pairs checked top-down; a score must exceed the threshold
+RISK_LEVELS = [
+    (80, "EXTREME"),
+    (60, "HIGH"),
+    (40, "MODERATE"),
+    (20, "LOW")
+]
+
+
 class RiskScorer:
-    """Calculate comprehensive risk scores"""
+    """
+    Calculate comprehensive risk scores
+    
+    Components are threshold ladders declared in RISK_COMPONENTS.
+    calculate_risk_scores evaluates each ladder as one np.select over a
+    column, so a whole history (or many portfolio views) is scored with a
+    few array operations. calculate_risk_score walks the same ladders for
+    one state dict without array overhead.
+    """
     
-    def __init__(self, config: Dict = None):
+    # Component -> market-state keys it reads
+    COMPONENT_INPUTS: Dict[str, Tuple[str, ...]] = {
+        name: tuple(term['key'] for term in terms)
+        for name, (_, terms) in RISK_COMPONENTS.items()
+    }
+    
+    def __init__(self, config: Dict = None, clock: Callable[[], datetime] = None):
         self.config = config or {}
+        self.clock = clock or datetime.now
         self.weights = self.config.get('weights', {
             'market_volatility': 0.25,
             'liquidity_risk': 0.25,
@@ -20,23 +99,35 @@ class RiskScorer:
             'currency_risk': 0.20,
             'geopolitical_risk': 0.10
         })
+        
+        # Ladders resolved to (key, default, [(compare, threshold, points)], otherwise)
+        self._ladders = {
+            name: (base, [
+                (
+                    term['key'],
+                    term['default'],
+                    [(COMPARISONS[op], threshold, points) for op, threshold, points in term['ladder']],
+                    term.get('otherwise', 0)
+                )
+                for term in terms
+            ])
+            for name, (base, terms) in RISK_COMPONENTS.items()
+        }
     
-    def calculate_risk_score(self, market_state: Dict) -> Dict:
+    def calculate_risk_score(self, market_state: Dict, timestamp: datetime = None) -> Dict:
         """
         Calculate comprehensive risk score
         
         Args:
             market_state: Current market state
+            timestamp: Cycle time (unused; stateful scorers order cycles by it)
             
         Returns:
             Risk score breakdown
         """
         risk_components = {
-            'market_volatility': self._score_volatility(market_state),
-            'liquidity_risk': self._score_liquidity(market_state),
-            'credit_risk': self._score_credit(market_state),
-            'currency_risk': self._score_currency(market_state),
-            'geopolitical_risk': self._score_geopolitical(market_state)
+            name: self._score_component(name, market_state)
+            for name in RISK_COMPONENTS
         }
         
         # Calculate weighted total
@@ -53,167 +144,91 @@ class RiskScorer:
             'risk_level': risk_level,
             'components': risk_components,
             'recommendation': recommendation,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': self.clock().isoformat()
         }
     
-    def _score_volatility(self, state: Dict) -> float:
-        """
-        Score market volatility risk (0-100)
-        
-        Args:
-            state: Market state
-            
-        Returns:
-            Volatility risk score
+    def calculate_risk_scores(self, states: pd.DataFrame) -> pd.DataFrame:
         """
-        vix = state.get('vix', 15)
-        
-        # VIX-based scoring
-        if vix < 15:
-            score = 10
-        elif vix < 20:
-            score = 25
-        elif vix < 30:
-            score = 50
-        elif vix < 40:
-            score = 75
-        else:
-            score = 95
-        
-        # Adjust for VIX trend
-        vix_change = state.get('vix_change_5d', 0)
-        if vix_change > 20:
-            score = min(score + 15, 100)
+        Calculate risk scores for many market states at once
         
-        return float(score)
-    
-    def _score_liquidity(self, state: Dict) -> float:
-        """
-        Score liquidity risk (0-100)
+        Columns missing from the frame and NaN cells take the same defaults
+        as missing keys in calculate_risk_score.
         
         Args:
-            state: Market state
+            states: One market state per row (state keys as columns)
             
         Returns:
-            Liquidity risk score
+            DataFrame (same index) with one column per component,
+            total_risk_score and risk_level
         """
-        score = 20  # Base score
-        
-        # Bid-ask spreads
-        spread_widening = state.get('spread_widening', False)
-        if spread_widening:
-            score += 25
-        
-        # Trading volume
-        volume_ratio = state.get('volume_ratio', 1.0)
-        if volume_ratio < 0.7:  # Low volume
-            score += 20
-        elif volume_ratio > 1.5:  # Panic volume
-            score += 15
+        size = len(states)
+        components = {
+            name: self.score_component_array(name, states, size)
+            for name in RISK_COMPONENTS
+        }
         
-        # MOVE index (bond volatility)
-        move = state.get('move_index', 80)
-        if move > 150:
-            score += 30
-        elif move > 120:
-            score += 15
+        total_score = sum(
+            components[key] * self.weights[key]
+            for key in components
+        )
         
-        return min(float(score), 100)
+        result = pd.DataFrame(components, index=states.index)
+        result['total_risk_score'] = np.round(total_score, 2)
+        result['risk_level'] = np.select(
+            [total_score > threshold for threshold, _ in RISK_LEVELS],
+            [level for _, level in RISK_LEVELS],
+            default="MINIMAL"
+        )
+        return result
     
-    def _score_credit(self, state: Dict) -> float:
+    def _score_component(self, name: str, state: Dict) -> float:
         """
-        Score credit risk (0-100)
+        Score one risk component (0-100) for a state
         
         Args:
+            name: Component name
             state: Market state
             
         Returns:
-            Credit risk score
+            Component score
         """
-        score = 15  # Base score
-        
-        # High yield spread
-        hyg_spread = state.get('hyg_spread', 3.0)
-        if hyg_spread > 7:
-            score += 40
-        elif hyg_spread > 5:
-            score += 25
-        elif hyg_spread > 4:
-            score += 10
-        
-        # Investment grade spread
-        ig_spread = state.get('ig_spread', 1.0)
-        if ig_spread > 2:
-            score += 20
-        elif ig_spread > 1.5:
-            score += 10
-        
-        # Default rate trend
-        default_rate_change = state.get('default_rate_change', 0)
-        if default_rate_change > 0.5:
-            score += 25
-        
-        return min(float(score), 100)
+        score, terms = self._ladders[name]
+        
+        for key, default, ladder, otherwise in terms:
+            value = state.get(key, default)
+            for compare, threshold, points in ladder:
+                if compare(value, threshold):
+                    score += points
+                    break
+            else:
+                score += otherwise
+        
+        return float(min(score, 100))
     
-    def _score_currency(self, state: Dict) -> float:
+    def score_component_array(self, name: str, states: pd.DataFrame, size: int) -> np.ndarray:
         """
-        Score currency risk (0-100)
+        Score one risk component (0-100) for every row
         
         Args:
-            state: Market state
+            name: Component name
+            states: Market states
+            size: Number of rows
             
         Returns:
-            Currency risk score
+            Component scores
         """
-        score = 20  # Base score
-        
-        # Dollar strength
-        dxy = state.get('dxy', 100)
-        dxy_change = state.get('dxy_change_1m', 0)
-        
-        if dxy_change > 5:  # Strong dollar appreciation
-            score += 30
-        elif dxy_change > 3:
-            score += 15
-        
-        # Emerging market currencies
-        em_fx_stress = state.get('em_fx_stress', False)
-        if em_fx_stress:
-            score += 25
-        
-        # Carry trade unwind
-        usdjpy_change = state.get('usdjpy_change_1w', 0)
-        if abs(usdjpy_change) > 3:  # Rapid yen movement
-            score += 20
-        
-        return min(float(score), 100)
-    
-    def _score_geopolitical(self, state: Dict) -> float:
-        """
-        Score geopolitical risk (0-100)
-        
-        Args:
-            state: Market state
-            
-        Returns:
-            Geopolitical risk score
-        """
-        # This would typically integrate news sentiment analysis
-        # Placeholder implementation
-        
-        score = 30  # Base score
-        
-        # Oil price volatility (proxy for geopolitical stress)
-        oil_volatility = state.get('oil_volatility', 0)
-        if oil_volatility > 5:
-            score += 25
-        
-        # Gold as safe haven
-        gold_change = state.get('gold_change_1m', 0)
-        if gold_change > 10:
-            score += 20
-        
-        return min(float(score), 100)
+        base, terms = self._ladders[name]
+        score = np.full(size, base)
+        
+        for key, default, ladder, otherwise in terms:
+            values = states[key].fillna(default).to_numpy() if key in states.columns else np.full(size, default)
+            score = score + np.select(
+                [np.asarray(compare(values, threshold), dtype=bool) for compare, threshold, _ in ladder],
+                [points for _, _, points in ladder],
+                default=otherwise
+            )
+        
+        return np.minimum(score, 100).astype(float)
     
     def _categorize_risk(self, score: float) -> str:
         """
@@ -225,16 +240,10 @@ class RiskScorer:
         Returns:
             Risk level category
         """
-        if score > 80:
-            return "EXTREME"
-        elif score > 60:
-            return "HIGH"
-        elif score > 40:
-            return "MODERATE"
-        elif score > 20:
-            return "LOW"
-        else:
-            return "MINIMAL"
+        for threshold, level in RISK_LEVELS:
+            if score > threshold:
+                return level
+        return "MINIMAL"
     
     def _get_risk_recommendation(self, score: float, level: str) -> str:
         """
@@ -256,3 +265,176 @@ class RiskScorer:
         }
         
         return recommendations.get(level, "리스크 평가 필요")
+
+
+class IncrementalRiskScorer(RiskScorer):
+    """
+    Stateful risk scorer that recomputes only components whose inputs changed
+    
+    The last seen value of every key in COMPONENT_INPUTS is kept; a state
+    only re-scores the components reading a changed key and reuses cached
+    scores for the rest, and the recommendation is rebuilt only when the
+    level changes. Subscribers receive a risk-change event when the level
+    changes or the total score moves by more than ``min_change`` since the
+    last event, so an unchanged tick produces no downstream traffic.
+    
+    calculate_risk_score keeps the RiskScorer signature and results, so the
+    incremental scorer is a drop-in replacement in the pipeline. As the
+    analyze stage may score cycles concurrently, a state whose timestamp is
+    older than the newest one scored is stale: it is counted in
+    ``stale_cycles`` and leaves the cached inputs and the current score
+    untouched.
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, config: Dict = None, clock: Callable[[], datetime] = None, min_change: float = 0.0):
+        super().__init__(config, clock)
+        self.min_change = min_change  # total score points
+        self.subscribers: List[Callable[[Dict], None]] = []
+        self.current: Optional[Dict] = None  # latest risk score breakdown
+        self.recomputed = 0  # component evaluations, for monitoring
+        self.stale_cycles = 0
+        
+        self._input_keys = tuple(dict.fromkeys(key for keys in self.COMPONENT_INPUTS.values() for key in keys))
+        self._inputs: Dict[str, Any] = {}
+        self._components: Dict[str, float] = {}
+        self._recommendation: Optional[Tuple[str, str]] = None  # (level, text)
+        self._emitted: Optional[Tuple[float, str]] = None  # (score, level) of the last event
+        self._last_cycle: Optional[datetime] = None
+        self._lock = threading.Lock()
+    
+    def subscribe(self, callback: Callable[[Dict], None]):
+        """
+        Register a consumer for risk-change events
+        
+        Args:
+            callback: Called with each risk-change event
+        """
+        self.subscribers.append(callback)
+    
+    def calculate_risk_score(self, market_state: Dict, timestamp: datetime = None) -> Dict:
+        """
+        Calculate comprehensive risk score, reusing unchanged components
+        
+        Args:
+            market_state: Current market state
+            timestamp: Cycle time; stale cycles return the current score
+            
+        Returns:
+            Risk score breakdown
+        """
+        self.update(market_state, timestamp)
+        return self.current
+    
+    def update(self, market_state: Dict, timestamp: datetime = None) -> Optional[Dict]:
+        """
+        Score a new market state
+        
+        Args:
+            market_state: Current market state
+            timestamp: Cycle time, used to drop out-of-order states
+                (default: no ordering check)
+            
+        Returns:
+            Risk-change event (breakdown plus previous_score, previous_level
+            and changed_components), or None if the risk did not move or
+            the state is stale
+        """
+        with self._lock:
+            if timestamp is not None:
+                if self._last_cycle is not None and timestamp < self._last_cycle:
+                    self.stale_cycles += 1
+                    logger.debug(f"Ignoring stale risk cycle {timestamp} (last scored {self._last_cycle})")
+                    return None
+                self._last_cycle = timestamp
+            
+            changed = self._changed_inputs(market_state)
+            
+            if not changed and self.current is not None:
+                # Nothing the components read has changed: same score, no event
+                self.current = {**self.current, 'timestamp': self.clock().isoformat()}
+                return None
+            
+            stale = [
+                name for name in RISK_COMPONENTS
+                if name not in self._components or not changed.isdisjoint(self.COMPONENT_INPUTS[name])
+            ]
+            for name in stale:
+                self._components[name] = self._score_component(name, market_state)
+            self.recomputed += len(stale)
+            
+            # Same component order as RiskScorer, so totals match exactly
+            total_score = sum(
+                self._components[key] * self.weights[key]
+                for key in RISK_COMPONENTS
+            )
+            risk_level = self._categorize_risk(total_score)
+            
+            if self._recommendation is None or self._recommendation[0] != risk_level:
+                self._recommendation = (risk_level, self._get_risk_recommendation(total_score, risk_level))
+            
+            self.current = {
+                'total_risk_score': round(total_score, 2),
+                'risk_level': risk_level,
+                'components': {key: self._components[key] for key in RISK_COMPONENTS},
+                'recommendation': self._recommendation[1],
+                'timestamp': self.clock().isoformat()
+            }
+            
+            event = self._risk_change(stale)
+        
+        if event is not None:
+            self._emit(event)
+        return event
+    
+    def reset(self):
+        """Forget cached inputs, components and the last event"""
+        with self._lock:
+            self._inputs.clear()
+            self._components.clear()
+            self._recommendation = None
+            self._emitted = None
+            self._last_cycle = None
+            self.current = None
+    
+    def _changed_inputs(self, market_state: Dict) -> set:
+        """Input keys whose value differs from the previous state"""
+        changed = set()
+        for key in self._input_keys:
+            value = market_state.get(key, self._MISSING)
+            previous = self._inputs.get(key, self._MISSING)
+            if value is previous or value == previous:
+                continue
+            changed.add(key)
+            self._inputs[key] = value
+        return changed
+    
+    def _risk_change(self, changed_components: List[str]) -> Optional[Dict]:
+        """Build a risk-change event if the level or score moved enough"""
+        score = self.current['total_risk_score']
+        level = self.current['risk_level']
+        
+        if self._emitted is not None:
+            previous_score, previous_level = self._emitted
+            if level == previous_level and abs(score - previous_score) <= self.min_change:
+                return None
+        else:
+            previous_score, previous_level = None, None
+        
+        self._emitted = (score, level)
+        return {
+            **self.current,
+            'components': dict(self.current['components']),
+            'previous_score': previous_score,
+            'previous_level': previous_level,
+            'changed_components': changed_components
+        }
+    
+    def _emit(self, event: Dict):
+        """Deliver a risk-change event to subscribers"""
+        for callback in self.subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Risk subscriber failed: {e}")
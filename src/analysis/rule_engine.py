@@ -0,0 +1,567 @@
+"""
+Declarative scenario rules compiled into a reusable evaluator
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+from string import Formatter
+import copy
+import operator
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Operator -> comparison used by the scalar evaluator (None: truthiness)
+OPERATORS: Dict[str, Optional[Callable[[Any, Any], bool]]] = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+    'truthy': None
+}
+
+# Trigger conversion flag -> function
+CONVERSIONS: Dict[str, Callable[[Any], str]] = {'r': repr, 's': str, 'a': ascii}
+
+# Operator -> elementwise function used for batch evaluation
+ARRAY_OPERATORS: Dict[str, Callable[[np.ndarray, Any], np.ndarray]] = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+    'truthy': lambda values, _: values.astype(bool)
+}
+
+# Scenario definitions
+#
+#   scenario         Signal scenario name
+#   params           Section of analysis.signal_generation holding thresholds
+#   conditions       List of {key, op, threshold | param, default, trigger}
+#                    or {all: [conditions], trigger}; a condition's threshold
+#                    comes from params[param] when set. Triggers are format
+#                    strings over market state keys.
+#   min_conditions   Conditions required to fire
+#   total_conditions Denominator for ratio confidence (default: len(conditions))
+#   severity         Severity string or [[min_conditions_met, severity], ...]
+#   confidence       'ratio' (met / total, capped at 1) or a fixed number
+#   metadata         name -> 'conditions_met' | 'total_conditions' |
+#                    {key: state_key} | {tiers: [[min_met, value], ...]} | literal
+DEFAULT_SCENARIOS: List[Dict] = [
+    {
+        'scenario': 'korea_capital_outflow',
+        'params': 'korea_outflow',
+        'conditions': [
+            {'key': 'korea_us_rate_diff', 'op': '<', 'param': 'rate_diff_threshold', 'threshold': -0.5,
+             'trigger': "한미 금리차 역전: {korea_us_rate_diff:.2f}%p"},
+            {'key': 'usdkrw_change_1d', 'op': '>', 'param': 'usdkrw_change_threshold', 'threshold': 1.0,
+             'trigger': "원달러 급등: +{usdkrw_change_1d:.2f}%"},
+            {'key': 'ewy_flow_3d', 'op': '<', 'threshold': 0,
+             'trigger': "EWY ETF 순유출: {ewy_flow_3d:,.0f}"},
+            {'key': 'kospi_foreign_flow', 'op': '<', 'threshold': 0,
+             'trigger': "KOSPI 외국인 순매도: {kospi_foreign_flow:,.0f}억원"}
+        ],
+        'min_conditions': 3,
+        'severity': [[4, 'critical'], [0, 'warning']],
+        'confidence': 'ratio',
+        'recommendation': "포지션 축소 또는 헤지 검토. 원화 약세 대비 필요.",
+        'metadata': {'conditions_met': 'conditions_met', 'total_conditions': 'total_conditions'}
+    },
+    {
+        'scenario': 'risk_off_transition',
+        'params': 'risk_off',
+        'conditions': [
+            {'key': 'vix', 'op': '>', 'param': 'vix_threshold', 'threshold': 30,
+             'trigger': "VIX 급등: {vix:.1f}"},
+            {'key': 'tlt_flow', 'op': '>', 'threshold': 0,
+             'trigger': "TLT 대량 유입: +{tlt_flow:,.0f}"},
+            {'key': 'hyg_spread', 'op': '>', 'param': 'hyg_spread_threshold', 'threshold': 5.0,
+             'trigger': "하이일드 스프레드 확대: {hyg_spread:.2f}%p"},
+            {'all': [
+                {'key': 'gold_change', 'op': '>', 'threshold': 1},
+                {'key': 'dxy_change', 'op': '>', 'threshold': 0.5}
+            ], 'trigger': "금 가격 상승 + 달러 강세 동시 발생"}
+        ],
+        'min_conditions': 3,
+        'severity': 'critical',
+        'confidence': 'ratio',
+        'recommendation': "주식 비중 축소, 현금/단기채 확보. 변동성 낮아질 때까지 대기.",
+        'metadata': {'conditions_met': 'conditions_met'}
+    },
+    {
+        'scenario': 'liquidity_crisis',
+        'params': 'liquidity_crisis',
+        'conditions': [
+            {'key': 'libor_ois_spread', 'op': '>', 'param': 'libor_ois_threshold', 'threshold': 0.5,
+             'trigger': "LIBOR-OIS 스프레드 급등: {libor_ois_spread:.2f}%p"},
+            {'key': 'repo_rate_spike', 'op': 'truthy', 'default': False,
+             'trigger': "레포 금리 스파이크 감지"},
+            {'key': 'move_index', 'op': '>', 'param': 'move_threshold', 'threshold': 150,
+             'trigger': "MOVE 지수 급등: {move_index:.1f}"},
+            {'key': 'corp_bond_issuance_change', 'op': '<', 'threshold': -50,
+             'trigger': "회사채 발행 급감: {corp_bond_issuance_change:.1f}%"}
+        ],
+        'min_conditions': 2,
+        'severity': 'emergency',
+        'confidence': 'ratio',
+        'recommendation': "⚠️ 극도로 보수적 포지션 필요. 현금 확보 최우선. 2008년 금융위기 패턴 유사.",
+        'metadata': {
+            'conditions_met': 'conditions_met',
+            'crisis_level': {'tiers': [[3, 'severe'], [0, 'moderate']]}
+        }
+    },
+    {
+        'scenario': 'volatility_spike',
+        'params': 'volatility_spike',
+        'conditions': [
+            {'key': 'vix_change_1d', 'op': '>', 'param': 'vix_change_threshold', 'threshold': 20,
+             'trigger': "VIX 급등: +{vix_change_1d:.1f}% (현재: {vix:.1f})"}
+        ],
+        'min_conditions': 1,
+        'severity': 'warning',
+        'confidence': 0.8,
+        'recommendation': "단기 변동성 증가. 포지션 사이즈 축소 고려.",
+        'metadata': {'vix': {'key': 'vix'}, 'vix_change': {'key': 'vix_change_1d'}}
+    }
+]
+
+
+class CompiledScenario:
+    """One scenario with conditions resolved to state slots"""
+    
+    __slots__ = (
+        'name', 'checks', 'check_params', 'triggers', 'min_conditions', 'severity', 'confidence',
+        'recommendation', 'metadata', 'metadata_slots'
+    )
+    
+    def __init__(self, name: str, checks: List[Tuple], triggers: List[Tuple], min_conditions: int,
+                 severity: Tuple, confidence: Tuple, recommendation: str, metadata: Tuple, metadata_slots: Tuple,
+                 check_params: List[Tuple] = None):
+        self.name = name
+        self.checks = checks                  # per condition: ((slot, op, threshold), ...) all must hold
+        self.check_params = check_params      # per condition: ('section.param' or None per check)
+        self.triggers = triggers              # per condition: values -> trigger string
+        self.min_conditions = min_conditions
+        self.severity = severity              # conditions met -> severity
+        self.confidence = confidence          # conditions met -> confidence
+        self.recommendation = recommendation
+        self.metadata = metadata              # conditions met -> static metadata
+        self.metadata_slots = metadata_slots  # (name, slot) filled from state values
+
+
+class RuleEngine:
+    """
+    Evaluate declarative scenarios against a market state
+    
+    Scenarios are compiled once. Every state key used by any scenario gets
+    a slot, thresholds are resolved from config, and checks are grouped by
+    operator into (comparison, slots, thresholds) tuples. An evaluation
+    reads each distinct key from the state once, maps each comparison over
+    its group and combines the results per condition and scenario through
+    precomputed itemgetters. Triggers and metadata are formatted only for
+    scenarios that fire.
+    """
+    
+    def __init__(
+        self,
+        signal_class: type,
+        scenarios: List[Dict] = None,
+        params: Dict = None,
+        clock: Callable[[], datetime] = None
+    ):
+        """
+        Args:
+            signal_class: Signal type to build for fired scenarios
+            scenarios: Scenario definitions (default: DEFAULT_SCENARIOS)
+            params: Threshold sections keyed by each scenario's 'params'
+            clock: Source of signal timestamps (default: datetime.now)
+        """
+        self.signal_class = signal_class
+        self.params = params or {}
+        self.clock = clock or datetime.now
+        self._keys: List[str] = []
+        self._defaults: List[Any] = []
+        self._slots: Dict[str, int] = {}
+        self.scenarios = [self._compile(spec) for spec in (scenarios if scenarios is not None else DEFAULT_SCENARIOS)]
+        self._evaluate = self._compile_evaluator()
+    
+    def evaluate(self, state: Dict, timestamp: datetime = None) -> List:
+        """
+        Evaluate all scenarios
+        
+        Args:
+            state: Market state dictionary
+            timestamp: Signal timestamp (default: clock time per signal)
+            
+        Returns:
+            Signals for fired scenarios, in definition order
+        """
+        fired, values = self._evaluate(state)
+        return [
+            self._build_signal(self.scenarios[index], [i for i, flag in enumerate(flags) if flag], values, timestamp)
+            for index, flags in fired
+        ]
+    
+    def evaluate_frame(self, states: pd.DataFrame, include_triggers: bool = False) -> pd.DataFrame:
+        """
+        Evaluate all scenarios over a time series of market states
+        
+        Each condition is one elementwise comparison over a column, so the
+        cost is a handful of array operations per condition regardless of
+        the number of rows. Missing columns and NaN cells take the condition
+        default, matching evaluate() on the row's dict without that key (a
+        frame built from dicts with missing keys holds NaN there).
+        
+        Args:
+            states: One market state per row; a 'timestamp' column (or the
+                index) identifies the rows
+            include_triggers: Format trigger strings for fired rows
+            
+        Returns:
+            DataFrame with timestamp, scenario, severity, confidence and
+            conditions_met (and triggers) per fired (row, scenario), in row
+            then scenario order
+        """
+        n = len(states)
+        columns = self.frame_columns(states)
+        timestamps = states['timestamp'].to_numpy() if 'timestamp' in states.columns else states.index.to_numpy()
+        
+        rows = []
+        scenario_ids = []
+        counts = []
+        flag_arrays = []
+        for index, scenario in enumerate(self.scenarios):
+            flags = []
+            for checks in scenario.checks:
+                condition = np.ones(n, dtype=bool)
+                for slot, op_name, threshold in checks:
+                    with np.errstate(invalid='ignore'):
+                        condition &= np.asarray(ARRAY_OPERATORS[op_name](columns[slot], threshold), dtype=bool)
+                flags.append(condition)
+            
+            met = np.sum(flags, axis=0) if flags else np.zeros(n, dtype=int)
+            fired = np.flatnonzero(met >= scenario.min_conditions)
+            rows.append(fired)
+            scenario_ids.append(np.full(len(fired), index))
+            counts.append(met[fired])
+            flag_arrays.append(np.array(flags)[:, fired] if flags else np.zeros((0, len(fired)), dtype=bool))
+        
+        result_columns = ['timestamp', 'scenario', 'severity', 'confidence', 'conditions_met']
+        if include_triggers:
+            result_columns.append('triggers')
+        
+        all_rows = np.concatenate(rows) if rows else np.array([], dtype=int)
+        if len(all_rows) == 0:
+            return pd.DataFrame(columns=result_columns)
+        
+        all_scenarios = np.concatenate(scenario_ids)
+        all_counts = np.concatenate(counts)
+        order = np.lexsort((all_scenarios, all_rows))
+        all_rows, all_scenarios, all_counts = all_rows[order], all_scenarios[order], all_counts[order]
+        
+        result = pd.DataFrame({
+            'timestamp': timestamps[all_rows],
+            'scenario': [self.scenarios[index].name for index in all_scenarios],
+            'severity': [self.scenarios[index].severity[met] for index, met in zip(all_scenarios, all_counts)],
+            'confidence': [self.scenarios[index].confidence[met] for index, met in zip(all_scenarios, all_counts)],
+            'conditions_met': all_counts
+        })
+        
+        if include_triggers:
+            # Position of each fired (row, scenario) within its scenario's flag block
+            positions = np.concatenate([np.arange(len(fired)) for fired in rows])[order]
+            triggers = []
+            for row, index, position in zip(all_rows, all_scenarios, positions):
+                values = tuple(column[row] for column in columns)
+                scenario = self.scenarios[index]
+                triggers.append([
+                    scenario.triggers[condition](values)
+                    for condition in np.flatnonzero(flag_arrays[index][:, position])
+                ])
+            result['triggers'] = triggers
+        
+        return result
+    
+    def frame_columns(self, states: pd.DataFrame) -> List[np.ndarray]:
+        """
+        Slot values as arrays over a state frame
+        
+        Args:
+            states: One market state per row
+            
+        Returns:
+            One array per slot; missing columns and NaN cells hold the slot
+            default
+        """
+        n = len(states)
+        columns = []
+        for key, default in zip(self._keys, self._defaults):
+            if key not in states.columns:
+                columns.append(np.full(n, default, dtype=object if default is None else None))
+            elif default is None:
+                columns.append(states[key].to_numpy())
+            else:
+                columns.append(states[key].fillna(default).to_numpy())
+        return columns
+    
+    def _build_signal(self, scenario: CompiledScenario, met: List[int], values: Tuple, timestamp: Optional[datetime]):
+        """Format triggers and metadata for a fired scenario"""
+        conditions_met = len(met)
+        
+        triggers = [scenario.triggers[index](values) for index in met]
+        
+        metadata = dict(scenario.metadata[conditions_met])
+        for name, slot in scenario.metadata_slots:
+            metadata[name] = values[slot]
+        
+        return self.signal_class(
+            scenario=scenario.name,
+            severity=scenario.severity[conditions_met],
+            confidence=scenario.confidence[conditions_met],
+            triggers=triggers,
+            recommendation=scenario.recommendation,
+            timestamp=timestamp or self.clock(),
+            metadata=metadata
+        )
+    
+    def _compile_evaluator(self) -> Callable[[Dict], Tuple[List, Optional[Tuple]]]:
+        """
+        Build the evaluation function
+        
+        Checks are grouped by operator; each group is one map() of its
+        comparison over the group's slot values (gathered by an itemgetter)
+        and thresholds, so no Python-level call happens per check. Results
+        land in one list in group order. Conditions with several checks
+        ('all') get an extra position holding their conjunction, so every
+        condition reads a single result, and each scenario gathers its
+        condition results with an itemgetter.
+        
+        Returns:
+            Function mapping a state to ([(scenario index, per-condition
+            flags)], slot values or None if nothing fired)
+        """
+        keys = tuple(self._keys)
+        defaults = tuple(self._defaults)
+        
+        # op_name -> [(check id, slot, threshold)]
+        by_operator: Dict[str, List[Tuple]] = {}
+        conditions = []  # per scenario: per condition: check ids
+        check_id = 0
+        for scenario in self.scenarios:
+            scenario_conditions = []
+            for group in scenario.checks:
+                ids = []
+                for slot, op_name, threshold in group:
+                    by_operator.setdefault(op_name, []).append((check_id, slot, threshold))
+                    ids.append(check_id)
+                    check_id += 1
+                scenario_conditions.append(ids)
+            conditions.append(scenario_conditions)
+        
+        operator_groups = []  # (comparison or None, slot values getter, thresholds)
+        position_of = {}      # check id -> position in the results list
+        for op_name, entries in by_operator.items():
+            for entry in entries:
+                position_of[entry[0]] = len(position_of)
+            slots = [slot for _, slot, _ in entries]
+            operator_groups.append((
+                OPERATORS[op_name],
+                self._tuple_getter(slots),
+                tuple(threshold for _, _, threshold in entries)
+            ))
+        
+        conjunctions = []  # check results getters of multi-check conditions
+        plan = []          # (scenario index, flags getter, min_conditions)
+        for index, (scenario, scenario_conditions) in enumerate(zip(self.scenarios, conditions)):
+            positions = []
+            for ids in scenario_conditions:
+                if len(ids) == 1:
+                    positions.append(position_of[ids[0]])
+                else:
+                    positions.append(check_id + len(conjunctions))
+                    conjunctions.append(operator.itemgetter(*(position_of[i] for i in ids)))
+            plan.append((index, self._tuple_getter(positions), scenario.min_conditions))
+        
+        operator_groups = tuple(operator_groups)
+        conjunctions = tuple(conjunctions)
+        plan = tuple(plan)
+        
+        def evaluate(state: Dict) -> Tuple[List, Optional[Tuple]]:
+            values = tuple(map(state.get, keys, defaults))
+            results = []
+            for compare, gather, thresholds in operator_groups:
+                if compare is None:
+                    results.extend(map(bool, gather(values)))
+                else:
+                    results.extend(map(compare, gather(values), thresholds))
+            if conjunctions:
+                results.extend([all(gather(results)) for gather in conjunctions])
+            
+            fired = []
+            for index, gather, min_conditions in plan:
+                flags = gather(results)
+                if sum(flags) >= min_conditions:
+                    fired.append((index, flags))
+            return fired, (values if fired else None)
+        
+        return evaluate
+    
+    @staticmethod
+    def _tuple_getter(positions: List[int]) -> Callable[[Any], Tuple]:
+        """itemgetter that always returns a tuple"""
+        if len(positions) == 1:
+            position = positions[0]
+            return lambda items: (items[position],)
+        if not positions:
+            return lambda items: ()
+        return operator.itemgetter(*positions)
+    
+    def _slot(self, key: str, default: Any = 0) -> int:
+        """Slot index of a state key"""
+        if key not in self._slots:
+            self._slots[key] = len(self._keys)
+            self._keys.append(key)
+            self._defaults.append(default)
+        return self._slots[key]
+    
+    def _compile_check(self, condition: Dict, params: Dict) -> Tuple:
+        op_name = condition.get('op', '>')
+        if op_name not in OPERATORS:
+            raise ValueError(f"Unknown operator '{op_name}' for key '{condition.get('key')}'")
+        
+        threshold = condition.get('threshold')
+        if condition.get('param') in params:
+            threshold = params[condition['param']]
+        
+        return (self._slot(condition['key'], condition.get('default', 0)), op_name, threshold)
+    
+    def _compile(self, spec: Dict) -> CompiledScenario:
+        """Resolve one scenario definition"""
+        name = spec['scenario']
+        section = spec.get('params', name)
+        params = self.params.get(section, {}) or {}
+        
+        checks = []
+        check_params = []
+        triggers = []
+        for condition in spec['conditions']:
+            parts = condition['all'] if 'all' in condition else [condition]
+            checks.append(tuple(self._compile_check(part, params) for part in parts))
+            check_params.append(tuple(f"{section}.{part['param']}" if 'param' in part else None for part in parts))
+            
+            triggers.append(self._compile_trigger(condition.get('trigger', name)))
+        
+        # Everything that depends only on the number of conditions met is
+        # tabulated per count
+        counts = range(len(checks) + 1)
+        total = spec.get('total_conditions', len(checks))
+        
+        severity = spec.get('severity', 'warning')
+        if isinstance(severity, str):
+            severity_by_count = tuple(severity for _ in counts)
+        else:
+            tiers = [(int(minimum), level) for minimum, level in severity]
+            severity_by_count = tuple(next((level for minimum, level in tiers if met >= minimum), None) for met in counts)
+        
+        confidence = spec.get('confidence', 'ratio')
+        if confidence == 'ratio':
+            confidence_by_count = tuple(min(met / total, 1.0) for met in counts)
+        else:
+            confidence_by_count = tuple(float(confidence) for _ in counts)
+        
+        metadata_by_count = tuple({} for _ in counts)
+        metadata_slots = []
+        for field, source in (spec.get('metadata') or {}).items():
+            if isinstance(source, dict) and 'key' in source:
+                metadata_slots.append((field, self._slot(source['key'])))
+                continue
+            
+            for met in counts:
+                if source == 'conditions_met':
+                    value = met
+                elif source == 'total_conditions':
+                    value = total
+                elif isinstance(source, dict) and 'tiers' in source:
+                    value = next((level for minimum, level in source['tiers'] if met >= int(minimum)), None)
+                else:
+                    value = source
+                metadata_by_count[met][field] = value
+        
+        return CompiledScenario(
+            name=name,
+            checks=checks,
+            triggers=triggers,
+            min_conditions=spec.get('min_conditions', len(checks)),
+            severity=severity_by_count,
+            confidence=confidence_by_count,
+            recommendation=spec.get('recommendation', ''),
+            metadata=metadata_by_count,
+            metadata_slots=tuple(metadata_slots),
+            check_params=check_params
+        )
+    
+    def _compile_trigger(self, template: str) -> Callable[[Tuple], str]:
+        """
+        Compile a trigger template into a formatter over slot values
+        
+        The template is parsed once into (literal, slot, conversion, spec)
+        parts; the returned closure only calls format() per field.
+        
+        Args:
+            template: Format string over state keys, e.g. "VIX: {vix:.1f}"
+            
+        Returns:
+            Function mapping slot values to the trigger string
+        """
+        parts = []
+        for literal, field, format_spec, conversion in Formatter().parse(template):
+            if field is None:
+                parts.append((literal, None, None, ''))
+                continue
+            if '{' in (format_spec or ''):
+                raise ValueError(f"Nested format fields are not supported in trigger '{template}'")
+            parts.append((literal, self._slot(field), CONVERSIONS[conversion] if conversion else None, format_spec or ''))
+        parts = tuple(parts)
+        
+        def trigger(values: Tuple) -> str:
+            pieces = []
+            for literal, slot, convert, format_spec in parts:
+                pieces.append(literal)
+                if slot is not None:
+                    value = values[slot]
+                    pieces.append(format(convert(value) if convert else value, format_spec))
+            return ''.join(pieces)
+        
+        return trigger
+
+
+def merge_scenarios(defaults: List[Dict], overrides: List[Dict]) -> List[Dict]:
+    """
+    Apply configured scenarios over the defaults
+    
+    A configured scenario with the name of a default replaces it (with
+    enabled: false removing it); other scenarios are appended.
+    
+    Args:
+        defaults: Default scenario definitions
+        overrides: Scenario definitions from config
+        
+    Returns:
+        Merged scenario list
+    """
+    merged = [copy.deepcopy(spec) for spec in defaults]
+    positions = {spec['scenario']: i for i, spec in enumerate(merged)}
+    
+    for spec in overrides or []:
+        name = spec['scenario']
+        if name in positions:
+            merged[positions[name]] = spec
+        else:
+            positions[name] = len(merged)
+            merged.append(spec)
+    
+    return [spec for spec in merged if spec.get('enabled', True)]
@@ -0,0 +1,201 @@
+"""
+Scenario state tracking with hysteresis and change-only emission
+"""
+from typing import Any, Callable, Dict, List, Optional
+from dataclasses import dataclass, replace
+from datetime import datetime
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_ORDER = {'info': 0, 'warning': 1, 'critical': 2, 'emergency': 3}
+
+
+@dataclass
+class ScenarioState:
+    """Tracked state of one scenario"""
+    scenario: str
+    active: bool = False
+    severity: Optional[str] = None
+    since: Optional[datetime] = None   # activation time
+    last_signal: Optional[Any] = None
+    hits: int = 0                      # consecutive cycles fired
+    misses: int = 0                    # consecutive cycles not fired
+    lower: int = 0                     # consecutive cycles below the active severity
+
+
+class SignalStateStore:
+    """
+    Turn per-cycle scenario firings into state transitions
+    
+    A scenario activates after firing ``enter_cycles`` consecutive cycles
+    and clears after ``exit_cycles`` consecutive cycles without firing, so a
+    condition flickering around its threshold does not toggle the state.
+    While active, an escalation is emitted at once and a de-escalation only
+    after ``exit_cycles`` cycles at the lower severity. Cycles that change
+    nothing emit nothing, so a regime holding for hours produces one signal
+    instead of one per cycle.
+    
+    Emitted signals are copies of the fired ones with 'transition'
+    ('activated', 'severity_changed' or 'cleared'), 'previous_severity' and
+    'active_since' added to their metadata. A cleared signal repeats the last
+    active signal with severity 'info', no triggers and zero confidence.
+    
+    Cycles may be evaluated concurrently (the analyze stage runs several
+    workers), so a cycle carrying a timestamp older than the newest one
+    applied is stale: it is counted in ``stale_cycles`` and ignored.
+    """
+    
+    def __init__(self, enter_cycles: int = 1, exit_cycles: int = 3, clock: Callable[[], datetime] = None):
+        self.enter_cycles = max(enter_cycles, 1)
+        self.exit_cycles = max(exit_cycles, 1)
+        self.clock = clock or datetime.now
+        self.states: Dict[str, ScenarioState] = {}
+        self.stale_cycles = 0
+        self._last_cycle: Optional[datetime] = None
+        self._lock = threading.Lock()
+    
+    def update(self, signals: List, timestamp: datetime = None) -> List:
+        """
+        Apply one evaluation cycle
+        
+        Args:
+            signals: Signals fired this cycle (at most one per scenario)
+            timestamp: Cycle time, used to drop out-of-order cycles and as
+                the time of cleared signals (default: clock time, no
+                ordering check)
+            
+        Returns:
+            Signals for scenarios that activated, changed severity or cleared
+            (none for a stale cycle)
+        """
+        fired = {signal.scenario: signal for signal in signals}
+        transitions = []
+        
+        with self._lock:
+            if timestamp is not None:
+                if self._last_cycle is not None and timestamp < self._last_cycle:
+                    self.stale_cycles += 1
+                    logger.debug(f"Ignoring stale signal cycle {timestamp} (last applied {self._last_cycle})")
+                    return []
+                self._last_cycle = timestamp
+            
+            for scenario, signal in fired.items():
+                if scenario not in self.states:
+                    self.states[scenario] = ScenarioState(scenario=scenario)
+            
+            for scenario, state in self.states.items():
+                signal = fired.get(scenario)
+                transition = self._fired(state, signal) if signal is not None else self._missed(state, timestamp)
+                if transition is not None:
+                    transitions.append(transition)
+        
+        if transitions:
+            logger.info(f"Signal state changes: {[(s.scenario, s.metadata['transition']) for s in transitions]}")
+        return transitions
+    
+    def active_signals(self) -> List:
+        """
+        Latest signal of every active scenario
+        
+        Returns:
+            Signals, one per active scenario
+        """
+        with self._lock:
+            return [state.last_signal for state in self.states.values() if state.active]
+    
+    def get_state(self, scenario: str) -> Optional[ScenarioState]:
+        """
+        Get the tracked state of a scenario
+        
+        Args:
+            scenario: Scenario name
+            
+        Returns:
+            ScenarioState or None if never fired
+        """
+        return self.states.get(scenario)
+    
+    def reset(self):
+        """Forget all scenario states"""
+        with self._lock:
+            self.states.clear()
+            self._last_cycle = None
+    
+    def _fired(self, state: ScenarioState, signal) -> Optional[Any]:
+        """Handle a cycle in which the scenario fired"""
+        state.hits += 1
+        state.misses = 0
+        
+        if not state.active:
+            if state.hits < self.enter_cycles:
+                return None
+            state.active = True
+            state.since = signal.timestamp
+            state.lower = 0
+            return self._transition(state, signal, 'activated', None)
+        
+        rank = SEVERITY_ORDER.get(signal.severity, 0)
+        current = SEVERITY_ORDER.get(state.severity, 0)
+        
+        if rank > current:
+            state.lower = 0
+            return self._transition(state, signal, 'severity_changed', state.severity)
+        
+        if rank < current:
+            # Keep the higher-severity signal until the de-escalation is
+            # confirmed, so active_signals() agrees with state.severity
+            state.lower += 1
+            if state.lower >= self.exit_cycles:
+                state.lower = 0
+                return self._transition(state, signal, 'severity_changed', state.severity)
+            return None
+        
+        state.lower = 0
+        state.last_signal = signal
+        return None
+    
+    def _missed(self, state: ScenarioState, timestamp: datetime) -> Optional[Any]:
+        """Handle a cycle in which the scenario did not fire"""
+        state.hits = 0
+        state.misses += 1
+        
+        if not state.active or state.misses < self.exit_cycles:
+            return None
+        
+        previous = state.last_signal
+        cleared = replace(
+            previous,
+            severity='info',
+            confidence=0.0,
+            triggers=[],
+            timestamp=timestamp or self.clock(),
+            metadata={
+                **previous.metadata,
+                'transition': 'cleared',
+                'previous_severity': state.severity,
+                'active_since': state.since
+            }
+        )
+        
+        state.active = False
+        state.severity = None
+        state.since = None
+        state.lower = 0
+        state.last_signal = cleared
+        return cleared
+    
+    def _transition(self, state: ScenarioState, signal, transition: str, previous_severity: Optional[str]):
+        """Record a new active signal and build its emitted copy"""
+        state.severity = signal.severity
+        state.last_signal = signal
+        return replace(
+            signal,
+            metadata={
+                **signal.metadata,
+                'transition': transition,
+                'previous_severity': previous_severity,
+                'active_since': state.since
+            }
+        )
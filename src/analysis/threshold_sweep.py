@@ -0,0 +1,266 @@
+"""
+Vectorized threshold and weight sensitivity sweeps over state histories
+"""
+from typing import Dict, List, Optional, Sequence
+from itertools import product
+import numpy as np
+import pandas as pd
+import logging
+from .rule_engine import ARRAY_OPERATORS
+from .risk_scorer import RISK_COMPONENTS
+
+logger = logging.getLogger(__name__)
+
+
+class ThresholdSweep:
+    """
+    Evaluate grids of signal thresholds and risk weights over history
+    
+    Every swept check is compared against each of its candidate thresholds
+    once, giving one boolean mask per value; a grid point then only gathers
+    and combines masks, and grid points are evaluated as (points x rows)
+    arrays in blocks bounded by ``max_cells``. Scenarios are evaluated only
+    over the parameters they actually use, so a grid spanning several
+    scenarios does not multiply work.
+    
+    For each configuration the report holds fired rows, alerts (firing
+    episodes, i.e. rising edges) and, when reference events are given, the
+    share of events preceded by a firing within ``horizon`` (hit_rate), the
+    median lead of the first such firing and the share of alerts followed
+    by an event within ``horizon`` (precision).
+    """
+    
+    def __init__(self, signal_generator=None, risk_scorer=None, horizon: str = '1D', max_cells: int = 20_000_000):
+        """
+        Args:
+            signal_generator: SignalGenerator whose scenarios are swept
+            risk_scorer: RiskScorer whose components are reweighted
+            horizon: Lookback/lookahead window linking firings and events
+            max_cells: Grid points x rows evaluated per block
+        """
+        self.signal_generator = signal_generator
+        self.risk_scorer = risk_scorer
+        self.horizon = pd.Timedelta(horizon)
+        self.max_cells = max_cells
+    
+    def sweep_signals(
+        self,
+        states: pd.DataFrame,
+        grid: Dict[str, Sequence[float]],
+        events=None,
+        scenarios: List[str] = None
+    ) -> pd.DataFrame:
+        """
+        Sweep scenario thresholds
+        
+        Args:
+            states: Market states, one row per timestamp ('timestamp' column
+                or index), sorted by time
+            grid: 'section.param' (e.g. 'risk_off.vix_threshold') ->
+                candidate values
+            events: Reference event timestamps, or a boolean mask over rows
+            scenarios: Scenarios to report (default: those using a swept param)
+            
+        Returns:
+            One row per scenario and combination of the params it uses
+            
+        Raises:
+            ValueError: No signal_generator was given
+        """
+        if self.signal_generator is None:
+            raise ValueError("sweep_signals needs a signal_generator")
+        
+        engine = self.signal_generator.rule_engine
+        columns = engine.frame_columns(states)
+        times = self._times(states)
+        event_rows = self._event_rows(events, times)
+        
+        used = {param for scenario in engine.scenarios for names in scenario.check_params for param in names if param}
+        unknown = set(grid) - used
+        if unknown:
+            raise ValueError(f"Parameters not used by any scenario: {sorted(unknown)}")
+        
+        reports = []
+        for scenario in engine.scenarios:
+            params = [param for param in grid if any(param in names for names in scenario.check_params)]
+            if scenarios is not None:
+                if scenario.name not in scenarios:
+                    continue
+            elif not params:
+                continue
+            
+            # One mask per candidate value of each swept check, one for fixed checks
+            conditions = []
+            for checks, names in zip(scenario.checks, scenario.check_params):
+                parts = []
+                for (slot, op_name, threshold), param in zip(checks, names):
+                    values = grid[param] if param in grid else [threshold]
+                    with np.errstate(invalid='ignore'):
+                        masks = np.stack([
+                            np.asarray(ARRAY_OPERATORS[op_name](columns[slot], value), dtype=bool)
+                            for value in values
+                        ])
+                    parts.append((params.index(param) if param in grid else None, masks))
+                conditions.append(parts)
+            
+            if params:
+                combos = np.array(list(product(*[range(len(grid[param])) for param in params])), dtype=np.intp)
+            else:
+                # Requested scenario without swept params: baseline thresholds only
+                combos = np.zeros((1, 0), dtype=np.intp)
+            
+            def fired_block(block: np.ndarray) -> np.ndarray:
+                met = np.zeros((len(block), len(times)), dtype=np.int16)
+                for parts in conditions:
+                    flag = np.ones((len(block), len(times)), dtype=bool)
+                    for position, masks in parts:
+                        flag &= masks[block[:, position]] if position is not None else masks[0]
+                    met += flag
+                return met >= scenario.min_conditions
+            
+            metrics = self._evaluate_blocks(combos, fired_block, times, event_rows)
+            report = pd.DataFrame(
+                {param: np.asarray(grid[param])[combos[:, i]] for i, param in enumerate(params)},
+                index=pd.RangeIndex(len(combos))
+            )
+            report.insert(0, 'scenario', scenario.name)
+            reports.append(pd.concat([report, pd.DataFrame(metrics)], axis=1))
+        
+        if not reports:
+            return pd.DataFrame()
+        
+        result = pd.concat(reports, ignore_index=True)
+        swept = [param for param in grid if param in result.columns]
+        result = result[['scenario'] + swept + [column for column in result.columns if column not in swept and column != 'scenario']]
+        logger.info(f"Swept {len(result)} scenario configurations over {len(times)} states")
+        return result
+    
+    def sweep_risk_weights(
+        self,
+        states: pd.DataFrame,
+        weights: Dict[str, Sequence[float]],
+        thresholds: Sequence[float] = (60,),
+        events=None
+    ) -> pd.DataFrame:
+        """
+        Sweep RiskScorer component weights and the alerting score threshold
+        
+        Component scores are computed once; every weight vector is one
+        matrix product over them.
+        
+        Args:
+            states: Market states, one row per timestamp, sorted by time
+            weights: Component -> candidate weights (components not listed
+                keep the scorer's weight)
+            thresholds: Total scores above which the state counts as firing
+                (60 is the HIGH level)
+            events: Reference event timestamps, or a boolean mask over rows
+            
+        Returns:
+            One row per weight vector and threshold
+            
+        Raises:
+            ValueError: No risk_scorer was given
+        """
+        if self.risk_scorer is None:
+            raise ValueError("sweep_risk_weights needs a risk_scorer")
+        
+        unknown = set(weights) - set(RISK_COMPONENTS)
+        if unknown:
+            raise ValueError(f"Unknown risk components: {sorted(unknown)}")
+        
+        size = len(states)
+        names = list(RISK_COMPONENTS)
+        scores = np.stack([self.risk_scorer.score_component_array(name, states, size) for name in names])
+        times = self._times(states)
+        event_rows = self._event_rows(events, times)
+        
+        candidates = [weights.get(name, [self.risk_scorer.weights[name]]) for name in names]
+        grid = np.array(list(product(*candidates, thresholds)), dtype=float)
+        vectors, limits = grid[:, :-1], grid[:, -1]
+        
+        def fired_block(block: np.ndarray) -> np.ndarray:
+            points = block[:, 0]
+            # Same component order as RiskScorer, summed term by term
+            total = np.zeros((len(points), size))
+            for i in range(len(names)):
+                total += vectors[points, i][:, None] * scores[i]
+            return total > limits[points][:, None]
+        
+        metrics = self._evaluate_blocks(np.arange(len(grid))[:, None], fired_block, times, event_rows)
+        report = pd.DataFrame(vectors, columns=[f'w_{name}' for name in names])
+        report['threshold'] = limits
+        
+        result = pd.concat([report, pd.DataFrame(metrics)], axis=1)
+        logger.info(f"Swept {len(result)} risk weight configurations over {size} states")
+        return result
+    
+    def _evaluate_blocks(self, combos: np.ndarray, fired_block, times: np.ndarray, event_rows: Optional[np.ndarray]) -> Dict:
+        """Run fired_block over grid blocks and collect metrics"""
+        block_size = max(1, self.max_cells // max(len(times), 1))
+        parts = [
+            self._metrics(fired_block(combos[start:start + block_size]), times, event_rows)
+            for start in range(0, len(combos), block_size)
+        ]
+        return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]} if parts else {}
+    
+    def _metrics(self, fired: np.ndarray, times: np.ndarray, event_rows: Optional[np.ndarray]) -> Dict[str, np.ndarray]:
+        """Firing statistics per grid point of a (points x rows) mask"""
+        starts = fired.copy()
+        starts[:, 1:] &= ~fired[:, :-1]
+        fired_rows = fired.sum(axis=1)
+        alerts = starts.sum(axis=1)
+        
+        metrics = {
+            'fired_rows': fired_rows,
+            'fire_rate': fired_rows / max(fired.shape[1], 1),
+            'alerts': alerts
+        }
+        if event_rows is None:
+            return metrics
+        
+        # Lookahead: is an event within the horizon after each row
+        event_times = times[event_rows]
+        following = np.searchsorted(event_times, times, side='left')
+        ahead = np.searchsorted(event_times, times + self.horizon.value, side='right')
+        followed = ahead > following
+        
+        hits = np.zeros(len(fired), dtype=np.int64)
+        leads = np.full((len(fired), len(event_rows)), np.nan)
+        window_starts = np.searchsorted(times, event_times - self.horizon.value, side='left')
+        for index, (start, row) in enumerate(zip(window_starts, event_rows)):
+            window = fired[:, start:row + 1]
+            covered = window.any(axis=1)
+            first = start + window.argmax(axis=1)
+            hits += covered
+            leads[covered, index] = times[row] - times[first[covered]]
+        
+        with np.errstate(invalid='ignore'):
+            metrics['hits'] = hits
+            metrics['hit_rate'] = hits / len(event_rows) if len(event_rows) else np.full(len(fired), np.nan)
+            metrics['precision'] = np.where(alerts > 0, (starts & followed).sum(axis=1) / np.maximum(alerts, 1), np.nan)
+        metrics['median_lead'] = pd.to_timedelta(
+            np.array([np.median(row[~np.isnan(row)]) if (~np.isnan(row)).any() else np.nan for row in leads]),
+            unit='ns'
+        )
+        return metrics
+    
+    @staticmethod
+    def _times(states: pd.DataFrame) -> np.ndarray:
+        """Row timestamps as int64 nanoseconds"""
+        timestamps = states['timestamp'] if 'timestamp' in states.columns else states.index.to_series()
+        return pd.to_datetime(timestamps).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    
+    @staticmethod
+    def _event_rows(events, times: np.ndarray) -> Optional[np.ndarray]:
+        """Rows of reference events (last row at or before each event time)"""
+        if events is None:
+            return None
+        
+        events = np.asarray(events)
+        if events.dtype == bool:
+            return np.flatnonzero(events)
+        
+        event_times = pd.to_datetime(events).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        rows = np.searchsorted(times, np.sort(event_times), side='right') - 1
+        return np.unique(rows[rows >= 0])
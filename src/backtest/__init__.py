@@ -0,0 +1,10 @@
+"""Backtest package"""
+from .clock import SimulatedClock
+from .runner import BacktestRunner, BacktestResult, load_history
+
+__all__ = [
+    'SimulatedClock',
+    'BacktestRunner',
+    'BacktestResult',
+    'load_history'
+]
@@ -0,0 +1,48 @@
+"""
+Simulated clock for replaying history
+"""
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SimulatedClock:
+    """
+    Clock driven by replayed data instead of wall time
+    
+    Instances are callable, so they can be passed wherever a component
+    takes ``clock`` (a zero-argument callable returning a datetime) in
+    place of ``datetime.now``. Time never moves backwards.
+    """
+    
+    def __init__(self, start: datetime = None):
+        self.current = start  # None until the first set()
+    
+    def __call__(self) -> datetime:
+        return self.current
+    
+    def now(self) -> datetime:
+        """Current simulated time"""
+        return self.current
+    
+    def set(self, timestamp: datetime):
+        """
+        Move the clock to a timestamp
+        
+        Args:
+            timestamp: New time; earlier times are ignored
+        """
+        if self.current is not None and timestamp < self.current:
+            logger.debug(f"Ignoring clock move back from {self.current} to {timestamp}")
+            return
+        self.current = timestamp
+    
+    def advance(self, delta: timedelta):
+        """
+        Move the clock forward
+        
+        Args:
+            delta: Time to add
+        """
+        self.set(self.current + delta)
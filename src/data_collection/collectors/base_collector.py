@@ -12,7 +12,16 @@ logger = logging.getLogger(__name__)
 
 @dataclass
 class MarketData:
-    """Market data structure"""
+    """
+    Market data structure
+    
+    ``volume`` is the volume of the source bar starting at ``bar_timestamp``
+    as of this point. Collectors polling a bar that is still forming (Yahoo's
+    latest 1-minute bar) report its running total again on every poll, so
+    consumers take the increase over the previous report of the same source
+    bar. Without ``bar_timestamp`` the volume is what traded since the
+    symbol's previous point.
+    """
     symbol: str
     timestamp: datetime
     price: float
@@ -24,6 +33,7 @@ class MarketData:
     open: Optional[float] = None
     close: Optional[float] = None
     metadata: Optional[Dict] = None
+    bar_timestamp: Optional[datetime] = None  # start of the source bar 'volume' belongs to
 
 
 class BaseCollector(ABC):
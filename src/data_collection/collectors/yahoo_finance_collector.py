@@ -87,7 +87,9 @@ class YahooFinanceCollector(BaseCollector):
                 'source': 'yahoo_finance',
                 'market_cap': info.get('marketCap'),
                 'currency': info.get('currency', 'USD')
-            }
+            },
+            # Volume so far of the latest 1-minute bar, repeated until it closes
+            bar_timestamp=hist.index[-1].to_pydatetime()
         )
     
     async def validate_connection(self) -> bool:
@@ -10,6 +10,15 @@ import yaml
 import logging
 from .collectors.yahoo_finance_collector import YahooFinanceCollector
 from .collectors.fred_collector import FREDCollector
+from ..processing.stream_processor import StreamProcessor
+from ..processing.sharded_processor import ShardedStreamProcessor
+from ..analysis.anomaly_detector import AnomalyDetector
+from ..analysis.signal_generator import SignalGenerator
+from ..analysis.risk_scorer import RiskScorer
+from ..alerts.alert_engine import AlertEngine
+from ..alerts.notifiers.slack_notifier import SlackNotifier
+from ..alerts.notifiers.email_notifier import EmailNotifier
+from ..pipeline.market_pipeline import build_market_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +29,10 @@ class DataScheduler:
     def __init__(self, config_path: str = "config/config.yaml", secrets_path: str = "config/secrets.yaml"):
         self.scheduler = AsyncIOScheduler()
         self.collectors = {}
+        self.pipeline = None
+        self.stream_processor = None
+        self.anomaly_detector = None
+        self.alert_engine = None
         
         # Load configuration
         with open(config_path, 'r') as f:
@@ -33,6 +46,8 @@ class DataScheduler:
             self.secrets = {}
         
         self._initialize_collectors()
+        if 'pipeline' in self.config:
+            self._initialize_pipeline()
     
     def _initialize_collectors(self):
         """Initialize data collectors"""
@@ -50,6 +65,121 @@ class DataScheduler:
         else:
             logger.warning("FRED API key not found, FRED collector disabled")
     
+    def _initialize_pipeline(self):
+        """Build the processing pipeline described by the 'pipeline' config section"""
+        processing = self.config.get('processing', {})
+        analysis = self.config.get('analysis', {})
+        stream_config = processing.get('stream', {})
+        
+        stream_options = {
+            'window_size': stream_config.get('window_size', 100),
+            'snapshot_path': stream_config.get('snapshot_path'),
+            'snapshot_interval': stream_config.get('snapshot_interval', 60),
+            'sketch_k': stream_config.get('sketch_k', 200),
+            'scoring': stream_config.get('scoring', 'zscore')
+        }
+        shards = stream_config.get('shards', 1)
+        if shards > 1:
+            self.stream_processor = ShardedStreamProcessor(num_shards=shards, **stream_options)
+        else:
+            self.stream_processor = StreamProcessor(**stream_options)
+        self.anomaly_detector = AnomalyDetector(analysis.get('anomaly_detection', {}))
+        self.alert_engine = AlertEngine(self.config.get('alerts', {}))
+        for name, notifier in self._create_notifiers().items():
+            self.alert_engine.register_notifier(name, notifier)
+        
+        self.pipeline = build_market_pipeline(
+            self.stream_processor,
+            SignalGenerator(analysis.get('signal_generation', {})),
+            RiskScorer(analysis.get('risk_scoring', {})),
+            self.alert_engine,
+            config=self.config['pipeline'],
+            anomaly_detector=self.anomaly_detector,
+            processing=processing,
+            symbols=self.realtime_symbols()
+        )
+    
+    def _create_notifiers(self) -> Dict:
+        """
+        Create notifiers for enabled alert channels with credentials
+        
+        Returns:
+            Channel name -> notifier
+        """
+        channels = self.config.get('alerts', {}).get('channels', {})
+        credentials = self.secrets.get('notifications', {})
+        notifiers = {}
+        
+        slack = credentials.get('slack', {})
+        if channels.get('slack', {}).get('enabled') and slack.get('webhook_url'):
+            notifiers['slack'] = SlackNotifier(
+                slack['webhook_url'],
+                channel=slack.get('channel'),
+                username=slack.get('username', "Money Flow Bot")
+            )
+        
+        email = credentials.get('email', {})
+        if channels.get('email', {}).get('enabled') and email.get('smtp_server'):
+            notifiers['email'] = EmailNotifier(
+                email['smtp_server'],
+                email.get('smtp_port', 587),
+                email.get('username'),
+                email.get('password'),
+                email.get('from_address'),
+                email.get('to_addresses', []),
+                use_tls=email.get('use_tls', True)
+            )
+        
+        for name in channels:
+            if channels[name].get('enabled') and name not in notifiers:
+                logger.warning(f"Alert channel '{name}' enabled but not configured in secrets, disabled")
+        
+        return notifiers
+    
+    def attach_pipeline(self, pipeline):
+        """
+        Forward real-time collections to a processing pipeline
+        
+        Args:
+            pipeline: Started Pipeline instance
+        """
+        self.pipeline = pipeline
+        logger.info("Attached processing pipeline")
+    
+    async def start_pipeline(self):
+        """Start the pipeline built from config (call from the event loop)"""
+        if self.pipeline is not None:
+            await self.pipeline.start()
+    
+    async def stop_pipeline(self):
+        """Drain and stop the pipeline, then flush stream state, model fits and queued alerts"""
+        if self.pipeline is not None:
+            await self.pipeline.stop()
+        if self.stream_processor is not None:
+            self.stream_processor.close()
+        if self.anomaly_detector is not None and self.anomaly_detector.model_manager is not None:
+            self.anomaly_detector.model_manager.close()
+        if self.alert_engine is not None:
+            self.alert_engine.shutdown()
+    
+    def realtime_symbols(self) -> List[str]:
+        """
+        Symbols collected every real-time cycle
+        
+        Returns:
+            ETF, forex, volatility and commodity symbols from config
+        """
+        symbols = self.config['data_collection']['symbols']
+        return (
+            symbols['etf_equity'] +
+            symbols['etf_bonds'] +
+            symbols['etf_sectors'] +
+            symbols['etf_international'] +
+            symbols['forex'] +
+            symbols['volatility'] +
+            symbols.get('commodities', [])
+        )
+    
     def start(self):
         """Start the scheduler"""
         # Real-time data collection (every minute)
@@ -94,26 +224,16 @@ class DataScheduler:
         logger.info("Starting real-time data collection")
         
         try:
-            # Collect ETF data
-            etf_symbols = (
-                self.config['data_collection']['symbols']['etf_equity'] +
-                self.config['data_collection']['symbols']['etf_bonds'] +
-                self.config['data_collection']['symbols']['etf_sectors'] +
-                self.config['data_collection']['symbols']['etf_international']
-            )
-            
-            # Collect forex data
-            forex_symbols = self.config['data_collection']['symbols']['forex']
-            
-            # Collect volatility data
-            vol_symbols = self.config['data_collection']['symbols']['volatility']
-            
-            all_symbols = etf_symbols + forex_symbols + vol_symbols
+            all_symbols = self.realtime_symbols()
             
             if 'yahoo' in self.collectors:
                 data = await self.collectors['yahoo'].collect(all_symbols)
                 logger.info(f"Collected {len(data)} real-time data points")
                 
+                # Hand off to the processing pipeline
+                if self.pipeline and data:
+                    await self.pipeline.submit(data)
+                
                 # TODO: Store data in database
                 # await self._store_data(data)
             
@@ -186,14 +306,16 @@ async def main():
     )
     
     scheduler = DataScheduler()
+    await scheduler.start_pipeline()
     scheduler.start()
     
     try:
         # Keep running
         while True:
             await asyncio.sleep(1)
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
         scheduler.stop()
+        await scheduler.stop_pipeline()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+"""
+Counters and latency percentiles shared by pipeline stages and alert channels
+"""
+from typing import Dict
+from collections import deque
+import numpy as np
+
+
+class StageMetrics:
+    """Counters and recent latencies for one stage"""
+    
+    def __init__(self, latency_window: int = 1000):
+        self.processed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=latency_window)  # seconds
+    
+    def record(self, latency: float, error: bool = False):
+        """Record one handled item"""
+        self.processed += 1
+        self.errors += int(error)
+        self.latencies.append(latency)
+    
+    def summary(self) -> Dict:
+        """Latency percentiles (ms) and counters"""
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            'processed': self.processed,
+            'errors': self.errors,
+            'dropped': self.dropped,
+            'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+            'latency_p99_ms': float(np.percentile(latencies, 99)),
+            'latency_max_ms': float(latencies.max())
+        }
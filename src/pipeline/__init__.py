@@ -0,0 +1,10 @@
+"""Pipeline package"""
+from .runtime import Pipeline, Stage, StageMetrics
+from .market_pipeline import build_market_pipeline
+
+__all__ = [
+    'Pipeline',
+    'Stage',
+    'StageMetrics',
+    'build_market_pipeline'
+]
@@ -0,0 +1,223 @@
+"""
+Market pipeline wiring collection output to alert dispatch
+"""
+from typing import Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+from functools import partial
+import pandas as pd
+import logging
+from ..processing.bar_aggregator import BarAggregator, INTERVAL_SECONDS
+from ..processing.market_state import build_state_builder
+from .runtime import Pipeline, Stage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGE_CONFIG = {
+    'process': {'workers': 1, 'queue_size': 10, 'executor': 'thread', 'overflow': 'drop_oldest'},
+    'anomalies': {'workers': 1, 'queue_size': 10, 'executor': 'thread', 'overflow': 'drop_oldest'},
+    'analyze': {'workers': 2, 'queue_size': 10, 'executor': 'thread', 'overflow': 'block'},
+    'alerts': {'workers': 1, 'queue_size': 50, 'executor': 'thread', 'overflow': 'drop_oldest'}
+}
+
+# Default anomaly frame: trailing closed bars of this interval, one close column per symbol
+DEFAULT_ANOMALY_FRAME = {'interval': '1m', 'window': 200}
+
+
+def latest_prices_state(batch: List) -> Dict:
+    """Default market state: latest price per symbol of the batch"""
+    return {data.symbol: data.price for data in batch}
+
+
+def process_ticks(stream_processor, state_builder: Callable, batch: List, bar_aggregator=None, clock: Callable = None) -> Dict:
+    """
+    Run a collected batch through the stream processor
+    
+    Args:
+        stream_processor: StreamProcessor or ShardedStreamProcessor (the
+            batch is processed with one process_batch call)
+        state_builder: Callable turning the batch into a market_state dict
+        batch: List of MarketData
+        bar_aggregator: Optional BarAggregator fed with every tick
+        clock: Source of the payload timestamp (default: datetime.now)
+        
+    Returns:
+        Pipeline payload for downstream stages
+    """
+    processed = stream_processor.process_batch([(data.symbol, data.price, data.timestamp) for data in batch])
+    bars = []
+    if bar_aggregator is not None:
+        for data in batch:
+            bars.extend(bar_aggregator.add_market_data(data))
+    
+    return {
+        'timestamp': (clock or datetime.now)(),
+        'market_data': batch,
+        'processed': processed,
+        'bars': bars,
+        'market_state': state_builder(batch)
+    }
+
+
+def detect_anomalies(anomaly_detector, frame_builder: Callable, payload: Dict, stream_id: str = 'market') -> Dict:
+    """
+    Attach AnomalyDetector results for the frame built from the payload
+    
+    Successive frames are windows of one stream, so with a stable
+    ``stream_id`` (and a timestamp column) the detector scores only the rows
+    added since the previous cycle.
+    """
+    frame = frame_builder(payload)
+    payload['anomalies'] = anomaly_detector.detect_anomalies(frame, stream_id=stream_id) if frame is not None else []
+    return payload
+
+
+def bar_window_builder(bar_aggregator: BarAggregator, interval: str, window: int, symbols: List[str] = None) -> Callable:
+    """
+    Anomaly frame builder over trailing closed bars
+    
+    Only bars that had closed by the payload's newest tick are used, so a
+    row never changes once it appeared (incremental scoring by timestamp
+    stays valid) and a payload queued behind later batches does not see
+    their bars.
+    
+    Args:
+        bar_aggregator: BarAggregator fed by the process stage
+        interval: Bar interval of the frame rows
+        window: Trailing bars per frame
+        symbols: Columns of the frame (default: every symbol with closed bars)
+        
+    Returns:
+        Callable turning a payload into a frame with a timestamp column and
+        one forward-filled close column per symbol (None before any bar closed)
+    """
+    length = timedelta(seconds=INTERVAL_SECONDS[interval])
+    
+    def build(payload: Dict) -> Optional[pd.DataFrame]:
+        cutoff = max((data.timestamp for data in payload.get('market_data', [])), default=None)
+        if cutoff is None:
+            return None
+        
+        names = symbols or sorted({symbol for symbol, bar_interval in list(bar_aggregator.closed_bars) if bar_interval == interval})
+        closes = {}
+        for symbol in names:
+            bars = bar_aggregator.get_bars(symbol, interval)
+            if bars.empty:
+                continue
+            bars = bars[bars['timestamp'] + length <= cutoff].tail(window)
+            if not bars.empty:
+                closes[symbol] = bars.set_index('timestamp')['close']
+        
+        if not closes:
+            return None
+        frame = pd.DataFrame(closes).sort_index().ffill().tail(window)
+        return frame.rename_axis('timestamp').reset_index()
+    
+    return build
+
+
+def analyze_market_state(signal_generator, risk_scorer, payload: Dict) -> Dict:
+    """
+    Attach signals and risk score for the payload's market state
+    
+    The payload timestamp lets stateful generators and scorers ignore
+    cycles that a concurrent worker finished after a newer one.
+    """
+    payload['signals'] = signal_generator.generate_signals(payload['market_state'], timestamp=payload['timestamp'])
+    payload['risk'] = risk_scorer.calculate_risk_score(payload['market_state'], timestamp=payload['timestamp'])
+    return payload
+
+
+def dispatch_alerts(alert_engine, payload: Dict) -> Dict:
+    """Evaluate and dispatch alerts for the payload's signals"""
+    payload['alerts'] = alert_engine.evaluate_alerts(payload['signals'])
+    return payload
+
+
+def build_market_pipeline(
+    stream_processor,
+    signal_generator,
+    risk_scorer,
+    alert_engine,
+    config: Dict = None,
+    state_builder: Callable = None,
+    anomaly_detector=None,
+    frame_builder: Callable = None,
+    bar_aggregator=None,
+    clock: Callable = None,
+    processing: Dict = None,
+    symbols: List[str] = None
+) -> Pipeline:
+    """
+    Build the collection -> processing -> analysis -> alert pipeline
+    
+    Args:
+        stream_processor: StreamProcessor instance
+        signal_generator: SignalGenerator instance
+        risk_scorer: RiskScorer instance
+        alert_engine: AlertEngine instance
+        config: 'pipeline' config section (per-stage workers, queue_size,
+            executor, overflow; process_workers; anomaly_frame interval and
+            window)
+        state_builder: Callable turning a MarketData batch into market_state
+            (default: build_state_builder(processing), subscribed to
+            bar_aggregator when it produces the state's interval)
+        anomaly_detector: Optional AnomalyDetector
+        frame_builder: Callable turning a payload into the DataFrame scanned
+            by the anomaly detector (default: bar_window_builder over
+            config['anomaly_frame'] interval and window)
+        bar_aggregator: Optional BarAggregator; bars closed by each batch
+            are attached to the payload as 'bars' (default: one built from
+            processing.bars when present, or one for the anomaly frame
+            interval when the default frame builder needs it)
+        clock: Source of payload timestamps (default: datetime.now)
+        processing: 'processing' config section (market_state, correlation,
+            bars)
+        symbols: Symbols the pipeline is fed (e.g.
+            DataScheduler.realtime_symbols()); the default state builder
+            logs the derived keys they cannot produce
+            
+    Returns:
+        Pipeline (not started)
+    """
+    config = config or {}
+    stage_config = config.get('stages', {})
+    
+    def stage(name: str, handler: Callable) -> Stage:
+        options = {**DEFAULT_STAGE_CONFIG[name], **stage_config.get(name, {})}
+        return Stage(name, handler, **options)
+    
+    processing = processing or {}
+    bar_config = processing.get('bars')
+    if bar_aggregator is None and bar_config:
+        bar_aggregator = BarAggregator(intervals=bar_config.get('intervals'), max_bars=bar_config.get('max_bars', 500))
+    
+    if anomaly_detector is not None and frame_builder is None:
+        frame_config = config.get('anomaly_frame', {})
+        interval = frame_config.get('interval') or (bar_aggregator.intervals[0] if bar_aggregator else DEFAULT_ANOMALY_FRAME['interval'])
+        window = frame_config.get('window', DEFAULT_ANOMALY_FRAME['window'])
+        if bar_aggregator is None:
+            bar_aggregator = BarAggregator(intervals=[interval], max_bars=window)
+        elif interval not in bar_aggregator.intervals:
+            raise ValueError(f"Anomaly frame interval '{interval}' is not produced by the bar aggregator {bar_aggregator.intervals}")
+        frame_builder = bar_window_builder(bar_aggregator, interval, window, symbols)
+    
+    if state_builder is None:
+        state_builder = build_state_builder(processing, bar_aggregator, symbols)
+    
+    stages = [
+        stage('process', partial(
+            process_ticks,
+            stream_processor,
+            state_builder,
+            bar_aggregator=bar_aggregator,
+            clock=clock
+        ))
+    ]
+    
+    if anomaly_detector is not None:
+        stages.append(stage('anomalies', partial(detect_anomalies, anomaly_detector, frame_builder)))
+    
+    stages.append(stage('analyze', partial(analyze_market_state, signal_generator, risk_scorer)))
+    stages.append(stage('alerts', partial(dispatch_alerts, alert_engine)))
+    
+    return Pipeline(stages, process_workers=config.get('process_workers'))
@@ -0,0 +1,233 @@
+"""
+Staged async pipeline runtime with bounded queues
+"""
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import inspect
+import time
+import logging
+from ..metrics import StageMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """
+    One pipeline stage
+    
+    Args:
+        name: Stage name used in logs and metrics
+        handler: Callable taking one item and returning the item for the next
+            stage (None stops the item). Coroutine functions are awaited.
+        workers: Concurrent workers consuming the stage queue
+        queue_size: Capacity of the stage's input queue
+        executor: 'inline' (event loop), 'thread' (thread pool) or
+            'process' (shared process pool; handler must be picklable)
+        overflow: Behaviour when the input queue is full: 'block'
+            (backpressure on the producer), 'drop_oldest' or 'drop_newest'
+        fan_out: Treat the handler result as an iterable of items
+    """
+    
+    EXECUTORS = ('inline', 'thread', 'process')
+    OVERFLOW_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+    
+    def __init__(
+        self,
+        name: str,
+        handler: Callable,
+        workers: int = 1,
+        queue_size: int = 100,
+        executor: str = 'inline',
+        overflow: str = 'block',
+        fan_out: bool = False
+    ):
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}' for stage '{name}'")
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}' for stage '{name}'")
+        
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor = executor
+        self.overflow = overflow
+        self.fan_out = fan_out
+        self.metrics = StageMetrics()
+
+
+class Pipeline:
+    """
+    Concurrent stages joined by bounded asyncio queues
+    
+    Each stage owns an input queue and a pool of workers. A worker forwards
+    its result to the next stage's queue before acknowledging its own item,
+    so ``join`` drains the pipeline front to back. Stages whose queue uses a
+    drop policy never block their producer, which keeps a slow downstream
+    stage (e.g. a notifier) from stalling collection.
+    """
+    
+    def __init__(self, stages: List[Stage], process_workers: Optional[int] = None):
+        if not stages:
+            raise ValueError("Pipeline requires at least one stage")
+        
+        self.stages = stages
+        self.process_workers = process_workers
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._thread_pools: Dict[str, ThreadPoolExecutor] = {}
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.running = False
+    
+    async def start(self):
+        """Create queues and executors and start all stage workers"""
+        if self.running:
+            return
+        
+        self._queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        
+        for stage in self.stages:
+            if stage.executor == 'thread':
+                self._thread_pools[stage.name] = ThreadPoolExecutor(
+                    max_workers=stage.workers,
+                    thread_name_prefix=f"pipeline-{stage.name}"
+                )
+            elif stage.executor == 'process' and self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+        
+        for index, stage in enumerate(self.stages):
+            for _ in range(stage.workers):
+                self._tasks.append(asyncio.create_task(self._run_worker(index)))
+        
+        self.running = True
+        logger.info(f"Pipeline started with stages: {[stage.name for stage in self.stages]}")
+    
+    async def submit(self, item: Any) -> bool:
+        """
+        Submit an item to the first stage
+        
+        Args:
+            item: Input item
+            
+        Returns:
+            False if the item was dropped by the first stage's overflow policy
+        """
+        if not self.running:
+            raise RuntimeError("Pipeline is not running")
+        
+        return await self._put(0, item)
+    
+    async def join(self):
+        """Wait until every submitted item has passed through all stages"""
+        for queue in self._queues:
+            await queue.join()
+    
+    async def stop(self, drain: bool = True):
+        """
+        Stop workers and shut down executors
+        
+        Args:
+            drain: Process queued items before stopping
+        """
+        if not self.running:
+            return
+        
+        if drain:
+            await self.join()
+        
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        
+        for pool in self._thread_pools.values():
+            pool.shutdown(wait=False)
+        self._thread_pools.clear()
+        
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
+        
+        self.running = False
+        logger.info("Pipeline stopped")
+    
+    def get_metrics(self) -> Dict[str, Dict]:
+        """
+        Get per-stage queue depth, counters and latency
+        
+        Returns:
+            Stage name -> metrics
+        """
+        metrics = {}
+        for index, stage in enumerate(self.stages):
+            summary = stage.metrics.summary()
+            summary['queue_depth'] = self._queues[index].qsize() if self._queues else 0
+            summary['queue_size'] = stage.queue_size
+            summary['workers'] = stage.workers
+            metrics[stage.name] = summary
+        return metrics
+    
+    async def _put(self, index: int, item: Any) -> bool:
+        """Enqueue an item for a stage according to its overflow policy"""
+        stage = self.stages[index]
+        queue = self._queues[index]
+        
+        if stage.overflow == 'block':
+            await queue.put(item)
+            return True
+        
+        if queue.full():
+            stage.metrics.dropped += 1
+            if stage.overflow == 'drop_newest':
+                logger.warning(f"Stage '{stage.name}' queue full, dropping new item")
+                return False
+            
+            queue.get_nowait()
+            queue.task_done()
+            logger.warning(f"Stage '{stage.name}' queue full, dropped oldest item")
+        
+        queue.put_nowait(item)
+        return True
+    
+    async def _run_worker(self, index: int):
+        """Consume one stage queue forever"""
+        stage = self.stages[index]
+        queue = self._queues[index]
+        is_last = index == len(self.stages) - 1
+        
+        while True:
+            item = await queue.get()
+            start = time.perf_counter()
+            error = False
+            result = None
+            
+            try:
+                result = await self._execute(stage, item)
+            except Exception as e:
+                error = True
+                logger.error(f"Stage '{stage.name}' failed: {e}")
+            
+            stage.metrics.record(time.perf_counter() - start, error)
+            
+            try:
+                if result is not None and not is_last:
+                    outputs = result if stage.fan_out else [result]
+                    for output in outputs:
+                        await self._put(index + 1, output)
+            finally:
+                queue.task_done()
+    
+    async def _execute(self, stage: Stage, item: Any) -> Any:
+        """Run a stage handler on its configured executor"""
+        if stage.executor == 'inline':
+            result = stage.handler(item)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        
+        loop = asyncio.get_running_loop()
+        if stage.executor == 'thread':
+            return await loop.run_in_executor(self._thread_pools[stage.name], stage.handler, item)
+        
+        return await loop.run_in_executor(self._process_pool, stage.handler, item)
@@ -1,9 +1,27 @@
 """Processing package"""
 from .stream_processor import StreamProcessor, ProcessedSignal
 from .feature_engineer import FeatureEngineer
+from .market_structure import MarketStructureTracker
+from .snapshot import SnapshotStore, StreamSnapshot
+from .correlation_engine import RollingCorrelationEngine
+from .sharded_processor import ShardedStreamProcessor
+from .bar_aggregator import BarAggregator, Bar
+from .quantile_sketch import QuantileSketch
+from .market_state import MarketStateBuilder, DEFAULT_DERIVED_KEYS, build_state_builder
 
 __all__ = [
     'StreamProcessor',
     'ProcessedSignal',
-    'FeatureEngineer'
+    'FeatureEngineer',
+    'MarketStructureTracker',
+    'SnapshotStore',
+    'StreamSnapshot',
+    'RollingCorrelationEngine',
+    'ShardedStreamProcessor',
+    'BarAggregator',
+    'Bar',
+    'QuantileSketch',
+    'MarketStateBuilder',
+    'DEFAULT_DERIVED_KEYS',
+    'build_state_builder'
 ]
@@ -0,0 +1,232 @@
+"""
+Streaming OHLCV bar aggregation
+"""
+from typing import Callable, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from collections import deque
+from dataclasses import dataclass, asdict
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '5m': 300,
+    '1h': 3600,
+    '1d': 86400
+}
+
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_AWARE_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class Bar:
+    """OHLCV bar"""
+    symbol: str
+    interval: str
+    timestamp: datetime  # bar start
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    tick_count: int
+
+
+class BarAggregator:
+    """
+    Aggregate point ticks into OHLCV bars per symbol and interval
+    
+    Each tick updates the open bar of every interval in O(1). When a tick
+    falls into a later bucket, the open bar is closed, appended to a bounded
+    per-(symbol, interval) store and emitted to subscribers.
+    
+    Tick volume is incremental volume traded since the previous tick, unless
+    the tick names the source bar it was read from (``source_timestamp``,
+    MarketData.bar_timestamp). Then the volume is that source bar's running
+    total, and only its increase over the previous report of the same source
+    bar is added, so repeated polls of a forming bar are not double counted.
+    The increase is booked in the bar containing the tick.
+    """
+    
+    def __init__(self, intervals: List[str] = None, max_bars: int = 500):
+        self.intervals = intervals or list(INTERVAL_SECONDS.keys())
+        for interval in self.intervals:
+            if interval not in INTERVAL_SECONDS:
+                raise ValueError(f"Unsupported bar interval '{interval}'")
+        
+        self.max_bars = max_bars
+        self.open_bars: Dict[tuple, Bar] = {}     # (symbol, interval) -> bar in progress
+        self.closed_bars: Dict[tuple, deque] = {}  # (symbol, interval) -> recent closed bars
+        self.source_volumes: Dict[str, tuple] = {}  # symbol -> (source bar start, volume reported so far)
+        self.subscribers: List[Callable[[Bar], None]] = []
+    
+    def subscribe(self, callback: Callable[[Bar], None]):
+        """
+        Register a consumer for closed bars
+        
+        Args:
+            callback: Called with each closed Bar
+        """
+        self.subscribers.append(callback)
+    
+    def add_tick(
+        self,
+        symbol: str,
+        price: float,
+        volume: float = 0.0,
+        timestamp: datetime = None,
+        source_timestamp: datetime = None
+    ) -> List[Bar]:
+        """
+        Add a tick to every interval
+        
+        Args:
+            symbol: Symbol identifier
+            price: Tick price
+            volume: Volume traded since the previous tick, or with
+                source_timestamp the source bar's volume so far
+            timestamp: Tick time (default: now)
+            source_timestamp: Start of the source bar the volume belongs to
+            
+        Returns:
+            Bars closed by this tick
+        """
+        if timestamp is None:
+            timestamp = datetime.now()
+        volume = self._incremental_volume(symbol, volume or 0.0, source_timestamp)
+        
+        closed = []
+        for interval in self.intervals:
+            key = (symbol, interval)
+            start = self._bucket_start(timestamp, INTERVAL_SECONDS[interval])
+            bar = self.open_bars.get(key)
+            
+            if bar is not None and start == bar.timestamp:
+                bar.high = max(bar.high, price)
+                bar.low = min(bar.low, price)
+                bar.close = price
+                bar.volume += volume
+                bar.tick_count += 1
+                continue
+            
+            if bar is not None and start < bar.timestamp:
+                logger.debug(f"Dropping late tick for {symbol} {interval} bar at {timestamp}")
+                continue
+            
+            if bar is not None:
+                closed.append(self._close(key, bar))
+            
+            self.open_bars[key] = Bar(
+                symbol=symbol,
+                interval=interval,
+                timestamp=start,
+                open=price,
+                high=price,
+                low=price,
+                close=price,
+                volume=volume,
+                tick_count=1
+            )
+        
+        self._emit(closed)
+        return closed
+    
+    def add_market_data(self, data) -> List[Bar]:
+        """
+        Add a collected MarketData point
+        
+        Args:
+            data: MarketData
+            
+        Returns:
+            Bars closed by this tick
+        """
+        return self.add_tick(data.symbol, data.price, data.volume, data.timestamp, data.bar_timestamp)
+    
+    def flush(self, symbol: str = None) -> List[Bar]:
+        """
+        Close open bars (e.g. at session end)
+        
+        Args:
+            symbol: Only flush this symbol (default: all)
+            
+        Returns:
+            Closed bars
+        """
+        keys = [key for key in self.open_bars if symbol is None or key[0] == symbol]
+        closed = [self._close(key, self.open_bars.pop(key)) for key in keys]
+        self._emit(closed)
+        return closed
+    
+    def get_bars(self, symbol: str, interval: str, limit: int = None, include_open: bool = False) -> pd.DataFrame:
+        """
+        Get recent bars as an OHLCV frame
+        
+        Args:
+            symbol: Symbol identifier
+            interval: Bar interval
+            limit: Maximum number of most recent bars
+            include_open: Append the bar still in progress
+            
+        Returns:
+            DataFrame with timestamp, open, high, low, close, volume columns
+        """
+        bars = list(self.closed_bars.get((symbol, interval), ()))
+        if include_open and (symbol, interval) in self.open_bars:
+            bars.append(self.open_bars[(symbol, interval)])
+        if limit is not None:
+            bars = bars[-limit:]
+        
+        columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        if not bars:
+            return pd.DataFrame(columns=columns)
+        
+        return pd.DataFrame([asdict(bar) for bar in bars])[columns]
+    
+    def latest_bar(self, symbol: str, interval: str) -> Optional[Bar]:
+        """Get the most recent closed bar"""
+        bars = self.closed_bars.get((symbol, interval))
+        return bars[-1] if bars else None
+    
+    def _incremental_volume(self, symbol: str, volume: float, source_timestamp: Optional[datetime]) -> float:
+        """Volume to add for a tick, given the source bar it reports"""
+        if source_timestamp is None:
+            return volume
+        
+        previous = self.source_volumes.get(symbol)
+        if previous is not None and source_timestamp < previous[0]:
+            return 0.0  # report of an older source bar, already counted
+        
+        if previous is not None and source_timestamp == previous[0]:
+            # Revised-down totals add nothing rather than negative volume
+            self.source_volumes[symbol] = (source_timestamp, max(volume, previous[1]))
+            return max(volume - previous[1], 0.0)
+        
+        self.source_volumes[symbol] = (source_timestamp, volume)
+        return volume
+    
+    def _close(self, key: tuple, bar: Bar) -> Bar:
+        """Move a bar into the bounded closed-bar store"""
+        if key not in self.closed_bars:
+            self.closed_bars[key] = deque(maxlen=self.max_bars)
+        self.closed_bars[key].append(bar)
+        return bar
+    
+    def _emit(self, bars: List[Bar]):
+        """Deliver closed bars to subscribers"""
+        for bar in bars:
+            for callback in self.subscribers:
+                try:
+                    callback(bar)
+                except Exception as e:
+                    logger.error(f"Bar subscriber failed for {bar.symbol} {bar.interval}: {e}")
+    
+    def _bucket_start(self, timestamp: datetime, seconds: int) -> datetime:
+        """Start of the interval bucket containing a timestamp"""
+        epoch = _NAIVE_EPOCH if timestamp.tzinfo is None else _AWARE_EPOCH
+        offset = (timestamp - epoch) // timedelta(seconds=seconds)
+        start = epoch + timedelta(seconds=offset * seconds)
+        return start if timestamp.tzinfo is None else start.astimezone(timestamp.tzinfo)
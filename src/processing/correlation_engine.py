@@ -0,0 +1,263 @@
+"""
+Streaming cross-asset rolling correlation engine
+"""
+from typing import Dict, List, Tuple
+import re
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Co-movements used by the Korea outflow and risk-off scenarios
+DEFAULT_CORRELATION_PAIRS = [
+    ('USDKRW=X', 'EWY'),
+    ('DX-Y.NYB', 'USDKRW=X'),
+    ('EWY', '^VIX'),
+    ('TLT', '^VIX'),
+    ('HYG', '^VIX'),
+    ('HYG', 'TLT'),
+]
+
+
+class RollingCorrelationEngine:
+    """
+    Rolling covariance/correlation over a symbol universe
+    
+    Each cycle contributes one return vector. The running cross-product,
+    pairwise sum, sum-of-squares and count matrices are maintained with rank-1
+    updates (add the new return's outer products, subtract the expired
+    one's), so a cycle costs O(n^2) instead of the O(window * n^2) of
+    recomputing np.corrcoef. The sums are rebuilt from the return window
+    every ``recompute_interval`` cycles to bound floating-point drift.
+    
+    A symbol without a price in a cycle has no return for it: the row is
+    skipped for that symbol's pairs (pairwise-complete covariance) instead
+    of counting as a zero return.
+    
+    Correlation regime shifts are measured against a slow exponentially
+    weighted baseline of past correlation matrices.
+    """
+    
+    def __init__(
+        self,
+        symbols: List[str],
+        window: int = 60,
+        pairs: List[Tuple[str, str]] = None,
+        baseline_halflife: int = 240,
+        regime_threshold: float = 0.25,
+        recompute_interval: int = 1000
+    ):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.window = window
+        self.pairs = [
+            pair for pair in (DEFAULT_CORRELATION_PAIRS if pairs is None else pairs)
+            if pair[0] in self.index and pair[1] in self.index
+        ]
+        self.baseline_alpha = 1 - 0.5 ** (1 / baseline_halflife)
+        self.regime_threshold = regime_threshold
+        self.recompute_interval = recompute_interval
+        
+        n = len(self.symbols)
+        self.returns = np.zeros((window, n))
+        self.observed = np.zeros((window, n))  # 1.0 where the return exists
+        self.position = 0
+        self.count = 0
+        self.pair_sum = np.zeros((n, n))  # [i, j]: sum of i's returns where j has one
+        self.pair_square = np.zeros((n, n))  # [i, j]: sum of i's squared returns where j has one
+        self.pair_count = np.zeros((n, n))  # [i, j]: cycles where both have a return
+        self.cross = np.zeros((n, n))
+        self.last_prices = np.full(n, np.nan)
+        self.baseline = None
+        self.baseline_valid = np.zeros(n, dtype=bool)  # symbols folded into the baseline
+        self.regime_shift = 0.0
+        self._updates = 0
+    
+    def update(self, prices: Dict[str, float]) -> Dict:
+        """
+        Add one cycle of prices
+        
+        Args:
+            prices: Symbol -> latest price; missing symbols carry their last price
+            
+        Returns:
+            Correlation features after the update
+        """
+        vector = self.last_prices.copy()
+        for symbol, price in prices.items():
+            i = self.index.get(symbol)
+            if i is not None and price is not None:
+                vector[i] = price
+        
+        return self.update_array(vector)
+    
+    def update_array(self, prices: np.ndarray) -> Dict:
+        """
+        Add one cycle of prices aligned with ``symbols``
+        
+        Args:
+            prices: Price vector in universe order (NaN = no price)
+            
+        Returns:
+            Correlation features after the update
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = np.log(prices / self.last_prices)
+        # No price now or before means no return, not a zero return
+        observed = np.isfinite(returns)
+        returns[~observed] = 0.0
+        observed = observed.astype(float)
+        self.last_prices = np.where(np.isnan(prices), self.last_prices, prices)
+        
+        # Rank-1 updates: add the new observation, expire the oldest
+        if self.count == self.window:
+            expired = self.returns[self.position]
+            expired_observed = self.observed[self.position]
+            self.pair_sum -= np.outer(expired, expired_observed)
+            self.pair_square -= np.outer(expired * expired, expired_observed)
+            self.pair_count -= np.outer(expired_observed, expired_observed)
+            self.cross -= np.outer(expired, expired)
+        else:
+            self.count += 1
+        
+        self.returns[self.position] = returns
+        self.observed[self.position] = observed
+        self.position = (self.position + 1) % self.window
+        self.pair_sum += np.outer(returns, observed)
+        self.pair_square += np.outer(returns * returns, observed)
+        self.pair_count += np.outer(observed, observed)
+        self.cross += np.outer(returns, returns)
+        
+        self._updates += 1
+        if self._updates % self.recompute_interval == 0:
+            self._recompute()
+        
+        correlation, valid = self._correlation()
+        self._update_regime(correlation, valid)
+        return self._features(correlation, valid)
+    
+    def covariance(self) -> np.ndarray:
+        """
+        Get the rolling sample covariance matrix
+        
+        Each pair uses the cycles in which both symbols have a return.
+        
+        Returns:
+            n x n covariance matrix (NaN for pairs with fewer than two common returns)
+        """
+        # Round away drift so exact counts compare exactly
+        count = np.rint(self.pair_count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = self.pair_sum * self.pair_sum.T
+            covariance /= -count
+            covariance += self.cross
+            covariance /= count - 1
+        covariance[count < 2] = np.nan
+        return covariance
+    
+    def correlation(self) -> np.ndarray:
+        """
+        Get the rolling correlation matrix
+        
+        Returns:
+            n x n correlation matrix (NaN for symbols without variance)
+        """
+        correlation, valid = self._correlation()
+        correlation[~valid, :] = np.nan
+        correlation[:, ~valid] = np.nan
+        return correlation
+    
+    def features(self) -> Dict:
+        """
+        Get correlation features for the current window
+        
+        Returns:
+            Pair correlations, average correlation and regime shift measures
+        """
+        return self._features(*self._correlation())
+    
+    def _correlation(self):
+        """Correlation matrix with zeros for symbols without variance, plus the validity mask"""
+        covariance = self.covariance()
+        variance = np.diag(covariance)
+        valid = np.isfinite(variance) & (variance > 0)
+        
+        # Each pair is scaled by the deviations over its common cycles, so the
+        # result matches pairwise-complete np.corrcoef (pandas DataFrame.corr)
+        count = np.rint(self.pair_count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            deviation = self.pair_square - self.pair_sum * self.pair_sum / count
+            deviation = np.sqrt(np.clip(deviation, 0, None) / (count - 1))
+            correlation = covariance / (deviation * deviation.T)
+        
+        # Constant (or unseen) symbols and pairs without two common returns are zeroed
+        correlation[~np.isfinite(correlation)] = 0.0
+        correlation[~valid, :] = 0.0
+        correlation[:, ~valid] = 0.0
+        np.fill_diagonal(correlation, np.where(valid, 1.0, 0.0))
+        np.clip(correlation, -1.0, 1.0, out=correlation)
+        return correlation, valid
+    
+    def _features(self, correlation: np.ndarray, valid: np.ndarray) -> Dict:
+        """Build the feature dictionary from a correlation matrix"""
+        features = {}
+        for a, b in self.pairs:
+            i, j = self.index[a], self.index[b]
+            value = correlation[i, j] if valid[i] and valid[j] else np.nan
+            features[f"corr_{self._feature_name(a)}_{self._feature_name(b)}"] = float(value)
+        
+        k = int(valid.sum())
+        if k > 1:
+            features['avg_correlation'] = float((correlation.sum() - np.trace(correlation)) / (k * (k - 1)))
+        else:
+            features['avg_correlation'] = np.nan
+        features['correlation_regime_shift'] = self.regime_shift
+        features['correlation_regime_change'] = self.regime_shift > self.regime_threshold
+        
+        return features
+    
+    def _update_regime(self, correlation: np.ndarray, valid: np.ndarray):
+        """
+        Measure the distance from the slow baseline, then fold the matrix into it
+        
+        Only pairs of symbols with variance count: the shift is the mean
+        absolute change over those pairs, and only they are folded into the
+        baseline, so gaps and warm-up neither dilute the shift nor pull the
+        baseline towards zero. A symbol's baseline starts from its first
+        valid correlations.
+        """
+        if self.count < self.window:
+            return
+        
+        if self.baseline is None:
+            self.baseline = correlation.copy()
+            self.baseline_valid = valid.copy()
+            return
+        
+        entering = valid & ~self.baseline_valid
+        if entering.any():
+            self.baseline[entering, :] = correlation[entering, :]
+            self.baseline[:, entering] = correlation[:, entering]
+            self.baseline_valid |= entering
+        
+        pairs = np.outer(valid, valid)
+        np.fill_diagonal(pairs, False)
+        
+        diff = np.where(pairs, correlation - self.baseline, 0.0)
+        self.baseline += self.baseline_alpha * diff
+        count = int(pairs.sum())
+        self.regime_shift = float(np.abs(diff).sum() / count) if count else 0.0
+    
+    def _recompute(self):
+        """Rebuild sums from the return window"""
+        window = self.returns[:self.count]
+        observed = self.observed[:self.count]
+        self.pair_sum = window.T @ observed
+        self.pair_square = (window * window).T @ observed
+        self.pair_count = observed.T @ observed
+        self.cross = window.T @ window
+    
+    def _feature_name(self, symbol: str) -> str:
+        """Feature-safe symbol name, e.g. 'USDKRW=X' -> 'usdkrw', '^VIX' -> 'vix'"""
+        base = symbol.lower().split('=')[0].split('.')[0]
+        return re.sub(r'[^a-z0-9]', '', base)
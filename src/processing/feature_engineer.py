@@ -1,11 +1,12 @@
 """
 Feature engineering for ML models
 """
-from typing import Dict, List
+from typing import Dict, List, Optional
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
+from .market_structure import MarketStructureTracker
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +14,39 @@ logger = logging.getLogger(__name__)
 class FeatureEngineer:
     """Feature engineering for prediction models"""
     
-    def __init__(self):
+    def __init__(self, config: Dict = None, symbols: Dict = None, bar_aggregator=None):
+        """
+        Args:
+            config: processing.feature_engineering section (backend,
+                new_high_low_lookback, optional equity_symbols and
+                sector_symbols overrides)
+            symbols: data_collection.symbols section; etf_equity and
+                etf_sectors form the market structure universe
+            bar_aggregator: BarAggregator whose closed bars roll the market
+                structure windows (default: roll only via seeding)
+        """
+        self.config = config or {}
+        symbols = symbols or {}
         self.feature_cache = {}
+        self.backend = self.config.get('backend', 'pandas')
+        
+        # Optional Polars execution backend
+        self.polars_backend = None
+        if self.backend == 'polars':
+            from .polars_backend import PolarsFeatureBackend
+            self.polars_backend = PolarsFeatureBackend()
+        elif self.backend != 'pandas':
+            raise ValueError(f"Unknown feature backend '{self.backend}'")
+        
+        # Cross-sectional indicators over the breadth universe
+        self.market_structure = MarketStructureTracker(
+            equity_symbols=self.config.get('equity_symbols', symbols.get('etf_equity', [])),
+            sector_symbols=self.config.get('sector_symbols', symbols.get('etf_sectors', [])),
+            lookback=self.config.get('new_high_low_lookback', 252),
+            interval=self.config.get('bar_interval', '1d')
+        )
+        if bar_aggregator is not None:
+            bar_aggregator.subscribe(self.market_structure.on_bar)
     
     def create_features(self, market_data: pd.DataFrame) -> Dict:
         """
@@ -28,6 +60,12 @@ class FeatureEngineer:
         """
         features = {}
         
+        if self.polars_backend is not None:
+            # Technical and momentum indicators in one lazy query
+            features.update(self.polars_backend.create_features(market_data))
+            features.update(self.market_structure_indicators(market_data))
+            return features
+        
         # Technical indicators
         features.update(self.technical_indicators(market_data))
         
@@ -39,6 +77,28 @@ class FeatureEngineer:
         
         return features
     
+    def create_features_by_symbol(self, market_data: pd.DataFrame, symbol_column: str = 'symbol') -> Dict[str, Dict]:
+        """
+        Create technical and momentum features for each symbol
+        
+        Args:
+            market_data: Long-format DataFrame with symbol and close columns
+            symbol_column: Name of the symbol column
+            
+        Returns:
+            Dictionary of symbol -> features
+        """
+        if self.polars_backend is not None:
+            return self.polars_backend.create_features_by_symbol(market_data, symbol_column)
+        
+        results = {}
+        for symbol, group in market_data.groupby(symbol_column, sort=False):
+            features = self.technical_indicators(group)
+            features.update(self.momentum_indicators(group))
+            results[symbol] = features
+        
+        return results
+    
     def technical_indicators(self, data: pd.DataFrame) -> Dict:
         """
         Calculate technical indicators
@@ -49,6 +109,9 @@ class FeatureEngineer:
         Returns:
             Technical indicators
         """
+        if self.polars_backend is not None:
+            return self.polars_backend.technical_indicators(data)
+        
         features = {}
         
         if 'close' not in data.columns:
@@ -79,20 +142,48 @@ class FeatureEngineer:
         Calculate market structure indicators
         
         Args:
-            data: Market data with multiple symbols
+            data: Market data with multiple symbols, either wide (one close
+                column per symbol) or long ('symbol' and 'close' columns)
             
         Returns:
             Market structure features
         """
-        features = {}
+        panel = self._to_close_panel(data)
         
-        # These would require multiple symbols in data
-        # Placeholder implementation
+        # Re-seed from a multi-symbol snapshot; otherwise report tick-maintained state
+        if panel is not None:
+            self.market_structure.seed(panel)
         
-        features['market_breadth'] = 0.5  # Placeholder
-        features['advance_decline_ratio'] = 1.0  # Placeholder
+        return self.market_structure.snapshot()
+    
+    def update_market_structure(self, symbol: str, price: float) -> Dict:
+        """
+        Update market structure indicators with a single tick
         
-        return features
+        Args:
+            symbol: Symbol identifier
+            price: Latest price
+            
+        Returns:
+            Market structure features
+        """
+        self.market_structure.update(symbol, price)
+        return self.market_structure.snapshot()
+    
+    def _to_close_panel(self, data) -> Optional[pd.DataFrame]:
+        """Shape multi-symbol market data into a wide close-price panel"""
+        if not isinstance(data, pd.DataFrame):
+            return None
+        
+        if 'symbol' in data.columns and 'close' in data.columns:
+            index = 'timestamp' if 'timestamp' in data.columns else data.groupby('symbol').cumcount()
+            data = data.pivot_table(index=index, columns='symbol', values='close', aggfunc='last')
+        
+        columns = [column for column in data.columns if column in self.market_structure.index]
+        if len(columns) < 2:
+            return None
+        
+        return data[columns]
     
     def momentum_indicators(self, data: pd.DataFrame) -> Dict:
         """
@@ -104,6 +195,9 @@ class FeatureEngineer:
         Returns:
             Momentum features
         """
+        if self.polars_backend is not None:
+            return self.polars_backend.momentum_indicators(data)
+        
         features = {}
         
         if 'close' not in data.columns:
@@ -0,0 +1,350 @@
+"""
+Incremental market state built from per-symbol bar windows
+"""
+from typing import Dict, List, Optional
+from collections import deque
+import math
+import pandas as pd
+import logging
+from .bar_aggregator import BarAggregator, Bar
+from .correlation_engine import RollingCorrelationEngine, DEFAULT_CORRELATION_PAIRS
+
+logger = logging.getLogger(__name__)
+
+# Derived market-state keys read by SignalGenerator and RiskScorer. Kinds:
+#   last          latest price of the symbol
+#   pct_change    percent change over `periods` bars
+#   diff          absolute change over `periods` bars
+#   spread        latest price of the symbol minus latest price of `other`
+#   flow          signed dollar volume (close * volume * sign of the bar
+#                 return) summed over the last `periods` closed bars
+#   volume_ratio  last closed bar volume / mean volume of the `periods` before
+#   volatility    std of bar percent returns over the last `periods` bars
+# Keys without a data source (kospi_foreign_flow, libor_ois_spread,
+# repo_rate_spike, ...) are left out so consumers fall back to defaults.
+DEFAULT_DERIVED_KEYS: List[Dict] = [
+    {'key': 'vix', 'kind': 'last', 'symbol': '^VIX'},
+    {'key': 'vix_change_1d', 'kind': 'pct_change', 'symbol': '^VIX', 'periods': 1},
+    {'key': 'vix_change_5d', 'kind': 'pct_change', 'symbol': '^VIX', 'periods': 5},
+    {'key': 'move_index', 'kind': 'last', 'symbol': '^MOVE'},
+    {'key': 'usdkrw_change_1d', 'kind': 'pct_change', 'symbol': 'USDKRW=X', 'periods': 1},
+    {'key': 'usdjpy_change_1w', 'kind': 'pct_change', 'symbol': 'USDJPY=X', 'periods': 5},
+    {'key': 'dxy', 'kind': 'last', 'symbol': 'DX-Y.NYB'},
+    {'key': 'dxy_change', 'kind': 'pct_change', 'symbol': 'DX-Y.NYB', 'periods': 1},
+    {'key': 'dxy_change_1m', 'kind': 'pct_change', 'symbol': 'DX-Y.NYB', 'periods': 21},
+    {'key': 'gold_change', 'kind': 'pct_change', 'symbol': 'GC=F', 'periods': 1},
+    {'key': 'gold_change_1m', 'kind': 'pct_change', 'symbol': 'GC=F', 'periods': 21},
+    {'key': 'oil_volatility', 'kind': 'volatility', 'symbol': 'CL=F', 'periods': 21},
+    {'key': 'ewy_flow_3d', 'kind': 'flow', 'symbol': 'EWY', 'periods': 3},
+    {'key': 'tlt_flow', 'kind': 'flow', 'symbol': 'TLT', 'periods': 1},
+    {'key': 'volume_ratio', 'kind': 'volume_ratio', 'symbol': 'SPY', 'periods': 20},
+    # FRED series below need a FRED feed into the pipeline; the real-time
+    # collection is Yahoo only, so build_state_builder logs them as unavailable
+    # FRED option-adjusted spreads (percentage points)
+    {'key': 'hyg_spread', 'kind': 'last', 'symbol': 'BAMLH0A0HYM2'},
+    {'key': 'ig_spread', 'kind': 'last', 'symbol': 'BAMLC0A0CM'},
+    # Korea 10Y (FRED, monthly) minus US 10Y
+    {'key': 'korea_us_rate_diff', 'kind': 'spread', 'symbol': 'IRLTLT01KRM156N', 'other': 'DGS10'}
+]
+
+# Kinds that follow the live price; the rest only change when a bar closes
+LIVE_KINDS = ('last', 'pct_change', 'diff', 'spread')
+WINDOW_KINDS = ('flow', 'volume_ratio', 'volatility')
+
+
+class MarketStateBuilder:
+    """
+    Maintain the market_state dict incrementally from bars and ticks
+    
+    Every symbol referenced by a derived key keeps ring buffers (deques) of
+    its recent closed-bar closes and volumes, sized to the longest horizon
+    any key needs. A closed bar recomputes only the keys of its symbol, and
+    a tick recomputes only that symbol's price-based keys against the live
+    price, so building the state never queries storage and costs a few
+    microseconds per update. Keys lacking history are omitted.
+    
+    Bars come from a BarAggregator subscription; without one the builder
+    aggregates the ticks it is given itself. Instances are callable with a
+    MarketData batch, so they plug in as the pipeline's state_builder.
+    
+    With a RollingCorrelationEngine every batch is one correlation cycle and
+    its features (pair correlations, avg_correlation, regime shift) are
+    merged into the state.
+    """
+    
+    KINDS = LIVE_KINDS + WINDOW_KINDS
+    
+    def __init__(
+        self,
+        derived_keys: List[Dict] = None,
+        interval: str = '1d',
+        bar_aggregator: BarAggregator = None,
+        include_prices: bool = True,
+        correlation_engine: RollingCorrelationEngine = None
+    ):
+        """
+        Args:
+            derived_keys: Key definitions (default: DEFAULT_DERIVED_KEYS)
+            interval: Bar interval the horizons are counted in
+            bar_aggregator: Aggregator to subscribe to (must produce
+                ``interval`` bars and be fed elsewhere); default: aggregate
+                the ticks passed to build()
+            include_prices: Also expose the latest price of every symbol
+                under its symbol name
+            correlation_engine: Engine updated with each batch's prices
+                (default: no correlation features)
+        """
+        self.derived_keys = DEFAULT_DERIVED_KEYS if derived_keys is None else derived_keys
+        for spec in self.derived_keys:
+            if spec['kind'] not in self.KINDS:
+                raise ValueError(f"Unknown derived key kind '{spec['kind']}' for '{spec['key']}'")
+        
+        self.interval = interval
+        self.include_prices = include_prices
+        self.correlation_engine = correlation_engine
+        
+        # symbol -> key specs depending on it (spreads depend on both legs)
+        self.dependents: Dict[str, List[Dict]] = {}
+        capacity: Dict[str, int] = {}
+        for spec in self.derived_keys:
+            symbols = [spec['symbol']] + ([spec['other']] if 'other' in spec else [])
+            for symbol in symbols:
+                self.dependents.setdefault(symbol, []).append(spec)
+                capacity[symbol] = max(capacity.get(symbol, 2), spec.get('periods', 1) + 2)
+        
+        self.closes: Dict[str, deque] = {symbol: deque(maxlen=size) for symbol, size in capacity.items()}
+        self.volumes: Dict[str, deque] = {symbol: deque(maxlen=size) for symbol, size in capacity.items()}
+        self.prices: Dict[str, float] = {}   # symbol -> latest price
+        self._live: Dict[str, bool] = {}     # symbol -> price is newer than the last closed bar
+        self.state: Dict = {}
+        
+        if bar_aggregator is not None:
+            if interval not in bar_aggregator.intervals:
+                raise ValueError(f"Bar aggregator does not produce '{interval}' bars")
+            self._bars = None
+            bar_aggregator.subscribe(self.on_bar)
+        else:
+            self._bars = BarAggregator(intervals=[interval], max_bars=1)
+            self._bars.subscribe(self.on_bar)
+    
+    def __call__(self, batch: List) -> Dict:
+        return self.build(batch)
+    
+    def build(self, batch: List) -> Dict:
+        """
+        Apply a batch of ticks and return the market state
+        
+        Args:
+            batch: List of MarketData
+            
+        Returns:
+            market_state dict (a copy)
+        """
+        for data in batch:
+            if self._bars is not None:
+                self._bars.add_market_data(data)
+            self.on_tick(data.symbol, data.price)
+        
+        if self.correlation_engine is not None and batch:
+            self.state.update(self.correlation_engine.update({data.symbol: data.price for data in batch}))
+        return dict(self.state)
+    
+    def on_tick(self, symbol: str, price: float):
+        """
+        Update the live price of a symbol
+        
+        Args:
+            symbol: Symbol identifier
+            price: Latest price
+        """
+        if price is None or math.isnan(price):
+            return
+        
+        self.prices[symbol] = price
+        if self.include_prices:
+            self.state[symbol] = price
+        
+        if symbol in self.closes:
+            self._live[symbol] = True
+            self._refresh(symbol, LIVE_KINDS)
+    
+    def on_bar(self, bar: Bar):
+        """
+        Append a closed bar (BarAggregator subscriber)
+        
+        Args:
+            bar: Closed bar; other intervals are ignored
+        """
+        if bar.interval != self.interval or bar.symbol not in self.closes:
+            return
+        
+        self.closes[bar.symbol].append(bar.close)
+        self.volumes[bar.symbol].append(bar.volume)
+        
+        # A tick since the previous bar belongs to the next bar unless it is
+        # this bar's close; a price copied from the previous close never does
+        self._live[bar.symbol] = self._live.get(bar.symbol, False) and self.prices.get(bar.symbol) != bar.close
+        if not self._live[bar.symbol]:
+            self.prices[bar.symbol] = bar.close
+        
+        self._refresh(bar.symbol, self.KINDS)
+    
+    def seed(self, bars: pd.DataFrame):
+        """
+        Warm up windows from stored bars
+        
+        Args:
+            bars: Long-format bars with 'symbol', 'close' and optional
+                'volume' columns, oldest first (only the most recent rows per
+                symbol are kept)
+        """
+        for symbol, group in bars.groupby('symbol', sort=False):
+            symbol = str(symbol)
+            if symbol not in self.closes:
+                continue
+            
+            closes = group['close'].to_numpy(dtype=float)
+            volumes = group['volume'].to_numpy(dtype=float) if 'volume' in group.columns else [0.0] * len(closes)
+            self.closes[symbol].extend(closes)
+            self.volumes[symbol].extend(volumes)
+            
+            self.prices[symbol] = float(closes[-1])
+            self._live[symbol] = False
+            if self.include_prices:
+                self.state[symbol] = self.prices[symbol]
+            self._refresh(symbol, self.KINDS)
+        
+        logger.info(f"Seeded market state with {len(self.state)} keys")
+    
+    def get_state(self) -> Dict:
+        """Current market state (a copy)"""
+        return dict(self.state)
+    
+    def unavailable_keys(self, symbols: List[str]) -> List[str]:
+        """
+        Derived keys that a feed of the given symbols can never produce
+        
+        Args:
+            symbols: Symbols the builder will receive
+            
+        Returns:
+            Keys with a source symbol (or spread leg) outside ``symbols``
+        """
+        fed = set(symbols)
+        return [
+            spec['key'] for spec in self.derived_keys
+            if spec['symbol'] not in fed or spec.get('other', spec['symbol']) not in fed
+        ]
+    
+    def _refresh(self, symbol: str, kinds: tuple):
+        """Recompute the derived keys of a symbol with one of the given kinds"""
+        for spec in self.dependents.get(symbol, ()):
+            if spec['kind'] not in kinds:
+                continue
+            
+            value = self._compute(spec)
+            if value is None:
+                self.state.pop(spec['key'], None)
+            else:
+                self.state[spec['key']] = value
+    
+    def _compute(self, spec: Dict) -> Optional[float]:
+        """Value of one derived key, or None without enough history"""
+        kind = spec['kind']
+        symbol = spec['symbol']
+        
+        if kind == 'last':
+            return self.prices.get(symbol)
+        
+        if kind == 'spread':
+            price = self.prices.get(symbol)
+            other = self.prices.get(spec['other'])
+            return None if price is None or other is None else price - other
+        
+        periods = spec.get('periods', 1)
+        closes = self.closes[symbol]
+        
+        if kind in ('pct_change', 'diff'):
+            # Live price counts as the newest value of the series
+            live = self._live.get(symbol, False)
+            back = periods if live else periods + 1
+            if len(closes) < back or symbol not in self.prices:
+                return None
+            reference = closes[-back]
+            current = self.prices[symbol]
+            if kind == 'diff':
+                return current - reference
+            return (current / reference - 1) * 100 if reference else None
+        
+        if len(closes) < periods + 1:
+            return None
+        
+        closes = list(closes)[-(periods + 1):]
+        volumes = list(self.volumes[symbol])[-(periods + 1):]
+        
+        if kind == 'flow':
+            return sum(
+                close * volume * (int(close > previous) - int(close < previous))
+                for previous, close, volume in zip(closes, closes[1:], volumes[1:])
+            )
+        
+        if kind == 'volume_ratio':
+            average = sum(volumes[:-1]) / periods
+            return volumes[-1] / average if average else None
+        
+        # volatility
+        returns = [(close / previous - 1) * 100 for previous, close in zip(closes, closes[1:]) if previous]
+        if len(returns) < 2:
+            return None
+        mean = sum(returns) / len(returns)
+        return math.sqrt(sum((value - mean) ** 2 for value in returns) / (len(returns) - 1))
+
+
+def build_state_builder(
+    processing: Dict = None,
+    bar_aggregator: BarAggregator = None,
+    symbols: List[str] = None
+) -> MarketStateBuilder:
+    """
+    Build the MarketStateBuilder described by the 'processing' config section
+    
+    Args:
+        processing: 'processing' config section; market_state.interval sets
+            the bar interval and a 'correlation' entry (window,
+            baseline_halflife, regime_threshold) adds a
+            RollingCorrelationEngine over the symbols of
+            DEFAULT_CORRELATION_PAIRS
+        bar_aggregator: Aggregator shared with the pipeline; subscribed to
+            when it produces the builder's interval
+        symbols: Symbols the builder will be fed; derived keys without a
+            source among them are logged once (consumers use defaults)
+            
+    Returns:
+        MarketStateBuilder
+    """
+    processing = processing or {}
+    interval = processing.get('market_state', {}).get('interval', '1d')
+    
+    correlation_engine = None
+    correlation = processing.get('correlation')
+    if correlation:
+        universe = list(dict.fromkeys(symbol for pair in DEFAULT_CORRELATION_PAIRS for symbol in pair))
+        correlation_engine = RollingCorrelationEngine(
+            universe,
+            window=correlation.get('window', 60),
+            baseline_halflife=correlation.get('baseline_halflife', 240),
+            regime_threshold=correlation.get('regime_threshold', 0.25)
+        )
+    
+    shared_bars = bar_aggregator is not None and interval in bar_aggregator.intervals
+    builder = MarketStateBuilder(
+        interval=interval,
+        bar_aggregator=bar_aggregator if shared_bars else None,
+        correlation_engine=correlation_engine
+    )
+    
+    if symbols is not None:
+        unavailable = builder.unavailable_keys(symbols)
+        if unavailable:
+            logger.warning(f"Market state keys without a data feed (consumers use defaults): {unavailable}")
+    return builder
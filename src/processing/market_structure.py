@@ -0,0 +1,255 @@
+"""
+Cross-sectional market structure indicators
+"""
+from typing import Dict, List, Optional
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MarketStructureTracker:
+    """
+    Breadth, advance/decline, new highs/lows and sector dispersion
+    
+    Per-symbol state lives in fixed numpy arrays indexed by universe position.
+    Seeding from a panel and rolling to a new bar are single vectorized
+    reductions over the universe; each tick in between adjusts the running
+    counters for its own symbol in O(1).
+    
+    Subscribed to a BarAggregator (``on_bar``), the tracker rolls when the
+    first ``interval`` bar of a new period closes. The aggregator closes a
+    bar on the first tick of the next period, so ticks must reach the
+    aggregator before ``update``; every symbol's last price is then still
+    its close of the finished period.
+    """
+    
+    def __init__(
+        self,
+        equity_symbols: List[str],
+        sector_symbols: List[str],
+        lookback: int = 252,
+        interval: str = '1d'
+    ):
+        """
+        Args:
+            equity_symbols: Breadth universe (data_collection.symbols.etf_equity)
+            sector_symbols: Sector ETFs, also part of the universe
+                (data_collection.symbols.etf_sectors)
+            lookback: Bars in the new high/low window
+            interval: Bar interval that rolls the tracker in on_bar
+        """
+        self.symbols = list(dict.fromkeys(list(equity_symbols) + list(sector_symbols)))
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.lookback = lookback
+        self.interval = interval
+        self._period: Optional[datetime] = None  # start of the last period rolled on
+        
+        n = len(self.symbols)
+        self.is_sector = np.array([symbol in sector_symbols for symbol in self.symbols], dtype=bool)
+        self.last = np.full(n, np.nan)
+        self.reference = np.full(n, np.nan)      # previous bar close
+        self.window_high = np.full(n, np.nan)    # max close over prior lookback bars
+        self.window_low = np.full(n, np.nan)     # min close over prior lookback bars
+        self.history = np.full((n, lookback), np.nan)
+        self.history_pos = 0
+        
+        # Per-symbol contribution to the running counters
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.new_high = np.zeros(n, dtype=bool)
+        self.new_low = np.zeros(n, dtype=bool)
+        self.active = np.zeros(n, dtype=bool)
+        self.sector_return = np.full(n, np.nan)
+        
+        self._reset_counters()
+    
+    def seed(self, panel: pd.DataFrame):
+        """
+        Seed state from a wide close-price panel
+        
+        The last row is taken as the current snapshot, the row before it as
+        the reference close and the preceding rows as the high/low window.
+        Seeding replaces the whole state: universe symbols missing from the
+        panel are cleared and count as inactive until they tick.
+        
+        Args:
+            panel: DataFrame indexed by time with one close column per symbol
+        """
+        columns = [symbol for symbol in panel.columns if symbol in self.index]
+        if not columns or panel.empty:
+            return
+        
+        positions = np.array([self.index[symbol] for symbol in columns])
+        values = panel[columns].to_numpy(dtype=float)
+        
+        self.history.fill(np.nan)
+        self.history_pos = 0
+        self.last.fill(np.nan)
+        self.reference.fill(np.nan)
+        
+        prior = values[:-1][-self.lookback:]
+        if len(prior):
+            self.history[positions, :len(prior)] = prior.T
+            self.history_pos = len(prior) % self.lookback
+            self.reference[positions] = prior[-1]
+        
+        self.last[positions] = values[-1]
+        self._refresh_window()
+        self._recompute()
+    
+    def update(self, symbol: str, price: float):
+        """
+        Apply a tick for one symbol in O(1)
+        
+        Args:
+            symbol: Symbol identifier
+            price: Latest price
+        """
+        i = self.index.get(symbol)
+        if i is None or price is None or np.isnan(price):
+            return
+        
+        self.last[i] = price
+        reference = self.reference[i]
+        
+        # Advance / decline
+        active = not np.isnan(reference)
+        direction = int(np.sign(price - reference)) if active else 0
+        self.active_count += int(active) - int(self.active[i])
+        self.advancers += int(direction > 0) - int(self.direction[i] > 0)
+        self.decliners += int(direction < 0) - int(self.direction[i] < 0)
+        self.active[i] = active
+        self.direction[i] = direction
+        
+        # New highs / lows against the prior window
+        new_high = bool(price > self.window_high[i])
+        new_low = bool(price < self.window_low[i])
+        self.new_highs += int(new_high) - int(self.new_high[i])
+        self.new_lows += int(new_low) - int(self.new_low[i])
+        self.new_high[i] = new_high
+        self.new_low[i] = new_low
+        
+        # Sector return moments
+        if self.is_sector[i] and active and reference != 0:
+            ret = (price - reference) / reference * 100
+            old = self.sector_return[i]
+            if np.isnan(old):
+                self.sector_count += 1
+                old = 0.0
+            self.sector_sum += ret - old
+            self.sector_sumsq += ret * ret - old * old
+            self.sector_return[i] = ret
+    
+    def roll(self):
+        """Close the current bar: last prices become the new reference"""
+        self.history[:, self.history_pos] = self.last
+        self.history_pos = (self.history_pos + 1) % self.lookback
+        self.reference = self.last.copy()
+        self._refresh_window()
+        self._recompute()
+    
+    def on_bar(self, bar):
+        """
+        Roll on bar close (BarAggregator subscriber)
+        
+        The first bar of a newer period rolls the tracker. Later bars of the
+        same period only correct their symbol's reference, which matters
+        when the tracker sees bars but no ticks.
+        
+        Args:
+            bar: Closed bar; other intervals and symbols are ignored
+        """
+        i = self.index.get(bar.symbol)
+        if bar.interval != self.interval or i is None:
+            return
+        
+        # Ticks reach the aggregator first, so the close is also the last price
+        self.last[i] = bar.close
+        
+        if self._period is None or bar.timestamp > self._period:
+            self._period = bar.timestamp
+            self.roll()
+        elif bar.timestamp == self._period and self.reference[i] != bar.close:
+            self.history[i, (self.history_pos - 1) % self.lookback] = bar.close
+            self.reference[i] = bar.close
+            self._refresh_window()
+            self._recompute()
+    
+    def snapshot(self) -> Dict:
+        """
+        Get current market structure indicators
+        
+        Returns:
+            Market structure features
+        """
+        moved = self.advancers + self.decliners
+        if moved == 0:
+            breadth = 0.5
+            ad_ratio = 1.0
+        else:
+            breadth = self.advancers / moved
+            ad_ratio = self.advancers / max(self.decliners, 1)
+        
+        dispersion = 0.0
+        if self.sector_count > 1:
+            mean = self.sector_sum / self.sector_count
+            dispersion = float(np.sqrt(max(self.sector_sumsq / self.sector_count - mean * mean, 0.0)))
+        
+        return {
+            'market_breadth': float(breadth),
+            'advance_decline_ratio': float(ad_ratio),
+            'advancers': int(self.advancers),
+            'decliners': int(self.decliners),
+            'unchanged': int(self.active_count - moved),
+            'new_highs': int(self.new_highs),
+            'new_lows': int(self.new_lows),
+            'sector_dispersion': dispersion
+        }
+    
+    def _refresh_window(self):
+        """Recompute high/low of the prior window for all symbols at once"""
+        has_data = ~np.all(np.isnan(self.history), axis=1)
+        self.window_high.fill(np.nan)
+        self.window_low.fill(np.nan)
+        if has_data.any():
+            self.window_high[has_data] = np.nanmax(self.history[has_data], axis=1)
+            self.window_low[has_data] = np.nanmin(self.history[has_data], axis=1)
+    
+    def _recompute(self):
+        """Rebuild all counters from the current arrays in one vectorized pass"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.active = ~np.isnan(self.reference) & ~np.isnan(self.last)
+            diff = np.where(self.active, self.last - self.reference, 0.0)
+            self.direction = np.sign(diff).astype(np.int8)
+            self.new_high = self.last > self.window_high
+            self.new_low = self.last < self.window_low
+            
+            valid_sector = self.is_sector & self.active & (self.reference != 0)
+            self.sector_return = np.where(
+                valid_sector, diff / self.reference * 100, np.nan
+            )
+        
+        self._reset_counters()
+        self.active_count = int(self.active.sum())
+        self.advancers = int((self.direction > 0).sum())
+        self.decliners = int((self.direction < 0).sum())
+        self.new_highs = int(self.new_high.sum())
+        self.new_lows = int(self.new_low.sum())
+        
+        sector_returns = self.sector_return[valid_sector]
+        self.sector_count = len(sector_returns)
+        self.sector_sum = float(sector_returns.sum())
+        self.sector_sumsq = float((sector_returns ** 2).sum())
+    
+    def _reset_counters(self):
+        """Zero the running counters"""
+        self.active_count = 0
+        self.advancers = 0
+        self.decliners = 0
+        self.new_highs = 0
+        self.new_lows = 0
+        self.sector_count = 0
+        self.sector_sum = 0.0
+        self.sector_sumsq = 0.0
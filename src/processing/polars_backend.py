@@ -0,0 +1,208 @@
+"""
+Polars execution backend for feature engineering
+"""
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PolarsFeatureBackend:
+    """
+    Compute FeatureEngineer indicators with Polars lazy expressions
+    
+    All indicators are expressed as column expressions over ``close`` and
+    collected in a single lazy query, so Polars evaluates them in parallel
+    across threads. Arrow tables and Polars frames are consumed without
+    copying; pandas frames are converted through Arrow.
+    """
+    
+    def create_features(self, data) -> Dict:
+        """
+        Calculate technical and momentum indicators in one lazy query
+        
+        Args:
+            data: pandas/Polars DataFrame, Polars LazyFrame or Arrow table
+            
+        Returns:
+            Dictionary of features
+        """
+        return self._collect(data, self._technical_exprs() + self._momentum_exprs())
+    
+    def create_features_by_symbol(self, data, symbol_column: str = 'symbol') -> Dict[str, Dict]:
+        """
+        Calculate features for every symbol of a long-format frame
+        
+        Symbols are evaluated as groups of one lazy query, which Polars
+        spreads over its thread pool.
+        
+        Args:
+            data: Long-format market data with symbol and 'close' columns
+            symbol_column: Name of the symbol column
+            
+        Returns:
+            Dictionary of symbol -> features
+        """
+        exprs = self._technical_exprs() + self._momentum_exprs()
+        close = pl.col('close')
+        
+        query = (
+            self._to_lazy(data, [symbol_column])
+            .group_by(symbol_column, maintain_order=True)
+            .agg([close.len().alias('_length')] + [expr.alias(name) for name, expr in exprs])
+        )
+        
+        results = {}
+        for row in query.collect().iter_rows(named=True):
+            symbol = row.pop(symbol_column)
+            length = row.pop('_length')
+            results[symbol] = self._apply_fallbacks(row, length)
+        
+        return results
+    
+    def technical_indicators(self, data) -> Dict:
+        """
+        Calculate technical indicators
+        
+        Args:
+            data: Market data with a 'close' column
+            
+        Returns:
+            Technical indicators
+        """
+        return self._collect(data, self._technical_exprs())
+    
+    def momentum_indicators(self, data) -> Dict:
+        """
+        Calculate momentum indicators
+        
+        Args:
+            data: Market data with a 'close' column
+            
+        Returns:
+            Momentum features
+        """
+        return self._collect(data, self._momentum_exprs())
+    
+    def _to_lazy(self, data, keys: List[str] = None) -> pl.LazyFrame:
+        """Wrap supported inputs as a LazyFrame over the 'close' column"""
+        keys = keys or []
+        if isinstance(data, pl.LazyFrame):
+            lazy = data
+        elif isinstance(data, pl.DataFrame):
+            lazy = data.lazy()
+        elif isinstance(data, pa.Table):
+            lazy = pl.from_arrow(data).lazy()
+        elif isinstance(data, pd.DataFrame):
+            lazy = pl.from_pandas(data[keys + ['close']]).lazy()
+        else:
+            raise ValueError(f"Unsupported data type for polars backend: {type(data).__name__}")
+        
+        return lazy.select(keys + [pl.col('close').cast(pl.Float64)])
+    
+    def _has_close(self, data) -> bool:
+        """Check whether input data carries a 'close' column"""
+        if isinstance(data, pl.LazyFrame):
+            schema = data.collect_schema() if hasattr(data, 'collect_schema') else data.schema
+            return 'close' in schema.names()
+        if isinstance(data, pa.Table):
+            return 'close' in data.column_names
+        return 'close' in data.columns
+    
+    def _collect(self, data, exprs: List[Tuple[str, pl.Expr]]) -> Dict:
+        """Run the expressions in one lazy query and apply pandas-path fallbacks"""
+        if not self._has_close(data):
+            return {}
+        
+        close = pl.col('close')
+        query = self._to_lazy(data).select(
+            [close.len().alias('_length')] + [expr.alias(name) for name, expr in exprs]
+        )
+        row = query.collect().row(0, named=True)
+        length = row.pop('_length')
+        
+        return self._apply_fallbacks(row, length)
+    
+    def _technical_exprs(self) -> List[Tuple[str, pl.Expr]]:
+        """Expressions mirroring FeatureEngineer.technical_indicators"""
+        close = pl.col('close')
+        
+        # RSI (first diff is null, which maps to zero gain/loss like pandas)
+        delta = close.tail(15).diff().tail(14)
+        gain = pl.when(delta > 0).then(delta).otherwise(0.0).mean()
+        loss = pl.when(delta < 0).then(-delta).otherwise(0.0).mean()
+        rsi = 100 - (100 / (1 + gain / loss))
+        
+        # MACD
+        macd = self._ewm(close, 12) - self._ewm(close, 26)
+        macd_signal = self._ewm(macd, 9)
+        
+        # Bollinger Bands
+        sma = self._last_window_mean(close, 20)
+        std = self._last_window_std(close, 20)
+        
+        return [
+            ('rsi_14', rsi),
+            ('macd', macd.last()),
+            ('macd_signal', macd_signal.last()),
+            ('macd_histogram', (macd - macd_signal).last()),
+            ('bb_upper', sma + std * 2),
+            ('bb_middle', sma),
+            ('bb_lower', sma - std * 2),
+            ('bb_width', (sma + std * 2) - (sma - std * 2)),
+            ('sma_20', sma),
+            ('sma_50', self._last_window_mean(close, 50)),
+            ('ema_12', self._ewm(close, 12).last()),
+        ]
+    
+    def _last_window_mean(self, expr: pl.Expr, window: int) -> pl.Expr:
+        """Last value of a full-window rolling mean, computed from the tail only"""
+        tail = expr.tail(window)
+        return pl.when((tail.count() == window)).then(tail.mean())
+    
+    def _last_window_std(self, expr: pl.Expr, window: int) -> pl.Expr:
+        """Last value of a full-window rolling std (ddof=1), computed from the tail only"""
+        tail = expr.tail(window)
+        return pl.when((tail.count() == window)).then(tail.std())
+    
+    def _ewm(self, expr: pl.Expr, span: int) -> pl.Expr:
+        """EWM mean matching pandas, which carries the last mean over missing values"""
+        return expr.ewm_mean(span=span, adjust=True, ignore_nulls=False).forward_fill()
+    
+    def _momentum_exprs(self) -> List[Tuple[str, pl.Expr]]:
+        """Expressions mirroring FeatureEngineer.momentum_indicators"""
+        close = pl.col('close')
+        exprs = []
+        
+        for name, period in (('roc_1d', 1), ('roc_5d', 5), ('roc_20d', 20)):
+            base = close.shift(period).last()
+            exprs.append((name, (close.last() - base) / base * 100))
+        
+        exprs.append(('momentum_10', close.last() - close.tail(10).first()))
+        
+        return exprs
+    
+    def _apply_fallbacks(self, row: Dict, length: int) -> Dict:
+        """Apply the short-history defaults used by the pandas path"""
+        features = {name: np.nan if value is None else float(value) for name, value in row.items()}
+        
+        if 'rsi_14' in features:
+            if length < 15 or np.isnan(features['rsi_14']):
+                features['rsi_14'] = 50.0
+            if length < 26:
+                features.update({'macd': 0, 'macd_signal': 0, 'macd_histogram': 0})
+            if length < 20:
+                features.update({'bb_upper': 0, 'bb_middle': 0, 'bb_lower': 0, 'bb_width': 0})
+        
+        for name, period in (('roc_1d', 1), ('roc_5d', 5), ('roc_20d', 20)):
+            if name in features and (length < period + 1 or np.isnan(features[name])):
+                features[name] = 0.0
+        
+        if 'momentum_10' in features and length < 10:
+            features['momentum_10'] = 0
+        
+        return features
@@ -0,0 +1,251 @@
+"""
+Mergeable streaming quantile sketch (KLL)
+"""
+from typing import Dict, List, Optional
+from array import array
+import bisect
+import math
+import random
+import struct
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Half the interquartile range estimates the MAD of a symmetric
+# distribution; 1.4826 scales a MAD to a normal-consistent sigma
+_IQR_TO_MAD = 0.5
+_MAD_TO_SIGMA = 1.4826
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch
+    
+    Values enter level 0. When a level exceeds its capacity it is sorted and
+    every other item (random offset) is promoted to the next level with
+    doubled weight. Capacities shrink geometrically towards lower levels, so
+    the sketch keeps O(k log(n/k)) items with rank error around 1.7/k, and an
+    update costs amortized O(log n). Sketches with the same ``k`` merge by
+    concatenating levels and compacting, which makes them shard-friendly.
+    
+    Queries read a sorted, weighted view of all items. The view is rebuilt
+    only once more than count/k values arrived since it was built, so its
+    staleness adds at most 1/k to the rank error while the rebuild cost is
+    spread over count/k updates. Scoring every update therefore stays cheap
+    once the sketch holds a few multiples of k values.
+    """
+    
+    HEADER = struct.Struct('<IQI')  # k, count, number of levels
+    
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.compactors: List[List[float]] = [[]]
+        self._random = random.Random(seed)
+        self._size = 0
+        self._max_size = 0
+        self._sorted = None
+        self._stale = 0  # updates since the sorted view was built
+        self._update_max_size()
+    
+    def update(self, value: float):
+        """
+        Add a value
+        
+        Args:
+            value: Observed value
+        """
+        if value is None or math.isnan(value):
+            return
+        
+        self.compactors[0].append(float(value))
+        self.count += 1
+        self._size += 1
+        self._stale += 1
+        
+        if self._size >= self._max_size:
+            self._compress()
+    
+    def merge(self, other: 'QuantileSketch'):
+        """
+        Merge another sketch into this one
+        
+        Args:
+            other: Sketch built with the same k
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}")
+        
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        
+        self.count += other.count
+        self._size = sum(len(items) for items in self.compactors)
+        self._sorted = None
+        self._update_max_size()
+        
+        while self._size >= self._max_size:
+            self._compress()
+    
+    def rank(self, value: float) -> float:
+        """
+        Estimated fraction of values <= value
+        
+        Args:
+            value: Query value
+            
+        Returns:
+            Rank in [0, 1]
+        """
+        if self.count == 0:
+            return 0.5
+        
+        values, cumulative = self._sorted_view()
+        position = bisect.bisect_right(values, value)
+        weight = cumulative[position - 1] if position > 0 else 0
+        return weight / cumulative[-1]
+    
+    def quantile(self, q: float) -> float:
+        """
+        Estimated q-quantile
+        
+        Args:
+            q: Quantile in [0, 1]
+            
+        Returns:
+            Value at the quantile (NaN if empty)
+        """
+        if self.count == 0:
+            return float('nan')
+        
+        values, cumulative = self._sorted_view()
+        target = q * cumulative[-1]
+        position = bisect.bisect_left(cumulative, target)
+        return values[min(position, len(values) - 1)]
+    
+    def median(self) -> float:
+        """Estimated median"""
+        return self.quantile(0.5)
+    
+    def robust_scores(self, value: float) -> Dict:
+        """
+        Robust location/scale scores for a value
+        
+        The MAD is estimated as half the interquartile range, which equals
+        the MAD for symmetric distributions and needs only two quantiles.
+        
+        Args:
+            value: Value to score
+            
+        Returns:
+            median, half_iqr (the MAD estimate), robust_z and
+            percentile_rank (0-100)
+        """
+        median = self.quantile(0.5)
+        half_iqr = (self.quantile(0.75) - self.quantile(0.25)) * _IQR_TO_MAD
+        scale = half_iqr * _MAD_TO_SIGMA
+        robust_z = (value - median) / scale if scale > 0 else 0.0
+        
+        return {
+            'median': median,
+            'half_iqr': half_iqr,
+            'robust_z': robust_z,
+            'percentile_rank': self.rank(value) * 100
+        }
+    
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the sketch
+        
+        Returns:
+            Compact binary representation
+        """
+        lengths = array('I', [len(items) for items in self.compactors])
+        values = array('d', [value for items in self.compactors for value in items])
+        header = self.HEADER.pack(self.k, self.count, len(self.compactors))
+        return header + lengths.tobytes() + values.tobytes()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes, seed: Optional[int] = None) -> 'QuantileSketch':
+        """
+        Deserialize a sketch
+        
+        Args:
+            data: Output of to_bytes
+            seed: Seed for future compactions
+            
+        Returns:
+            QuantileSketch
+        """
+        k, count, levels = cls.HEADER.unpack_from(data)
+        offset = cls.HEADER.size
+        
+        lengths = array('I')
+        lengths.frombytes(data[offset:offset + 4 * levels])
+        offset += 4 * levels
+        
+        values = array('d')
+        values.frombytes(data[offset:offset + 8 * sum(lengths)])
+        
+        sketch = cls(k=k, seed=seed)
+        sketch.count = count
+        sketch.compactors = []
+        position = 0
+        for length in lengths:
+            sketch.compactors.append(values[position:position + length].tolist())
+            position += length
+        
+        sketch._size = len(values)
+        sketch._update_max_size()
+        return sketch
+    
+    def _capacity(self, level: int) -> int:
+        """Capacity of a level; the top level gets k"""
+        depth = len(self.compactors) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+    
+    def _update_max_size(self):
+        self._max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+    
+    def _compress(self):
+        """Compact the first over-capacity level into the next one"""
+        for level in range(len(self.compactors)):
+            if len(self.compactors[level]) < self._capacity(level):
+                continue
+            
+            if level + 1 == len(self.compactors):
+                self.compactors.append([])
+                self._update_max_size()
+            
+            items = self.compactors[level]
+            items.sort()
+            
+            # Odd item out stays at this level; taking the smallest or the
+            # largest at random keeps the compaction unbiased
+            keep = [items.pop(-1 if self._random.random() < 0.5 else 0)] if len(items) % 2 else []
+            offset = self._random.random() < 0.5
+            self.compactors[level + 1].extend(items[offset::2])
+            self.compactors[level] = keep
+            
+            self._size = sum(len(items) for items in self.compactors)
+            break
+    
+    def _sorted_view(self):
+        """Sorted values with cumulative weights (rebuilt once count/k updates old)"""
+        if self._sorted is None or self._stale * self.k > self.count:
+            weighted = sorted(
+                (value, 1 << level)
+                for level, items in enumerate(self.compactors)
+                for value in items
+            )
+            values = [value for value, _ in weighted]
+            cumulative = []
+            total = 0
+            for _, weight in weighted:
+                total += weight
+                cumulative.append(total)
+            self._sorted = (values, cumulative)
+            self._stale = 0
+        return self._sorted
@@ -0,0 +1,293 @@
+"""
+Hash-sharded multi-process stream processor
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import heapq
+import multiprocessing as mp
+import zlib
+import logging
+from .stream_processor import StreamProcessor, ProcessedSignal
+from .quantile_sketch import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+
+def _merge_key(timestamp: datetime) -> datetime:
+    """UTC instant used to order results; naive timestamps are taken as UTC"""
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def _shard_worker(
+    conn,
+    window_size: int,
+    snapshot_path: Optional[str],
+    snapshot_interval: float,
+    sketch_k: int,
+    scoring: str
+):
+    """Shard process loop: own one StreamProcessor and serve batched commands"""
+    processor = StreamProcessor(
+        window_size=window_size,
+        snapshot_path=snapshot_path,
+        snapshot_interval=snapshot_interval,
+        sketch_k=sketch_k,
+        scoring=scoring
+    )
+    
+    while True:
+        try:
+            command, payload = conn.recv()
+        except EOFError:
+            break
+        
+        if command == 'batch':
+            results = []
+            for seq, symbol, value, timestamp in payload:
+                signal = processor.process_tick(symbol, value, timestamp)
+                if signal:
+                    results.append((_merge_key(timestamp), seq, signal))
+            results.sort(key=lambda result: (result[0], result[1]))
+            conn.send(results)
+        elif command == 'stats':
+            conn.send(processor.get_statistics(payload))
+        elif command == 'sketches':
+            symbols = payload if payload is not None else list(processor.sketches.keys())
+            conn.send({
+                symbol: processor.sketches[symbol].to_bytes()
+                for symbol in symbols if symbol in processor.sketches
+            })
+        elif command == 'clear':
+            processor.clear_buffer(payload)
+            conn.send(None)
+        elif command == 'snapshot':
+            conn.send(processor.save_snapshot())
+        elif command == 'stop':
+            processor.close()
+            conn.send(None)
+            break
+    
+    conn.close()
+
+
+class ShardedStreamProcessor:
+    """
+    StreamProcessor partitioned across worker processes by symbol hash
+    
+    Each shard process owns the buffers of the symbols routed to it (stable
+    CRC32 of the symbol), so shards never share state. Ticks are sent as one
+    batched message per shard, all shards work concurrently, and their
+    results are merged back in (timestamp, arrival) order. Naive and aware
+    timestamps may be mixed; naive ones are ordered as UTC.
+    
+    A shard process that dies loses its symbols' state, so any later call
+    involving it raises RuntimeError naming the shard instead of blocking on
+    its pipe; close() still stops the remaining shards.
+    """
+    
+    def __init__(
+        self,
+        num_shards: int = 4,
+        window_size: int = 100,
+        snapshot_path: str = None,
+        snapshot_interval: float = 60,
+        sketch_k: int = 200,
+        scoring: str = 'zscore',
+        start_method: str = None,
+        clock: Callable[[], datetime] = None
+    ):
+        self.num_shards = num_shards
+        self.window_size = window_size
+        self.sketch_k = sketch_k
+        self.clock = clock or datetime.now  # stamps ticks that arrive without a timestamp
+        self._seq = 0
+        
+        context = mp.get_context(start_method)
+        self._connections = []
+        self._processes = []
+        
+        for shard in range(num_shards):
+            # Shard count is part of the path so a resharded run starts fresh
+            shard_snapshot = f"{snapshot_path}.{num_shards}-{shard}" if snapshot_path else None
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_shard_worker,
+                args=(child_conn, window_size, shard_snapshot, snapshot_interval, sketch_k, scoring),
+                name=f"stream-shard-{shard}",
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+        
+        logger.info(f"Started {num_shards} stream processor shards")
+    
+    def shard_for(self, symbol: str) -> int:
+        """
+        Get the shard owning a symbol
+        
+        Args:
+            symbol: Symbol identifier
+            
+        Returns:
+            Shard index
+        """
+        return zlib.crc32(symbol.encode('utf-8')) % self.num_shards
+    
+    def process_batch(self, ticks: List[Tuple]) -> List[ProcessedSignal]:
+        """
+        Process a batch of ticks across shards
+        
+        Args:
+            ticks: (symbol, value) or (symbol, value, timestamp) tuples
+            
+        Returns:
+            Significant ProcessedSignals in timestamp order
+        """
+        batches = [[] for _ in range(self.num_shards)]
+        now = self.clock()
+        
+        for tick in ticks:
+            symbol, value = tick[0], tick[1]
+            timestamp = tick[2] if len(tick) > 2 and tick[2] is not None else now
+            batches[self.shard_for(symbol)].append((self._seq, symbol, value, timestamp))
+            self._seq += 1
+        
+        # Fan out first so shards work concurrently, then gather
+        active = [shard for shard, batch in enumerate(batches) if batch]
+        shard_results = self._exchange({shard: ('batch', batches[shard]) for shard in active})
+        
+        merged = heapq.merge(*shard_results, key=lambda result: (result[0], result[1]))
+        return [signal for _, _, signal in merged]
+    
+    def process_tick(self, symbol: str, value: float, timestamp: datetime = None) -> Optional[ProcessedSignal]:
+        """
+        Process a single tick (prefer process_batch for throughput)
+        
+        Args:
+            symbol: Symbol identifier
+            value: Data value
+            timestamp: Timestamp (default: now)
+            
+        Returns:
+            ProcessedSignal if anomaly detected, None otherwise
+        """
+        results = self.process_batch([(symbol, value, timestamp)])
+        return results[0] if results else None
+    
+    def get_statistics(self, symbol: str) -> Optional[Dict]:
+        """Get current statistics for a symbol from its shard"""
+        return self._request(self.shard_for(symbol), 'stats', symbol)
+    
+    def get_sketch(self, symbol: str) -> Optional[QuantileSketch]:
+        """Get the quantile sketch of a symbol from its shard"""
+        blobs = self._request(self.shard_for(symbol), 'sketches', [symbol])
+        return QuantileSketch.from_bytes(blobs[symbol]) if symbol in blobs else None
+    
+    def merged_sketch(self, symbols: List[str] = None) -> QuantileSketch:
+        """
+        Merge quantile sketches across shards
+        
+        Args:
+            symbols: Symbols to include (default: all)
+            
+        Returns:
+            One sketch summarizing the combined distribution
+        """
+        replies = self._exchange({shard: ('sketches', symbols) for shard in range(self.num_shards)})
+        
+        merged = QuantileSketch(k=self.sketch_k)
+        for blobs in replies:
+            for blob in blobs.values():
+                merged.merge(QuantileSketch.from_bytes(blob))
+        return merged
+    
+    def clear_buffer(self, symbol: str):
+        """Clear buffer for a symbol on its shard"""
+        self._request(self.shard_for(symbol), 'clear', symbol)
+    
+    def save_snapshot(self) -> bool:
+        """
+        Snapshot every shard
+        
+        Returns:
+            True if all shards wrote a snapshot
+        """
+        results = self._exchange({shard: ('snapshot', None) for shard in range(self.num_shards)})
+        return all(results)
+    
+    def close(self):
+        """Snapshot and stop all shard processes"""
+        for conn in self._connections:
+            try:
+                conn.send(('stop', None))
+                conn.recv()
+            except (EOFError, OSError):
+                pass
+            conn.close()
+        
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                logger.warning(f"{process.name} did not stop, terminating")
+                process.terminate()
+                process.join()
+        
+        self._connections.clear()
+        self._processes.clear()
+        logger.info("Stopped stream processor shards")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _request(self, shard: int, command: str, payload=None):
+        """Send one command to a shard and wait for its reply"""
+        return self._exchange({shard: (command, payload)})[0]
+    
+    def _exchange(self, messages: Dict[int, Tuple]) -> List:
+        """
+        Send one message per shard, then collect every reply
+        
+        Replies of healthy shards are always read, so a failure leaves no
+        stale reply in a pipe.
+        
+        Args:
+            messages: Shard index -> (command, payload)
+            
+        Returns:
+            Replies in the order of messages
+            
+        Raises:
+            RuntimeError: A shard process died
+        """
+        sent = []
+        failed = []
+        for shard, message in messages.items():
+            if not self._processes[shard].is_alive():
+                failed.append(shard)
+                continue
+            try:
+                self._connections[shard].send(message)
+                sent.append(shard)
+            except OSError:
+                failed.append(shard)
+        
+        replies = []
+        for shard in sent:
+            try:
+                replies.append(self._connections[shard].recv())
+            except (EOFError, OSError):
+                failed.append(shard)
+        
+        if failed:
+            for shard in failed:
+                self._processes[shard].join(timeout=1)
+            details = ', '.join(f"{self._processes[shard].name} (exit code {self._processes[shard].exitcode})" for shard in sorted(failed))
+            raise RuntimeError(f"Stream shard process died: {details}")
+        return replies
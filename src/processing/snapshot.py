@@ -0,0 +1,176 @@
+"""
+Memory-mapped snapshots of stream processor state
+"""
+from typing import Dict, Iterable, Optional
+from dataclasses import dataclass, field
+import os
+import struct
+import time
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamSnapshot:
+    """Stream processor state restored from a snapshot file"""
+    window_size: int
+    created_at: float
+    buffers: Dict[str, np.ndarray]  # symbol -> values, oldest first
+    stats: Dict[str, Dict]          # symbol -> {mean, std}
+    sketches: Dict[str, bytes] = field(default_factory=dict)  # symbol -> serialized QuantileSketch
+
+
+class SnapshotStore:
+    """
+    Versioned snapshot file for ring buffers and running statistics
+    
+    Layout (little endian, sections 8-byte aligned):
+        header        magic, format version, window size, symbol count,
+                      symbol table length, creation time
+        symbol table  newline-joined UTF-8 symbols
+        counts        int32[n]            valid values per buffer
+        buffers       float64[n, window]  values, oldest first
+        stats         float64[n, 2]       cached mean and std (NaN if unset)
+        sketch index  int64[n + 1]        byte offsets into the sketch blob
+        sketch blob   bytes               serialized quantile sketches
+        
+    Snapshots are written to a temporary file and atomically renamed, and
+    read back through a read-only memory map so restore cost is a page-in.
+    """
+    
+    MAGIC = b'MFSNAP\x00\x00'
+    FORMAT_VERSION = 2
+    HEADER = struct.Struct('<8sIIIId')
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def save(
+        self,
+        window_size: int,
+        buffers: Dict[str, Iterable[float]],
+        stats: Dict[str, Dict],
+        sketches: Dict[str, bytes] = None
+    ):
+        """
+        Write a snapshot
+        
+        Args:
+            window_size: Ring buffer capacity
+            buffers: Symbol -> buffered values, oldest first
+            stats: Symbol -> {mean, std}
+            sketches: Symbol -> serialized quantile sketch
+        """
+        sketches = sketches or {}
+        symbols = list(buffers.keys())
+        n = len(symbols)
+        symbol_table = '\n'.join(symbols).encode('utf-8')
+        
+        blobs = [sketches.get(symbol, b'') for symbol in symbols]
+        blob_offsets = np.zeros(n + 1, dtype=np.int64)
+        blob_offsets[1:] = np.cumsum([len(blob) for blob in blobs])
+        
+        offsets = self._offsets(n, window_size, len(symbol_table), int(blob_offsets[-1]))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        tmp_path = f"{self.path}.tmp"
+        mapped = np.memmap(tmp_path, dtype=np.uint8, mode='w+', shape=(offsets['end'],))
+        
+        header = self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, window_size, n, len(symbol_table), time.time())
+        mapped[:self.HEADER.size] = np.frombuffer(header, dtype=np.uint8)
+        mapped[offsets['symbols']:offsets['symbols'] + len(symbol_table)] = np.frombuffer(symbol_table, dtype=np.uint8)
+        
+        counts, values, cached, index = self._sections(mapped, offsets, n, window_size)
+        cached[:] = np.nan
+        index[:] = blob_offsets
+        if blob_offsets[-1]:
+            mapped[offsets['sketches']:offsets['end']] = np.frombuffer(b''.join(blobs), dtype=np.uint8)
+        for i, symbol in enumerate(symbols):
+            row = np.fromiter(buffers[symbol], dtype=np.float64)[-window_size:]
+            counts[i] = len(row)
+            values[i, :len(row)] = row
+            if symbol in stats:
+                cached[i] = (stats[symbol]['mean'], stats[symbol]['std'])
+        
+        mapped.flush()
+        del mapped
+        os.replace(tmp_path, self.path)
+    
+    def load(self) -> Optional[StreamSnapshot]:
+        """
+        Map a snapshot file
+        
+        Returns:
+            StreamSnapshot, or None if missing or written by another format version
+        """
+        if not os.path.exists(self.path):
+            return None
+        
+        mapped = np.memmap(self.path, dtype=np.uint8, mode='r')
+        if len(mapped) < self.HEADER.size:
+            logger.warning(f"Snapshot {self.path} is truncated, ignoring")
+            return None
+        
+        magic, version, window_size, n, table_len, created_at = self.HEADER.unpack(
+            mapped[:self.HEADER.size].tobytes()
+        )
+        if magic != self.MAGIC or version != self.FORMAT_VERSION:
+            logger.warning(f"Snapshot {self.path} has incompatible format (version {version}), ignoring")
+            return None
+        
+        offsets = self._offsets(n, window_size, table_len)
+        if len(mapped) >= offsets['sketches']:
+            blob_len = int(mapped[offsets['index']:offsets['sketches']].view(np.int64)[-1])
+            offsets = self._offsets(n, window_size, table_len, blob_len)
+        if len(mapped) < offsets['end']:
+            logger.warning(f"Snapshot {self.path} is truncated, ignoring")
+            return None
+        
+        table = mapped[offsets['symbols']:offsets['symbols'] + table_len].tobytes().decode('utf-8')
+        symbols = table.split('\n') if n else []
+        counts, values, cached, index = self._sections(mapped, offsets, n, window_size)
+        
+        buffers = {}
+        stats = {}
+        sketches = {}
+        for i, symbol in enumerate(symbols):
+            buffers[symbol] = values[i, :counts[i]]
+            if not np.isnan(cached[i, 0]):
+                stats[symbol] = {'mean': float(cached[i, 0]), 'std': float(cached[i, 1])}
+            if index[i + 1] > index[i]:
+                start = offsets['sketches'] + int(index[i])
+                sketches[symbol] = mapped[start:offsets['sketches'] + int(index[i + 1])].tobytes()
+        
+        return StreamSnapshot(
+            window_size=window_size,
+            created_at=created_at,
+            buffers=buffers,
+            stats=stats,
+            sketches=sketches
+        )
+    
+    def _offsets(self, n: int, window_size: int, table_len: int, blob_len: int = 0) -> Dict[str, int]:
+        """Byte offsets of each section"""
+        def align(offset: int) -> int:
+            return (offset + 7) // 8 * 8
+        
+        offsets = {'symbols': self.HEADER.size}
+        offsets['counts'] = align(offsets['symbols'] + table_len)
+        offsets['buffers'] = align(offsets['counts'] + 4 * n)
+        offsets['stats'] = offsets['buffers'] + 8 * n * window_size
+        offsets['index'] = offsets['stats'] + 8 * n * 2
+        offsets['sketches'] = offsets['index'] + 8 * (n + 1)
+        offsets['end'] = offsets['sketches'] + blob_len
+        return offsets
+    
+    def _sections(self, mapped: np.ndarray, offsets: Dict[str, int], n: int, window_size: int):
+        """Typed views of the counts, buffers, stats and sketch index sections"""
+        counts = mapped[offsets['counts']:offsets['counts'] + 4 * n].view(np.int32)
+        values = mapped[offsets['buffers']:offsets['stats']].view(np.float64).reshape(n, window_size)
+        cached = mapped[offsets['stats']:offsets['index']].view(np.float64).reshape(n, 2)
+        index = mapped[offsets['index']:offsets['sketches']].view(np.int64)
+        return counts, values, cached, index
@@ -1,12 +1,16 @@
 """
 Stream processor for real-time data
 """
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 from collections import deque
+import threading
+import time
 import numpy as np
 from dataclasses import dataclass
 import logging
+from .snapshot import SnapshotStore
+from .quantile_sketch import QuantileSketch
 
 logger = logging.getLogger(__name__)
 
@@ -24,12 +28,53 @@ class ProcessedSignal:
 
 
 class StreamProcessor:
-    """Real-time data stream processor"""
+    """
+    Real-time data stream processor
     
-    def __init__(self, window_size: int = 100):
+    Besides the rolling window, every symbol keeps a quantile sketch of its
+    full history. With scoring='robust' the significance test uses the
+    sketch's median/half-IQR score instead of the window mean/std z-score, which
+    is less sensitive to the fat tails of market data.
+    
+    With a snapshot path, state is written every ``snapshot_interval``
+    seconds by a background timer (only if ticks arrived since the last
+    snapshot, so an idle feed loses nothing) and once more by ``close``.
+    """
+    
+    SCORING_METHODS = ('zscore', 'robust')
+    
+    def __init__(
+        self,
+        window_size: int = 100,
+        snapshot_path: str = None,
+        snapshot_interval: float = 60,
+        sketch_k: int = 200,
+        scoring: str = 'zscore',
+        clock: Callable[[], datetime] = None
+    ):
+        if scoring not in self.SCORING_METHODS:
+            raise ValueError(f"Unknown scoring method '{scoring}'")
+        
         self.window_size = window_size
         self.data_buffers = {}  # symbol -> deque of values
         self.stats_cache = {}   # symbol -> {mean, std}
+        self.sketches: Dict[str, QuantileSketch] = {}  # symbol -> full-history quantile sketch
+        self.sketch_k = sketch_k
+        self.scoring = scoring
+        self.clock = clock or datetime.now  # replaced by a simulated clock in backtests
+        
+        # Warm restart from memory-mapped snapshots
+        self.snapshot_store = SnapshotStore(snapshot_path) if snapshot_path else None
+        self.snapshot_interval = snapshot_interval  # seconds between snapshots
+        self._last_snapshot = time.monotonic()
+        self._dirty = False  # ticks since the last snapshot
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._timer = None
+        if self.snapshot_store:
+            self.restore_snapshot()
+            self._timer = threading.Thread(target=self._snapshot_loop, name='stream-snapshot', daemon=True)
+            self._timer.start()
     
     def process_tick(self, symbol: str, value: float, timestamp: datetime = None) -> Optional[ProcessedSignal]:
         """
@@ -38,48 +83,80 @@ class StreamProcessor:
         Args:
             symbol: Symbol identifier
             value: Data value
-            timestamp: Timestamp (default: now)
+            timestamp: Timestamp (default: clock time)
             
         Returns:
             ProcessedSignal if anomaly detected, None otherwise
         """
         if timestamp is None:
-            timestamp = datetime.now()
-        
-        # Initialize buffer if needed
-        if symbol not in self.data_buffers:
-            self.data_buffers[symbol] = deque(maxlen=self.window_size)
+            timestamp = self.clock()
         
-        # Add to buffer
-        self.data_buffers[symbol].append(value)
+        with self._lock:
+            # Initialize buffer if needed
+            if symbol not in self.data_buffers:
+                self.data_buffers[symbol] = deque(maxlen=self.window_size)
+            
+            # Add to buffer and sketch
+            self.data_buffers[symbol].append(value)
+            if symbol not in self.sketches:
+                self.sketches[symbol] = QuantileSketch(k=self.sketch_k)
+            self.sketches[symbol].update(value)
+            self._dirty = True
+            
+            # Score against the same buffer the tick was added to, so a
+            # concurrent tick or clear cannot change it in between
+            buffer_size = len(self.data_buffers[symbol])
+            if buffer_size >= 30:
+                z_score = self._calculate_z_score(symbol, value)
+                stats = self.stats_cache[symbol]
+                robust = self.sketches[symbol].robust_scores(value) if self.scoring == 'robust' else None
+                score = robust['robust_z'] if robust else z_score
+                if abs(score) > 2.0:
+                    robust = robust or self.sketches[symbol].robust_scores(value)
+        self._maybe_snapshot()
         
         # Need enough data for statistics
-        if len(self.data_buffers[symbol]) < 30:
+        if buffer_size < 30:
             return None
         
-        # Calculate statistics
-        z_score = self._calculate_z_score(symbol, value)
-        anomaly_score = self._calculate_anomaly_score(z_score)
-        signal_type = self._classify_signal(anomaly_score)
-        
         # Only return if significant
-        if abs(z_score) > 2.0:
+        if abs(score) > 2.0:
+            anomaly_score = self._calculate_anomaly_score(score)
             return ProcessedSignal(
                 symbol=symbol,
                 timestamp=timestamp,
                 value=value,
                 z_score=z_score,
                 anomaly_score=anomaly_score,
-                signal_type=signal_type,
+                signal_type=self._classify_signal(anomaly_score),
                 metadata={
-                    'buffer_size': len(self.data_buffers[symbol]),
-                    'mean': self.stats_cache[symbol]['mean'],
-                    'std': self.stats_cache[symbol]['std']
+                    'buffer_size': buffer_size,
+                    'mean': stats['mean'],
+                    'std': stats['std'],
+                    'scoring': self.scoring,
+                    **robust
                 }
             )
         
         return None
     
+    def process_batch(self, ticks: List[Tuple]) -> List[ProcessedSignal]:
+        """
+        Process a batch of ticks in order
+        
+        Args:
+            ticks: (symbol, value) or (symbol, value, timestamp) tuples
+            
+        Returns:
+            Significant ProcessedSignals in arrival order
+        """
+        results = []
+        for tick in ticks:
+            signal = self.process_tick(*tick[:3])
+            if signal:
+                results.append(signal)
+        return results
+    
     def _calculate_z_score(self, symbol: str, value: float) -> float:
         """
         Calculate Z-score for anomaly detection
@@ -157,7 +234,7 @@ class StreamProcessor:
         
         data = np.array(self.data_buffers[symbol])
         
-        return {
+        statistics = {
             'symbol': symbol,
             'count': len(data),
             'mean': float(np.mean(data)),
@@ -167,9 +244,141 @@ class StreamProcessor:
             'current': float(data[-1]),
             'change_pct': float((data[-1] - data[0]) / data[0] * 100) if data[0] != 0 else 0
         }
+        
+        sketch = self.sketches.get(symbol)
+        if sketch is not None and sketch.count:
+            robust = sketch.robust_scores(float(data[-1]))
+            statistics.update({
+                'history_count': sketch.count,
+                'median': robust['median'],
+                'half_iqr': robust['half_iqr'],
+                'p05': sketch.quantile(0.05),
+                'p95': sketch.quantile(0.95),
+                'percentile_rank': robust['percentile_rank']
+            })
+        
+        return statistics
+    
+    def get_robust_scores(self, symbol: str, value: float) -> Optional[Dict]:
+        """
+        Score a value against a symbol's full-history distribution
+        
+        Args:
+            symbol: Symbol identifier
+            value: Value to score
+            
+        Returns:
+            median, half_iqr, robust_z and percentile_rank, or None if unseen
+        """
+        sketch = self.sketches.get(symbol)
+        if sketch is None or sketch.count == 0:
+            return None
+        return sketch.robust_scores(value)
+    
+    def get_sketch(self, symbol: str) -> Optional[QuantileSketch]:
+        """Get the quantile sketch of a symbol"""
+        return self.sketches.get(symbol)
     
     def clear_buffer(self, symbol: str):
-        """Clear buffer for a symbol"""
+        """Clear buffer and quantile sketch for a symbol"""
         if symbol in self.data_buffers:
-            self.data_buffers[symbol].clear()
+            with self._lock:
+                self.data_buffers[symbol].clear()
+                self.sketches.pop(symbol, None)
+                self._dirty = True
             logger.info(f"Cleared buffer for {symbol}")
+    
+    def save_snapshot(self) -> bool:
+        """
+        Write buffers, cached statistics and sketches to the snapshot file
+        
+        Returns:
+            True if a snapshot was written
+        """
+        if not self.snapshot_store:
+            return False
+        
+        try:
+            with self._lock:
+                sketches = {symbol: sketch.to_bytes() for symbol, sketch in self.sketches.items()}
+                self.snapshot_store.save(self.window_size, self.data_buffers, self.stats_cache, sketches)
+                self._last_snapshot = time.monotonic()
+                self._dirty = False
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write stream snapshot: {e}")
+            return False
+    
+    def close(self):
+        """Stop the snapshot timer and write a final snapshot of unsaved ticks"""
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        if self._dirty:
+            self.save_snapshot()
+    
+    def restore_snapshot(self) -> int:
+        """
+        Restore buffers from the snapshot file
+        
+        A snapshot taken with a different window size is rebuilt: the most
+        recent values are kept up to the current window and statistics are
+        recomputed rather than trusted.
+        
+        Returns:
+            Number of restored symbols
+        """
+        if not self.snapshot_store:
+            return 0
+        
+        try:
+            snapshot = self.snapshot_store.load()
+        except Exception as e:
+            logger.error(f"Failed to read stream snapshot: {e}")
+            return 0
+        
+        if snapshot is None:
+            return 0
+        
+        rebuild = snapshot.window_size != self.window_size
+        for symbol, values in snapshot.buffers.items():
+            self.data_buffers[symbol] = deque(values.tolist(), maxlen=self.window_size)
+            
+            if rebuild:
+                if len(self.data_buffers[symbol]) > 0:
+                    data = np.array(self.data_buffers[symbol])
+                    self.stats_cache[symbol] = {'mean': np.mean(data), 'std': np.std(data)}
+            elif symbol in snapshot.stats:
+                self.stats_cache[symbol] = snapshot.stats[symbol]
+        
+        for symbol, blob in snapshot.sketches.items():
+            sketch = QuantileSketch.from_bytes(blob)
+            if sketch.k == self.sketch_k:
+                self.sketches[symbol] = sketch
+            else:
+                # Sketch accuracy parameter changed: reseed from the window
+                self.sketches[symbol] = QuantileSketch(k=self.sketch_k)
+                for value in self.data_buffers.get(symbol, ()):
+                    self.sketches[symbol].update(value)
+        
+        if rebuild:
+            logger.info(
+                f"Rebuilt stream state from snapshot with window {snapshot.window_size} "
+                f"(current {self.window_size})"
+            )
+        
+        age = time.time() - snapshot.created_at
+        logger.info(f"Restored {len(snapshot.buffers)} symbols from snapshot ({age:.0f}s old)")
+        return len(snapshot.buffers)
+    
+    def _maybe_snapshot(self):
+        """Write a snapshot if the snapshot interval has elapsed"""
+        if self.snapshot_store and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+            self.save_snapshot()
+    
+    def _snapshot_loop(self):
+        """Background timer: snapshot unsaved ticks once the interval elapsed"""
+        while not self._stop.wait(max(self.snapshot_interval / 4, 0.01)):
+            if self._dirty and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+                self.save_snapshot()
@@ -0,0 +1,5 @@
+"""Shared test setup"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,104 @@
+"""
+Bounded alert history: eviction, indexes, spill and time-range queries
+"""
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+
+from src.alerts.alert_history import AlertHistory
+
+START = datetime(2024, 1, 2, 9, 0)
+SCENARIOS = ['risk_off', 'carry_unwind', 'volatility_spike']
+SEVERITIES = ['WARNING', 'CRITICAL']
+
+
+def make_alert(i):
+    return {
+        'id': f'a{i}',
+        'scenario': SCENARIOS[i % 3],
+        'severity': SEVERITIES[i % 2],
+        'timestamp': (START + timedelta(minutes=i)).isoformat()
+    }
+
+
+def fill(history, count):
+    alerts = [make_alert(i) for i in range(count)]
+    for alert in alerts:
+        history.append(alert)
+    return alerts
+
+
+def test_evicts_oldest_at_capacity():
+    history = AlertHistory(max_alerts=5)
+    alerts = fill(history, 8)
+    
+    assert len(history) == 5
+    assert list(history) == alerts[3:]
+    assert history.query(limit=2) == alerts[6:]
+    assert history.query(limit=None) == alerts[3:]
+
+
+def test_indexes_stay_consistent_after_wraparound():
+    history = AlertHistory(max_alerts=5)
+    alerts = fill(history, 23)
+    kept = alerts[-5:]
+    
+    assert history.counts() == {
+        'scenario': dict(Counter(alert['scenario'] for alert in kept)),
+        'severity': dict(Counter(alert['severity'] for alert in kept))
+    }
+    for scenario in SCENARIOS:
+        assert history.query(limit=None, scenario=scenario) == [alert for alert in kept if alert['scenario'] == scenario]
+        for severity in SEVERITIES:
+            expected = [alert for alert in kept if alert['scenario'] == scenario and alert['severity'] == severity]
+            assert history.query(limit=None, scenario=scenario, severity=severity.lower()) == expected
+    assert history.query(limit=1, severity='CRITICAL') == [alert for alert in kept if alert['severity'] == 'CRITICAL'][-1:]
+    
+    # Ids resolve only while their alert is kept
+    assert history.get('a17') is None
+    assert history.get('a18') == alerts[18]
+    assert all(history.get(alert['id']) == alert for alert in kept)
+    
+    history.clear()
+    assert len(history) == 0
+    assert history.counts() == {'scenario': {}, 'severity': {}}
+    assert history.get('a22') is None
+
+
+def test_reused_id_survives_eviction_of_older_alert():
+    history = AlertHistory(max_alerts=2)
+    first = {**make_alert(0), 'id': 'dup'}
+    second = {**make_alert(1), 'id': 'dup'}
+    history.append(first)
+    history.append(second)
+    history.append(make_alert(2))
+    
+    assert history.get('dup') is second
+
+
+def test_evicted_alerts_spill_in_order(tmp_path):
+    path = tmp_path / 'spill' / 'alerts.jsonl'
+    history = AlertHistory(max_alerts=3, spill_path=str(path))
+    alerts = fill(history, 7)
+    history.clear()  # clearing drops alerts without spilling them
+    history.close()
+    
+    spilled = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert spilled == alerts[:4]
+    assert history.spilled == 4
+
+
+def test_time_range_across_wrap_point():
+    history = AlertHistory(max_alerts=5)
+    alerts = fill(history, 9)  # kept alerts 4..8 occupy slots 4, 0, 1, 2, 3
+    
+    def at(minute):
+        return START + timedelta(minutes=minute)
+    
+    assert history.query(limit=None, since=at(4), until=at(6)) == alerts[4:7]
+    assert history.query(limit=None, since=at(5)) == alerts[5:]
+    assert history.query(limit=None, until=at(5)) == alerts[4:6]
+    assert history.query(limit=2, since=at(0), until=at(7)) == alerts[6:8]
+    assert history.query(limit=None, scenario='carry_unwind', since=at(4), until=at(7)) == [alerts[4], alerts[7]]
+    # Evicted times match nothing
+    assert history.query(limit=None, until=at(3)) == []
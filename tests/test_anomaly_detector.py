@@ -0,0 +1,208 @@
+"""
+AnomalyDetector scoring modes
+"""
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.anomaly_detector import Anomaly, AnomalyAccumulator, AnomalyDetector
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.standard_t(3, (rows, 3)), columns=['a', 'b', 'c'])
+    frame.insert(0, 'timestamp', pd.date_range('2024-01-01', periods=rows, freq='min'))
+    return frame
+
+
+def ml_keys(anomalies):
+    return sorted((anomaly.timestamp, anomaly.score) for anomaly in anomalies if anomaly.anomaly_type == 'ml')
+
+
+def test_incremental_ml_matches_full_rescoring():
+    frame = make_frame(400)
+    detector = AnomalyDetector({'z_score_threshold': 99, 'max_anomalies': 1000})
+    
+    detector.detect_anomalies(frame.iloc[:250], stream_id='market')
+    overlapping = frame.iloc[100:400]
+    incremental = detector.detect_anomalies(overlapping, stream_id='market')
+    
+    # Same model scoring every row of the window at once
+    features = overlapping[['a', 'b', 'c']]
+    model = detector.isolation_forest
+    full = detector._ml_anomalies(overlapping, features, model.score_samples(features), model.offset_)
+    
+    assert full
+    assert ml_keys(incremental) == ml_keys(full)
+    # Cached rows before the window start are gone and nothing is repeated
+    assert min(anomaly.timestamp for anomaly in incremental if anomaly.anomaly_type == 'ml') >= str(overlapping['timestamp'].iloc[0])
+    assert ml_keys(detector.detect_anomalies(overlapping, stream_id='market')) == ml_keys(full)
+
+
+
+def test_incremental_ml_fills_nans_like_full_rescoring():
+    frame = make_frame(400, seed=3)
+    frame.loc[frame.index[::7], 'a'] = np.nan
+    frame.loc[frame.index[3::11], 'c'] = np.nan
+    detector = AnomalyDetector({'z_score_threshold': 99, 'max_anomalies': 1000})
+    
+    detector.detect_anomalies(frame.iloc[:250], stream_id='market')
+    overlapping = frame.iloc[100:400]
+    incremental = detector.detect_anomalies(overlapping, stream_id='market')
+    
+    # Whole-frame scoring fills NaNs with the window's own column means
+    features = overlapping[['a', 'b', 'c']]
+    features = features.fillna(features.mean())
+    model = detector.isolation_forest
+    full = detector._ml_anomalies(overlapping, features, model.score_samples(features), model.offset_)
+    
+    incomplete = set(overlapping.loc[overlapping[['a', 'c']].isna().any(axis=1), 'timestamp'].astype(str))
+    assert any(anomaly.timestamp in incomplete for anomaly in full)
+    assert ml_keys(incremental) == ml_keys(full)
+    filled = sorted(anomaly.details['features']['a'] for anomaly in incremental if anomaly.anomaly_type == 'ml')
+    assert filled == sorted(anomaly.details['features']['a'] for anomaly in full)
+
+
+def test_methods_merge_on_the_same_row():
+    frame = make_frame(200, seed=4)
+    frame.loc[frame.index[120], ['a', 'b', 'c']] = [25.0, -25.0, 25.0]
+    detector = AnomalyDetector({'z_score_threshold': 3.0, 'max_anomalies': 1000})
+    
+    anomalies = detector.detect_anomalies(frame, instrument='SPY')
+    
+    timestamp = str(frame['timestamp'].iloc[120])
+    row = [anomaly for anomaly in anomalies if anomaly.timestamp == timestamp]
+    assert len(row) == 1
+    assert row[0].symbol == 'SPY'
+    assert row[0].details['methods'] == ['statistical', 'ml']
+    assert row[0].details['columns'] == ['a', 'b', 'c']
+    assert row[0].score == max(row[0].details['method_scores'].values())
+    # One anomaly per row, every method reported under the instrument
+    assert len({anomaly.timestamp for anomaly in anomalies}) == len(anomalies)
+    assert {anomaly.symbol for anomaly in anomalies} == {'SPY'}
+
+def rolling_reference(frame: pd.DataFrame, window: int, threshold: float) -> set:
+    """(column, row) pairs whose |z| against the preceding window exceeds threshold"""
+    flagged = set()
+    for column in ['a', 'b', 'c']:
+        values = frame[column].to_numpy()
+        for row in range(len(values)):
+            baseline = values[max(row - window, 0):row]
+            baseline = baseline[~np.isnan(baseline)]
+            if len(baseline) < 30 or baseline.std(ddof=1) == 0:
+                continue
+            if abs(values[row] - baseline.mean()) / baseline.std(ddof=1) > threshold:
+                flagged.add((column, str(frame['timestamp'].iloc[row])))
+    return flagged
+
+
+def test_rolling_mode_matches_trailing_window_reference():
+    frame = make_frame(300, seed=1)
+    frame.loc[frame.index[::17], 'b'] = np.nan
+    config = {'statistical_mode': 'rolling', 'window_size': 50, 'z_score_threshold': 3.0, 'max_anomalies': 10000}
+    
+    anomalies = AnomalyDetector(config)._statistical_detection(frame)
+    
+    assert {(anomaly.symbol, anomaly.timestamp) for anomaly in anomalies} == rolling_reference(frame, 50, 3.0)
+
+
+def test_rolling_stream_scores_new_rows_once():
+    frame = make_frame(300, seed=2)
+    config = {'statistical_mode': 'rolling', 'window_size': 50, 'z_score_threshold': 3.0, 'max_anomalies': 10000}
+    detector = AnomalyDetector(config)
+    
+    reported = []
+    for end in range(60, len(frame) + 1, 9):
+        window = frame.iloc[max(end - 60, 0):end]
+        reported.extend((anomaly.symbol, anomaly.timestamp) for anomaly in detector._statistical_detection(window, stream_id='market'))
+    reported.extend((anomaly.symbol, anomaly.timestamp) for anomaly in detector._statistical_detection(frame.iloc[-60:], stream_id='market'))
+    
+    assert max(Counter(reported).values()) == 1
+    # Windows shorter than window_size still score against the full trailing history
+    covered = frame.iloc[:max(range(60, len(frame) + 1, 9))]
+    assert set(reported) == rolling_reference(covered, 50, 3.0)
+
+
+def loop_statistical_reference(frame: pd.DataFrame, threshold: float, limit: int) -> list:
+    """Per-column pandas z-scores, top `limit` by score (stable), back in column-then-row order"""
+    found = []
+    for column in frame.select_dtypes(include=[np.number]).columns:
+        values = frame[column].dropna()
+        if len(values) < 30 or values.std() == 0:
+            continue
+        z_scores = np.abs((values - values.mean()) / values.std())
+        for idx in z_scores[z_scores > threshold].index:
+            found.append((column, str(frame.loc[idx, 'timestamp']), min(float(z_scores[idx]) * 20, 100), float(values[idx])))
+    kept = sorted(range(len(found)), key=lambda i: -found[i][2])[:limit]
+    return [found[i] for i in sorted(kept)]
+
+
+def test_vectorized_statistical_matches_loop_reference():
+    frame = make_frame(200, seed=3)
+    frame['d'] = 1.0                                   # flat
+    frame['e'] = np.nan
+    frame.loc[frame.index[:25], 'e'] = 1.0             # too few values
+    frame.loc[frame.index[::11], 'b'] = np.nan
+    frame.loc[frame.index[[5, 50, 150]], 'a'] = 40.0   # capped scores tie at 100
+    frame.loc[frame.index[[7, 90]], 'c'] = -40.0
+    
+    for limit in (4, 12, 10000):
+        detector = AnomalyDetector({'z_score_threshold': 2.0, 'max_anomalies': limit})
+        anomalies = detector._statistical_detection(frame)
+        expected = loop_statistical_reference(frame, 2.0, limit)
+        
+        assert [(anomaly.symbol, anomaly.timestamp) for anomaly in anomalies] == [item[:2] for item in expected]
+        assert [anomaly.score for anomaly in anomalies] == pytest.approx([item[2] for item in expected])
+        assert [anomaly.details['value'] for anomaly in anomalies] == [item[3] for item in expected]
+        assert all(anomaly.severity == detector._calculate_severity(anomaly.details['z_score']) for anomaly in anomalies)
+
+
+def make_anomaly(symbol, timestamp, score, anomaly_type='statistical', severity='medium'):
+    return Anomaly(symbol=symbol, timestamp=timestamp, anomaly_type=anomaly_type, severity=severity, score=score, details={'source': anomaly_type})
+
+
+def test_accumulator_merges_same_symbol_and_timestamp():
+    accumulator = AnomalyAccumulator(capacity=10)
+    accumulator.add(make_anomaly('a', 't1', 40, 'statistical', 'high'))
+    accumulator.add(make_anomaly('a', 't1', 70, 'ml', 'low'))
+    accumulator.add(make_anomaly('a', 't2', 50))
+    accumulator.add(make_anomaly('b', 't1', 30, 'pattern'))
+    
+    results = accumulator.results()
+    
+    assert [(anomaly.symbol, anomaly.timestamp) for anomaly in results] == [('a', 't1'), ('a', 't2'), ('b', 't1')]
+    merged = results[0]
+    assert merged.score == 70
+    assert merged.anomaly_type == 'ml'
+    assert merged.severity == 'high'
+    assert merged.details['source'] == 'ml'
+    assert merged.details['methods'] == ['statistical', 'ml']
+    assert merged.details['method_scores'] == {'statistical': 40, 'ml': 70}
+
+
+def test_accumulator_evicts_weakest_at_capacity():
+    accumulator = AnomalyAccumulator(capacity=3)
+    for i, score in enumerate([10, 50, 30, 20, 60, 5]):
+        accumulator.add(make_anomaly('a', f't{i}', score))
+    
+    assert len(accumulator) == 3
+    assert [anomaly.score for anomaly in accumulator.results()] == [60, 50, 30]
+    
+    # A merge raising an entry's score moves it in the eviction order
+    accumulator.add(make_anomaly('a', 't2', 90, 'ml'))
+    accumulator.add(make_anomaly('b', 't9', 55))
+    assert [(anomaly.timestamp, anomaly.score) for anomaly in accumulator.results()] == [('t2', 90), ('t4', 60), ('t9', 55)]
+
+
+def test_accumulator_ties_keep_arrival_order():
+    anomalies = [make_anomaly('a', f't{i}', score) for i, score in enumerate([40, 40, 70, 40, 70, 40])]
+    
+    accumulator = AnomalyAccumulator(capacity=4)
+    accumulator.extend(anomalies)
+    
+    # Same outcome as a stable sort by score followed by truncation
+    expected = sorted(anomalies, key=lambda anomaly: -anomaly.score)[:4]
+    assert [anomaly.timestamp for anomaly in accumulator.results()] == [anomaly.timestamp for anomaly in expected]
+    assert AnomalyDetector({'max_anomalies': 4})._deduplicate_and_prioritize(anomalies) == accumulator.results()
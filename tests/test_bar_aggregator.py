@@ -0,0 +1,71 @@
+"""
+Bar boundaries and volume handling of the bar aggregator
+"""
+from datetime import datetime, timedelta, timezone
+
+from src.data_collection.collectors.base_collector import MarketData
+from src.processing.bar_aggregator import BarAggregator
+
+START = datetime(2024, 1, 2, 9, 30)
+
+
+def test_tick_on_boundary_opens_next_bar():
+    bars = BarAggregator(intervals=['1m', '5m'])
+    bars.add_tick('SPY', 100.0, timestamp=START)
+    bars.add_tick('SPY', 102.0, timestamp=START + timedelta(seconds=30))
+    bars.add_tick('SPY', 99.0, timestamp=START + timedelta(seconds=59, microseconds=999999))
+    
+    closed = bars.add_tick('SPY', 101.0, timestamp=START + timedelta(minutes=1))
+    
+    assert [(bar.interval, bar.timestamp) for bar in closed] == [('1m', START)]
+    bar = closed[0]
+    assert (bar.open, bar.high, bar.low, bar.close, bar.tick_count) == (100.0, 102.0, 99.0, 99.0, 3)
+    assert bars.open_bars[('SPY', '5m')].tick_count == 4
+
+
+def test_late_tick_is_dropped():
+    bars = BarAggregator(intervals=['1m'])
+    bars.add_tick('SPY', 100.0, timestamp=START + timedelta(minutes=1))
+    
+    assert bars.add_tick('SPY', 50.0, timestamp=START) == []
+    open_bar = bars.open_bars[('SPY', '1m')]
+    assert (open_bar.timestamp, open_bar.low, open_bar.tick_count) == (START + timedelta(minutes=1), 100.0, 1)
+
+
+def test_aware_timestamps_bucket_on_utc_boundaries():
+    kst = timezone(timedelta(hours=9))
+    bars = BarAggregator(intervals=['1h', '1d'])
+    bars.add_tick('EWY', 60.0, timestamp=datetime(2024, 1, 2, 8, 45, tzinfo=kst))
+    
+    # Bars keep the tick's zone, but boundaries are UTC-aligned: the daily bar
+    # opens at UTC midnight, which is 09:00 the previous day in Seoul
+    assert bars.open_bars[('EWY', '1h')].timestamp == datetime(2024, 1, 2, 8, 0, tzinfo=kst)
+    assert bars.open_bars[('EWY', '1d')].timestamp == datetime(2024, 1, 1, 9, 0, tzinfo=kst)
+
+
+def test_incremental_volume_is_summed():
+    bars = BarAggregator(intervals=['1m'])
+    for second, volume in [(0, 100), (20, 50), (40, 25)]:
+        bars.add_tick('SPY', 100.0, volume, START + timedelta(seconds=second))
+    
+    assert bars.open_bars[('SPY', '1m')].volume == 175
+
+
+def test_repeated_source_bar_volume_is_counted_once():
+    bars = BarAggregator(intervals=['1m', '5m'])
+    polls = [
+        # (poll time, source 1m bar, running volume of that bar)
+        (START + timedelta(seconds=20), START, 100),
+        (START + timedelta(seconds=40), START, 150),
+        (START + timedelta(seconds=50), START, 150),
+        (START + timedelta(seconds=70), START + timedelta(minutes=1), 40),
+        (START + timedelta(seconds=80), START, 160),  # stale report of the previous source bar
+        (START + timedelta(seconds=90), START + timedelta(minutes=1), 30),  # revised down
+        (START + timedelta(seconds=100), START + timedelta(minutes=1), 70)
+    ]
+    for timestamp, source, volume in polls:
+        bars.add_market_data(MarketData('SPY', timestamp, 100.0, volume=volume, bar_timestamp=source))
+    
+    assert bars.closed_bars[('SPY', '1m')][0].volume == 150
+    assert bars.open_bars[('SPY', '1m')].volume == 70
+    assert bars.open_bars[('SPY', '5m')].volume == 220
@@ -0,0 +1,56 @@
+"""
+Rolling correlation engine
+"""
+import numpy as np
+import pandas as pd
+
+from src.processing.correlation_engine import RollingCorrelationEngine
+
+SYMBOLS = ['USDKRW=X', 'EWY', '^VIX', 'TLT']
+
+
+def random_prices(rng, cycles: int, symbols: int) -> np.ndarray:
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (cycles, symbols)), axis=0))
+
+
+def test_rank_one_updates_match_corrcoef():
+    rng = np.random.default_rng(0)
+    prices = random_prices(rng, 200, len(SYMBOLS))
+    engine = RollingCorrelationEngine(SYMBOLS, window=30, recompute_interval=1000)
+    for row in prices:
+        engine.update_array(row)
+    
+    returns = np.log(prices[1:] / prices[:-1])[-30:]
+    assert np.allclose(engine.correlation(), np.corrcoef(returns.T), atol=1e-9)
+
+
+def test_regime_shift_ignores_symbols_without_data():
+    rng = np.random.default_rng(1)
+    prices = random_prices(rng, 400, 2)
+    
+    full = RollingCorrelationEngine(SYMBOLS[:2], window=30, baseline_halflife=50)
+    gapped = RollingCorrelationEngine(SYMBOLS, window=30, baseline_halflife=50)
+    for row in prices:
+        full.update_array(row)
+        # The other two symbols never trade
+        gapped.update_array(np.concatenate([row, [np.nan, np.nan]]))
+    
+    assert full.regime_shift > 0
+    assert np.isclose(gapped.regime_shift, full.regime_shift)
+
+
+def test_missing_prices_are_skipped_not_zero_returns():
+    rng = np.random.default_rng(2)
+    prices = random_prices(rng, 120, len(SYMBOLS))
+    # Symbols that have traded before go quiet for some cycles
+    prices[rng.random(prices.shape) < 0.2] = np.nan
+    prices[0] = 100.0
+    engine = RollingCorrelationEngine(SYMBOLS, window=40)
+    for row in prices:
+        engine.update_array(row)
+    
+    # A return spans the gap back to the last price, and only exists where a price does
+    frame = pd.DataFrame(prices, columns=SYMBOLS)
+    returns = np.log(frame / frame.ffill().shift(1)).iloc[-40:]
+    assert np.allclose(engine.correlation(), returns.corr().to_numpy(), atol=1e-9)
+    assert np.allclose(np.diag(engine.covariance()), returns.var().to_numpy(), atol=1e-12)
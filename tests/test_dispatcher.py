@@ -0,0 +1,101 @@
+"""
+Delivery deadline and shutdown of the alert dispatcher
+"""
+import threading
+import time
+
+from src.alerts.dispatcher import AlertDispatcher
+
+
+class HangingNotifier:
+    """Notifier ignoring its timeout until released"""
+    
+    def __init__(self):
+        self.release = threading.Event()
+    
+    def send(self, alert):
+        self.release.wait(5)
+        return True
+
+
+class SelectiveNotifier:
+    """Hangs past any deadline on the given alert ids, answers the rest at once"""
+    
+    def __init__(self, hanging):
+        self.hanging = set(hanging)
+        self.release = threading.Event()
+        self.sent = []
+    
+    def send(self, alert, timeout=None):
+        if alert['id'] in self.hanging:
+            self.release.wait(5)
+        self.sent.append(alert['id'])
+        return True
+
+
+class RecordingNotifier:
+    def __init__(self):
+        self.sent = []
+    
+    def send(self, alert, timeout=None):
+        self.sent.append(alert['id'])
+        return True
+
+
+def test_delivery_past_deadline_fails_and_frees_the_worker():
+    dispatcher = AlertDispatcher({'workers': 1, 'timeout_seconds': 0.05})
+    notifier = HangingNotifier()
+    dispatcher.register_channel('email', notifier)
+    results = []
+    dispatcher.subscribe(results.append)
+    
+    start = time.perf_counter()
+    assert dispatcher.dispatch({'id': 'a1'}, ['email']) == ['email']
+    assert dispatcher.flush(timeout=2)
+    assert time.perf_counter() - start < 1
+    
+    assert [(result.success, result.error) for result in results] == [(False, 'no response within 0.05s')]
+    metrics = dispatcher.get_metrics()['email']
+    assert metrics['timeouts'] == 1
+    assert metrics['errors'] == 1
+    assert metrics['pending'] == 0
+    
+    notifier.release.set()
+    dispatcher.shutdown()
+
+
+
+def test_hanging_call_does_not_time_out_the_next_delivery():
+    dispatcher = AlertDispatcher({'workers': 1, 'timeout_seconds': 0.2})
+    notifier = SelectiveNotifier(hanging=['slow'])
+    dispatcher.register_channel('email', notifier)
+    results = {}
+    dispatcher.subscribe(lambda result: results.update({result.alert_id: result}))
+    
+    dispatcher.dispatch({'id': 'slow'}, ['email'])
+    dispatcher.dispatch({'id': 'fast'}, ['email'])
+    assert dispatcher.flush(timeout=2)
+    
+    # The abandoned call still holds a sender thread, yet the next alert is
+    # sent at once and its deadline only starts with its own call
+    assert (results['slow'].success, results['slow'].error) == (False, 'no response within 0.2s')
+    assert results['fast'].success
+    assert notifier.sent == ['fast']
+    assert dispatcher.get_metrics()['email']['timeouts'] == 1
+    
+    notifier.release.set()
+    dispatcher.shutdown()
+
+def test_dispatch_after_shutdown_is_not_queued():
+    dispatcher = AlertDispatcher()
+    notifier = RecordingNotifier()
+    dispatcher.register_channel('slack', notifier)
+    
+    assert dispatcher.dispatch({'id': 'a1'}, ['slack']) == ['slack']
+    dispatcher.shutdown(wait=True)
+    assert notifier.sent == ['a1']
+    
+    assert dispatcher.dispatch({'id': 'a2'}, ['slack']) == []
+    assert dispatcher.get_metrics()['slack']['pending'] == 0
+    assert dispatcher.flush(timeout=1)
+    assert notifier.sent == ['a1']
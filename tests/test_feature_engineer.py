@@ -0,0 +1,62 @@
+"""
+Polars backend output equals the pandas backend
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.processing.feature_engineer import FeatureEngineer
+
+pytest.importorskip('polars')
+
+
+def price_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=rows, freq='D'),
+        'close': close,
+        'volume': rng.integers(1_000, 5_000, rows)
+    })
+
+
+def assert_same_features(actual: dict, expected: dict):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float) and math.isnan(value):
+            assert math.isnan(actual[key]), key
+        else:
+            assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+
+
+@pytest.mark.parametrize('rows', [5, 30, 300])
+def test_polars_features_match_pandas(rows):
+    data = price_frame(rows)
+    
+    expected = FeatureEngineer({'backend': 'pandas'}).create_features(data)
+    actual = FeatureEngineer({'backend': 'polars'}).create_features(data)
+    
+    assert_same_features(actual, expected)
+
+
+def test_polars_features_by_symbol_match_pandas():
+    frames = []
+    for seed, symbol in enumerate(['SPY', 'TLT', 'EWY']):
+        frame = price_frame(120 + 40 * seed, seed)
+        frame['symbol'] = symbol
+        frames.append(frame)
+    data = pd.concat(frames, ignore_index=True)
+    
+    expected = FeatureEngineer({'backend': 'pandas'}).create_features_by_symbol(data)
+    actual = FeatureEngineer({'backend': 'polars'}).create_features_by_symbol(data)
+    
+    assert actual.keys() == expected.keys()
+    for symbol in expected:
+        assert_same_features(actual[symbol], expected[symbol])
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        FeatureEngineer({'backend': 'spark'})
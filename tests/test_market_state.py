@@ -0,0 +1,130 @@
+"""
+Market state built from the processing config section
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_collection.collectors.base_collector import MarketData
+from src.processing.bar_aggregator import Bar
+from src.processing.market_state import MarketStateBuilder, build_state_builder
+
+PROCESSING = {
+    'market_state': {'interval': '1d'},
+    'correlation': {'window': 20, 'baseline_halflife': 40, 'regime_threshold': 0.25}
+}
+
+
+def test_correlation_features_in_state():
+    builder = build_state_builder(PROCESSING)
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 2)
+    
+    state = {}
+    for cycle in range(30):
+        timestamp = start + timedelta(minutes=cycle)
+        krw = 1300 * (1 + rng.normal(0, 0.01))
+        batch = [
+            MarketData('USDKRW=X', timestamp, krw),
+            MarketData('EWY', timestamp, 60 * 1300 / krw),
+            MarketData('^VIX', timestamp, 15 * (1 + rng.normal(0, 0.05)))
+        ]
+        state = builder(batch)
+    
+    assert builder.correlation_engine.window == 20
+    assert state['corr_usdkrw_ewy'] < -0.9
+    assert 'avg_correlation' in state and 'correlation_regime_change' in state
+
+
+def test_no_correlation_section_no_engine():
+    assert build_state_builder({}).correlation_engine is None
+
+
+def test_unavailable_keys_of_realtime_symbols():
+    builder = build_state_builder({})
+    symbols = ['^VIX', '^MOVE', 'USDKRW=X', 'USDJPY=X', 'DX-Y.NYB', 'GC=F', 'CL=F', 'EWY', 'TLT', 'SPY', 'DGS10']
+    
+    assert builder.unavailable_keys(symbols) == ['hyg_spread', 'ig_spread', 'korea_us_rate_diff']
+
+
+KEYS = [
+    {'key': 'change_3', 'kind': 'pct_change', 'symbol': 'XYZ', 'periods': 3},
+    {'key': 'diff_2', 'kind': 'diff', 'symbol': 'XYZ', 'periods': 2},
+    {'key': 'flow_3', 'kind': 'flow', 'symbol': 'XYZ', 'periods': 3},
+    {'key': 'volume_ratio_5', 'kind': 'volume_ratio', 'symbol': 'XYZ', 'periods': 5},
+    {'key': 'volatility_5', 'kind': 'volatility', 'symbol': 'XYZ', 'periods': 5}
+]
+
+
+def make_bar(i, close, volume):
+    return Bar('XYZ', '1m', datetime(2024, 1, 2, 9, 30) + timedelta(minutes=i), close, close, close, close, volume, 1)
+
+
+def pandas_reference(closes: pd.Series, volumes: pd.Series) -> dict:
+    """Derived keys of the newest closed bar computed over the whole bar series"""
+    sign = np.sign(closes.diff())
+    expected = {
+        'change_3': closes.pct_change(3).iloc[-1] * 100,
+        'diff_2': closes.diff(2).iloc[-1],
+        'flow_3': (closes * volumes * sign).tail(3).sum() if len(closes) > 3 else np.nan,
+        'volume_ratio_5': (volumes / volumes.shift(1).rolling(5).mean()).iloc[-1],
+        'volatility_5': (closes.pct_change() * 100).tail(5).std() if len(closes) > 5 else np.nan
+    }
+    return {key: float(value) for key, value in expected.items() if not np.isnan(value)}
+
+
+def test_derived_keys_match_pandas_over_closed_bars():
+    rng = np.random.default_rng(1)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 40)))
+    volumes = rng.integers(1_000, 10_000, 40).astype(float)
+    builder = MarketStateBuilder(derived_keys=KEYS, interval='1m', include_prices=False)
+    
+    for i, (close, volume) in enumerate(zip(closes, volumes)):
+        builder.on_bar(make_bar(i, close, volume))
+        expected = pandas_reference(pd.Series(closes[:i + 1]), pd.Series(volumes[:i + 1]))
+        
+        # Keys appear once their horizon has enough bars
+        assert set(builder.state) == set(expected)
+        for key, value in expected.items():
+            assert builder.state[key] == pytest.approx(value, rel=1e-9), (i, key)
+    
+    # Seeding from stored bars gives the same state
+    seeded = MarketStateBuilder(derived_keys=KEYS, interval='1m', include_prices=False)
+    seeded.seed(pd.DataFrame({'symbol': 'XYZ', 'close': closes, 'volume': volumes}))
+    assert seeded.state == pytest.approx(builder.state, rel=1e-12)
+
+
+def test_live_price_or_last_closed_bar():
+    builder = MarketStateBuilder(derived_keys=KEYS[:2], interval='1m', include_prices=False)
+    for i, close in enumerate([100.0, 102.0, 104.0, 106.0]):
+        builder.on_bar(make_bar(i, close, 1000))
+    
+    # No newer tick: the last closed bar is the current value
+    assert builder.state['change_3'] == pytest.approx((106 / 100 - 1) * 100)
+    assert builder.state['diff_2'] == pytest.approx(106 - 102)
+    
+    # A tick of the next bar is the newest value of the series
+    builder.on_tick('XYZ', 110.0)
+    assert builder.state['change_3'] == pytest.approx((110 / 102 - 1) * 100)
+    assert builder.state['diff_2'] == pytest.approx(110 - 104)
+    
+    # That bar closes at the live price: it is no longer counted twice
+    builder.on_bar(make_bar(4, 110.0, 1000))
+    assert builder.state['change_3'] == pytest.approx((110 / 102 - 1) * 100)
+    assert builder.state['diff_2'] == pytest.approx(110 - 104)
+    
+    # A tick of the following bar arrived before this bar's close: it stays live
+    builder.on_tick('XYZ', 120.0)
+    builder.on_bar(make_bar(5, 112.0, 1000))
+    assert builder.state['change_3'] == pytest.approx((120 / 106 - 1) * 100)
+    assert builder.state['diff_2'] == pytest.approx(120 - 110)
+    
+    # Window kinds never use the live price
+    windows = MarketStateBuilder(derived_keys=KEYS[2:3], interval='1m', include_prices=False)
+    for i, close in enumerate([100.0, 101.0, 100.0, 102.0]):
+        windows.on_bar(make_bar(i, close, 10))
+    flow = windows.state['flow_3']
+    windows.on_tick('XYZ', 50.0)
+    assert windows.state['flow_3'] == flow == pytest.approx(1010 - 1000 + 1020)
@@ -0,0 +1,100 @@
+"""
+Market structure tracker seeding, ticks and bar rolls
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.processing.bar_aggregator import BarAggregator
+from src.processing.feature_engineer import FeatureEngineer
+from src.processing.market_structure import MarketStructureTracker
+
+EQUITY = ['SPY', 'QQQ']
+SECTORS = ['XLF', 'XLE', 'XLK']
+
+
+def tracker(lookback: int = 5) -> MarketStructureTracker:
+    return MarketStructureTracker(EQUITY, SECTORS, lookback=lookback)
+
+
+def test_seed_counts_advancers_and_new_highs():
+    structure = tracker()
+    structure.seed(pd.DataFrame({
+        'SPY': [100, 101, 102, 105],  # above prior high
+        'QQQ': [100, 99, 98, 97],     # below prior low
+        'XLF': [50, 50, 50, 50],
+        'XLE': [40, 41, 40, 41],
+        'XLK': [60, 61, 62, 61]
+    }))
+    
+    snapshot = structure.snapshot()
+    assert (snapshot['advancers'], snapshot['decliners'], snapshot['unchanged']) == (2, 2, 1)
+    assert (snapshot['new_highs'], snapshot['new_lows']) == (1, 1)
+    assert snapshot['sector_dispersion'] > 0
+
+
+def test_partial_seed_clears_symbols_missing_from_panel():
+    structure = tracker()
+    structure.seed(pd.DataFrame({symbol: [100.0, 101.0] for symbol in EQUITY + SECTORS}))
+    assert structure.snapshot()['advancers'] == 5
+    
+    structure.seed(pd.DataFrame({'SPY': [100.0, 99.0], 'QQQ': [100.0, 99.0]}))
+    
+    snapshot = structure.snapshot()
+    assert (snapshot['advancers'], snapshot['decliners']) == (0, 2)
+    assert np.isnan(structure.last[structure.index['XLF']])
+
+
+def test_ticks_match_reseeding():
+    panel = pd.DataFrame({symbol: [100.0, 100.0, 100.0] for symbol in EQUITY + SECTORS})
+    structure = tracker()
+    structure.seed(panel)
+    
+    ticks = {'SPY': 103.0, 'QQQ': 97.0, 'XLF': 101.0, 'XLK': 99.5}
+    for symbol, price in ticks.items():
+        structure.update(symbol, price)
+    
+    expected = tracker()
+    expected.seed(pd.concat([panel.iloc[:-1], pd.DataFrame([{**panel.iloc[-1].to_dict(), **ticks}])], ignore_index=True))
+    assert structure.snapshot() == expected.snapshot()
+
+
+def test_roll_moves_reference_and_window():
+    structure = tracker(lookback=3)
+    structure.seed(pd.DataFrame({symbol: [100.0, 100.0] for symbol in EQUITY + SECTORS}))
+    structure.update('SPY', 110.0)
+    assert structure.snapshot()['new_highs'] == 1
+    
+    structure.roll()
+    assert structure.reference[structure.index['SPY']] == 110.0
+    assert structure.snapshot()['advancers'] == 0
+    
+    # 110 is now part of the prior window
+    structure.update('SPY', 105.0)
+    snapshot = structure.snapshot()
+    assert (snapshot['decliners'], snapshot['new_highs']) == (1, 0)
+
+
+def test_bar_close_rolls_tracker_built_from_config():
+    bars = BarAggregator(intervals=['1d'])
+    engineer = FeatureEngineer(
+        {'new_high_low_lookback': 5},
+        symbols={'etf_equity': EQUITY, 'etf_sectors': SECTORS, 'forex': ['USDKRW=X']},
+        bar_aggregator=bars
+    )
+    structure = engineer.market_structure
+    assert structure.symbols == EQUITY + SECTORS
+    
+    start = datetime(2024, 1, 2, 15, 0)
+    for day, prices in enumerate([{'SPY': 100.0, 'QQQ': 200.0}, {'SPY': 102.0, 'QQQ': 198.0}]):
+        for symbol, price in prices.items():
+            timestamp = start + timedelta(days=day)
+            bars.add_tick(symbol, price, timestamp=timestamp)
+            engineer.update_market_structure(symbol, price)
+    
+    # Day 2 ticks closed day 1 bars: day 1 closes are the reference
+    assert structure.reference[structure.index['SPY']] == 100.0
+    assert structure.reference[structure.index['QQQ']] == 200.0
+    snapshot = structure.snapshot()
+    assert (snapshot['advancers'], snapshot['decliners']) == (1, 1)
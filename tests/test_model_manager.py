@@ -0,0 +1,61 @@
+"""
+IsolationForestManager cold start and drift checks
+"""
+import numpy as np
+import pandas as pd
+
+from src.analysis.anomaly_detector import AnomalyDetector
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.standard_t(3, (rows, 3)), columns=['a', 'b', 'c'])
+    frame.insert(0, 'timestamp', pd.date_range('2024-01-01', periods=rows, freq='min'))
+    return frame
+
+
+def count_fits(manager) -> list:
+    requested = []
+    request_fit = manager.request_fit
+    
+    def tracked(*args, **kwargs):
+        scheduled = request_fit(*args, **kwargs)
+        if scheduled:
+            requested.append(kwargs.get('reason'))
+        return scheduled
+    
+    manager.request_fit = tracked
+    return requested
+
+
+def test_cold_start_fits_inline(tmp_path):
+    detector = AnomalyDetector({'model_dir': str(tmp_path), 'z_score_threshold': 99})
+    anomalies = detector.detect_anomalies(make_frame(300), stream_id='market')
+    assert any(anomaly.anomaly_type == 'ml' for anomaly in anomalies)
+
+
+def test_stationary_single_row_cycles_do_not_refit(tmp_path):
+    frame = make_frame(800)
+    detector = AnomalyDetector({'model_dir': str(tmp_path), 'z_score_threshold': 99})
+    manager = detector.model_manager
+    requested = count_fits(manager)
+    
+    for end in range(300, len(frame) + 1):
+        detector.detect_anomalies(frame.iloc[end - 300:end], stream_id='market')
+        manager.wait()
+    
+    assert requested == []
+
+
+def test_score_shift_triggers_refit(tmp_path):
+    frame = make_frame(800)
+    frame.loc[400:, ['a', 'b', 'c']] = frame.loc[400:, ['a', 'b', 'c']] * 2 + 1.5
+    detector = AnomalyDetector({'model_dir': str(tmp_path), 'z_score_threshold': 99})
+    manager = detector.model_manager
+    requested = count_fits(manager)
+    
+    for end in range(300, len(frame) + 1):
+        detector.detect_anomalies(frame.iloc[end - 300:end], stream_id='market')
+        manager.wait()
+    
+    assert any(reason.startswith('score drift') for reason in requested)
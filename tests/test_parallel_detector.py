@@ -0,0 +1,62 @@
+"""
+ParallelAnomalyDetector determinism
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.anomaly_detector import AnomalyAccumulator, AnomalyDetector
+from src.analysis.parallel_detector import ParallelAnomalyDetector
+
+GROUPS = ['g0', 'g1', 'g2', 'g3', 'g4', 'g5']
+CONFIG = {'max_anomalies': 200}
+
+
+def make_frames(seed: int, rows: int = 300) -> dict:
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range('2024-01-01', periods=rows, freq='h')
+    return {
+        group: pd.DataFrame({
+            'timestamp': timestamps,
+            'price': rng.standard_t(3, rows).cumsum() + 100,
+            'volume': rng.lognormal(10, 1, rows),
+            'spread': rng.standard_t(3, rows)
+        })
+        for group in GROUPS
+    }
+
+
+def key(anomalies) -> list:
+    return [(a.symbol, a.timestamp, a.anomaly_type, round(a.score, 9)) for a in anomalies]
+
+
+def run_parallel(batches) -> list:
+    with ParallelAnomalyDetector(CONFIG, max_workers=4) as detector:
+        return [key(detector.detect(frames)) for frames in batches]
+
+
+def run_serial(batches) -> list:
+    detectors = {group: AnomalyDetector(CONFIG) for group in GROUPS}
+    results = []
+    for frames in batches:
+        accumulator = AnomalyAccumulator(CONFIG['max_anomalies'])
+        for group, frame in frames.items():
+            accumulator.extend(detectors[group].detect_anomalies(frame, instrument=group))
+        results.append(key(accumulator.results()))
+    return results
+
+
+@pytest.fixture(scope='module')
+def batches():
+    return [make_frames(1), make_frames(2)]
+
+
+def test_identical_runs_return_identical_results(batches):
+    first = run_parallel(batches)
+    second = run_parallel(batches)
+    assert first == second
+    assert any(anomaly[2] == 'ml' for anomaly in first[1])
+
+
+def test_matches_serial_fit_once_detectors(batches):
+    assert run_parallel(batches) == run_serial(batches)
@@ -0,0 +1,97 @@
+"""
+KLL quantile sketch accuracy, merging, serialization and robust scores
+"""
+import numpy as np
+import pytest
+
+from src.processing.quantile_sketch import QuantileSketch
+
+K = 200
+# 1.7/k compaction error plus at most 1/k staleness of the sorted view
+RANK_TOLERANCE = 3.0 / K
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+
+def build(values, k=K, seed=0):
+    sketch = QuantileSketch(k=k, seed=seed)
+    for value in values:
+        sketch.update(value)
+    return sketch
+
+
+def max_rank_error(sketch, values):
+    exact = np.sort(values)
+    errors = []
+    for q in QUANTILES:
+        estimate = sketch.quantile(q)
+        true_rank = np.searchsorted(exact, estimate, side='right') / len(exact)
+        errors.append(abs(true_rank - q))
+        errors.append(abs(sketch.rank(np.quantile(exact, q)) - q))
+    return max(errors)
+
+
+def test_rank_error_within_bound():
+    values = np.random.default_rng(1).standard_t(3, size=50_000)
+    sketch = build(values)
+    
+    assert sketch.count == len(values)
+    assert max_rank_error(sketch, values) < RANK_TOLERANCE
+    # The sketch stays far smaller than the stream
+    assert sum(len(items) for items in sketch.compactors) < 20 * K
+
+
+def test_merge_matches_quantiles_of_union():
+    rng = np.random.default_rng(2)
+    left = rng.normal(0, 1, size=20_000)
+    right = rng.normal(3, 2, size=30_000)
+    
+    merged = build(left, seed=3)
+    merged.merge(build(right, seed=4))
+    
+    assert merged.count == len(left) + len(right)
+    assert max_rank_error(merged, np.concatenate([left, right])) < RANK_TOLERANCE
+
+
+def test_merge_rejects_different_k():
+    with pytest.raises(ValueError):
+        QuantileSketch(k=100).merge(QuantileSketch(k=200))
+
+
+def test_bytes_round_trip():
+    sketch = build(np.random.default_rng(5).exponential(size=10_000))
+    restored = QuantileSketch.from_bytes(sketch.to_bytes(), seed=0)
+    
+    assert restored.k == sketch.k
+    assert restored.count == sketch.count
+    assert restored.compactors == sketch.compactors
+    assert [restored.quantile(q) for q in QUANTILES] == [sketch.quantile(q) for q in QUANTILES]
+    
+    # A restored sketch keeps accepting values
+    restored.update(1.0)
+    assert restored.count == sketch.count + 1
+
+
+def test_empty_sketch():
+    sketch = QuantileSketch.from_bytes(QuantileSketch(k=50).to_bytes())
+    
+    assert sketch.count == 0
+    assert np.isnan(sketch.quantile(0.5))
+    assert sketch.rank(1.0) == 0.5
+
+
+def test_robust_scores():
+    values = np.random.default_rng(6).normal(10, 2, size=40_000)
+    sketch = build(values)
+    
+    scores = sketch.robust_scores(16.0)
+    
+    # Normal MAD is 0.6745 sigma; half the IQR equals it for symmetric data
+    assert scores['median'] == pytest.approx(10, abs=0.1)
+    assert scores['half_iqr'] == pytest.approx(0.6745 * 2, rel=0.05)
+    assert scores['robust_z'] == pytest.approx(3.0, rel=0.05)
+    assert scores['percentile_rank'] == pytest.approx(np.mean(values <= 16.0) * 100, abs=RANK_TOLERANCE * 100)
+    
+    # NaN values are ignored and a flat distribution scores zero
+    flat = build([5.0] * 100 + [float('nan')])
+    assert flat.count == 100
+    assert flat.robust_scores(7.0)['robust_z'] == 0.0
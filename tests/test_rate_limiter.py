@@ -0,0 +1,169 @@
+"""
+Sliding-window counters, limits, cooldown and summaries of the alert rate limiter
+"""
+from datetime import datetime, timedelta
+
+from src.alerts.rate_limiter import AlertRateLimiter, SlidingWindowCounter
+
+START = datetime(2024, 1, 2, 9, 0)
+
+
+class FakeClock:
+    """Clock advanced by the test"""
+    
+    def __init__(self, now=START):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+    
+    def advance(self, **kwargs):
+        self.now += timedelta(**kwargs)
+
+
+def make_limiter(clock, **rules):
+    return AlertRateLimiter({'cooldown_minutes': 0, 'max_alerts_per_hour': None, **rules}, clock=clock)
+
+
+def test_bucket_expires_at_window_edge():
+    counter = SlidingWindowCounter(3600, buckets=60)
+    counter.add(0)
+    counter.add(30)
+    counter.add(60)
+    
+    assert counter.count(59) == 3
+    # The first bucket [0, 60) leaves the window once a full hour later starts
+    assert counter.count(3599) == 3
+    assert counter.count(3600) == 1
+    assert counter.count(3660) == 0
+    
+    # A gap longer than the window clears every bucket at once
+    counter.add(4000, amount=5)
+    assert counter.count(4000 + 7200) == 0
+
+
+def test_out_of_order_time_counts_in_newest_bucket():
+    counter = SlidingWindowCounter(3600, buckets=60)
+    counter.add(600)
+    counter.add(100)
+    
+    assert counter.count(600) == 2
+    assert counter.count(600 + 3600) == 0
+
+
+def test_hourly_scenario_limit():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_alerts_per_hour=3)
+    
+    assert [limiter.allow('risk_off', 'WARNING') for _ in range(4)] == [True, True, True, False]
+    # Other scenarios have their own window
+    assert limiter.allow('volatility_spike', 'WARNING')
+    
+    clock.advance(minutes=59)
+    assert not limiter.allow('risk_off', 'WARNING')
+    clock.advance(minutes=1)
+    assert limiter.allow('risk_off', 'WARNING')
+    assert limiter.get_suppressed_counts() == {'scenario_limit': 2}
+
+
+def test_daily_scenario_limit():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_alerts_per_hour=2, max_alerts_per_day=5)
+    
+    allowed = []
+    for _ in range(4):
+        allowed.extend(limiter.allow('risk_off', 'WARNING') for _ in range(2))
+        clock.advance(hours=1)
+    
+    # Two per hour until the fifth of the day
+    assert allowed == [True, True, True, True, True, False, False, False]
+    assert limiter.get_suppressed_counts() == {'daily_limit': 3}
+    
+    clock.advance(hours=20)
+    assert limiter.allow('risk_off', 'WARNING')
+
+
+def test_severity_and_channel_limits():
+    clock = FakeClock()
+    limiter = make_limiter(clock, severity_limits={'critical': 2}, channel_limits={'sms': 1})
+    
+    assert [limiter.allow(f's{i}', 'CRITICAL') for i in range(3)] == [True, True, False]
+    assert limiter.allow('s3', 'WARNING')
+    
+    alert = {'scenario': 's0', 'severity': 'CRITICAL'}
+    assert limiter.allow_channels(alert, ['slack', 'sms']) == ['slack', 'sms']
+    assert limiter.allow_channels(alert, ['slack', 'sms']) == ['slack']
+
+
+def test_cooldown_suppresses_repeats_and_resets():
+    clock = FakeClock()
+    limiter = make_limiter(clock, cooldown_minutes=15)
+    
+    assert limiter.allow('risk_off', 'CRITICAL')
+    clock.advance(minutes=5)
+    assert not limiter.allow('risk_off', 'CRITICAL')
+    assert not limiter.allow('risk_off', 'WARNING')
+    
+    # Suppressed alerts do not extend the cooldown
+    clock.advance(minutes=10)
+    assert limiter.allow('risk_off', 'WARNING')
+    
+    # The allowed alert restarted the cooldown at its own severity
+    clock.advance(minutes=14)
+    assert not limiter.allow('risk_off', 'WARNING')
+    
+    limiter.reset()
+    assert limiter.allow('risk_off', 'WARNING')
+    assert limiter.get_suppressed_counts() == {}
+
+
+def test_escalation_and_exempt_severity_bypass_cooldown():
+    clock = FakeClock()
+    limiter = make_limiter(clock, cooldown_minutes=15)
+    
+    assert limiter.allow('risk_off', 'WARNING')
+    assert limiter.allow('risk_off', 'CRITICAL')
+    assert not limiter.allow('risk_off', 'WARNING')
+    assert limiter.allow('risk_off', 'EMERGENCY')
+    assert limiter.allow('risk_off', 'EMERGENCY')
+    assert not limiter.allow('risk_off', 'CRITICAL')
+
+
+def test_summary_counts_and_resets_each_period():
+    clock = FakeClock()
+    limiter = make_limiter(clock, cooldown_minutes=15, channel_limits={'email': 1}, summary_interval_minutes=60)
+    
+    assert limiter.pop_summary() is None  # starts the period
+    limiter.allow('risk_off', 'WARNING')
+    limiter.allow('risk_off', 'WARNING')
+    limiter.allow('risk_off', 'WARNING')
+    limiter.allow('carry_unwind', 'CRITICAL')
+    limiter.allow('carry_unwind', 'CRITICAL')
+    alert = {'scenario': 'carry_unwind', 'severity': 'CRITICAL'}
+    limiter.allow_channels(alert, ['email'])
+    limiter.allow_channels(alert, ['email'])
+    
+    clock.advance(minutes=30)
+    assert limiter.pop_summary() is None
+    
+    clock.advance(minutes=30)
+    summary = limiter.pop_summary()
+    assert summary['period_start'] == START
+    assert summary['period_end'] == START + timedelta(hours=1)
+    assert summary['suppressed'] == 4
+    assert summary['by_scenario'] == {'risk_off': 2, 'carry_unwind': 2}
+    assert summary['by_severity'] == {'WARNING': 2, 'CRITICAL': 2}
+    assert summary['by_channel'] == {'email': 1}
+    assert summary['by_reason'] == {'cooldown': 3, 'channel_limit': 1}
+    
+    # Counts restart with the next period; nothing suppressed means no summary
+    assert limiter.get_suppressed_counts() == {}
+    clock.advance(hours=1)
+    assert limiter.pop_summary() is None
+
+
+def test_disabled_limiter_allows_everything():
+    limiter = make_limiter(FakeClock(), enabled=False, max_alerts_per_hour=1)
+    
+    assert all(limiter.allow('risk_off', 'WARNING') for _ in range(5))
+    assert limiter.allow_channels({'scenario': 'risk_off', 'severity': 'WARNING'}, ['sms']) == ['sms']
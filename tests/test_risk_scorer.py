@@ -0,0 +1,90 @@
+"""
+Incremental risk scoring: recomputed components and risk-change events
+"""
+from collections import Counter
+
+import pytest
+
+from src.analysis.risk_scorer import RISK_COMPONENTS, IncrementalRiskScorer, RiskScorer
+
+
+def counting_scorer(**kwargs):
+    """IncrementalRiskScorer recording which components it recomputes"""
+    scorer = IncrementalRiskScorer(**kwargs)
+    calls = Counter()
+    score_component = scorer._score_component
+    
+    def counted(name, state):
+        calls[name] += 1
+        return score_component(name, state)
+    
+    scorer._score_component = counted
+    return scorer, calls
+
+
+def test_only_components_reading_a_changed_key_are_recomputed():
+    scorer, calls = counting_scorer()
+    reference = RiskScorer()
+    state = {'vix': 16, 'hyg_spread': 4.5, 'volume_ratio': 1.0}
+    
+    scorer.update(state)
+    assert calls == Counter({name: 1 for name in RISK_COMPONENTS})
+    
+    for key, value, component in [('vix', 32, 'market_volatility'), ('move_index', 160, 'liquidity_risk'), ('ig_spread', 2.5, 'credit_risk')]:
+        calls.clear()
+        state = {**state, key: value}
+        scorer.update(state)
+        
+        assert calls == Counter({component: 1})
+        expected = reference.calculate_risk_score(state)
+        assert scorer.current['components'] == expected['components']
+        assert scorer.current['total_risk_score'] == expected['total_risk_score']
+        assert scorer.current['risk_level'] == expected['risk_level']
+    
+    assert scorer.recomputed == len(RISK_COMPONENTS) + 3
+
+
+def test_update_returns_none_when_nothing_changed():
+    scorer, calls = counting_scorer()
+    events = []
+    scorer.subscribe(events.append)
+    state = {'vix': 16, 'spy_price': 470.0}
+    
+    first = scorer.update(state)
+    assert first['previous_score'] is None
+    calls.clear()
+    
+    # Same inputs, and a key no component reads
+    assert scorer.update(dict(state)) is None
+    assert scorer.update({**state, 'spy_price': 455.0}) is None
+    assert not calls
+    assert events == [first]
+
+
+def test_events_fire_only_when_level_or_score_moves():
+    scorer = IncrementalRiskScorer(min_change=5)
+    events = []
+    scorer.subscribe(events.append)
+    
+    assert scorer.update({'vix': 16})['total_risk_score'] == pytest.approx(21.25)
+    # Input changed but the component score did not
+    assert scorer.update({'vix': 17}) is None
+    # +5 points: not more than min_change
+    assert scorer.update({'vix': 17, 'volume_ratio': 0.6}) is None
+    
+    # Moves are measured from the last event, so small ones add up
+    event = scorer.update({'vix': 17, 'volume_ratio': 0.6, 'move_index': 130})
+    assert (event['previous_score'], event['total_risk_score']) == (pytest.approx(21.25), pytest.approx(30.0))
+    assert (event['previous_level'], event['risk_level']) == ('LOW', 'LOW')
+    assert event['changed_components'] == ['liquidity_risk']
+    
+    event = scorer.update({'vix': 45, 'volume_ratio': 0.6, 'move_index': 130})
+    assert (event['previous_level'], event['risk_level']) == ('LOW', 'MODERATE')
+    assert len(events) == 3
+    
+    # A level change is reported however small the move
+    scorer = IncrementalRiskScorer(min_change=100)
+    scorer.update({'vix': 16})
+    event = scorer.update({'vix': 12})
+    assert (event['previous_level'], event['risk_level']) == ('LOW', 'MINIMAL')
+    assert event['total_risk_score'] == pytest.approx(17.5)
@@ -0,0 +1,174 @@
+"""
+Compiled scenario rules against the original hand-written checks
+"""
+import numpy as np
+import pytest
+
+from src.analysis.rule_engine import DEFAULT_SCENARIOS, RuleEngine
+from src.analysis.signal_generator import Signal, SignalGenerator
+
+RULES = SignalGenerator().signal_rules
+
+
+def original_signals(state, rules=RULES) -> list:
+    """The _check_* methods SignalGenerator had before the rule engine, as (scenario, severity, confidence, triggers, metadata)"""
+    signals = []
+    
+    korea = rules['korea_outflow']
+    triggers = []
+    rate_diff = state.get('korea_us_rate_diff', 0)
+    if rate_diff < korea['rate_diff_threshold']:
+        triggers.append(f"한미 금리차 역전: {rate_diff:.2f}%p")
+    usdkrw_change = state.get('usdkrw_change_1d', 0)
+    if usdkrw_change > korea['usdkrw_change_threshold']:
+        triggers.append(f"원달러 급등: +{usdkrw_change:.2f}%")
+    ewy_flow = state.get('ewy_flow_3d', 0)
+    if ewy_flow < 0:
+        triggers.append(f"EWY ETF 순유출: {ewy_flow:,.0f}")
+    kospi_foreign = state.get('kospi_foreign_flow', 0)
+    if kospi_foreign < 0:
+        triggers.append(f"KOSPI 외국인 순매도: {kospi_foreign:,.0f}억원")
+    if len(triggers) >= 3:
+        signals.append(('korea_capital_outflow', 'critical' if len(triggers) == 4 else 'warning', min(len(triggers) / 4, 1.0),
+                        triggers, {'conditions_met': len(triggers), 'total_conditions': 4}))
+    
+    risk_off = rules['risk_off']
+    triggers = []
+    vix = state.get('vix', 0)
+    if vix > risk_off['vix_threshold']:
+        triggers.append(f"VIX 급등: {vix:.1f}")
+    tlt_flow = state.get('tlt_flow', 0)
+    if tlt_flow > 0:
+        triggers.append(f"TLT 대량 유입: +{tlt_flow:,.0f}")
+    hyg_spread = state.get('hyg_spread', 0)
+    if hyg_spread > risk_off['hyg_spread_threshold']:
+        triggers.append(f"하이일드 스프레드 확대: {hyg_spread:.2f}%p")
+    if state.get('gold_change', 0) > 1 and state.get('dxy_change', 0) > 0.5:
+        triggers.append("금 가격 상승 + 달러 강세 동시 발생")
+    if len(triggers) >= 3:
+        signals.append(('risk_off_transition', 'critical', min(len(triggers) / 4, 1.0), triggers, {'conditions_met': len(triggers)}))
+    
+    liquidity = rules['liquidity_crisis']
+    triggers = []
+    libor_ois = state.get('libor_ois_spread', 0)
+    if libor_ois > liquidity['libor_ois_threshold']:
+        triggers.append(f"LIBOR-OIS 스프레드 급등: {libor_ois:.2f}%p")
+    if state.get('repo_rate_spike', False):
+        triggers.append("레포 금리 스파이크 감지")
+    move_index = state.get('move_index', 0)
+    if move_index > liquidity['move_threshold']:
+        triggers.append(f"MOVE 지수 급등: {move_index:.1f}")
+    bond_issuance = state.get('corp_bond_issuance_change', 0)
+    if bond_issuance < -50:
+        triggers.append(f"회사채 발행 급감: {bond_issuance:.1f}%")
+    if len(triggers) >= 2:
+        signals.append(('liquidity_crisis', 'emergency', min(len(triggers) / 4, 1.0), triggers, {
+            'conditions_met': len(triggers),
+            'crisis_level': 'severe' if len(triggers) >= 3 else 'moderate'
+        }))
+    
+    vix_change = state.get('vix_change_1d', 0)
+    if vix_change > 20:
+        signals.append(('volatility_spike', 'warning', 0.8, [f"VIX 급등: +{vix_change:.1f}% (현재: {vix:.1f})"],
+                        {'vix': vix, 'vix_change': vix_change}))
+    
+    return signals
+
+
+def random_state(rng) -> dict:
+    """Values around every threshold; each key is missing now and then"""
+    candidates = {
+        'korea_us_rate_diff': rng.normal(-0.5, 0.5),
+        'usdkrw_change_1d': rng.normal(1.0, 1.0),
+        'ewy_flow_3d': rng.normal(0, 1e6),
+        'kospi_foreign_flow': rng.normal(0, 1e3),
+        'vix': rng.uniform(10, 50),
+        'tlt_flow': rng.normal(0, 1e6),
+        'hyg_spread': rng.uniform(3, 7),
+        'gold_change': rng.normal(1, 1),
+        'dxy_change': rng.normal(0.5, 0.5),
+        'libor_ois_spread': rng.uniform(0, 1),
+        'repo_rate_spike': bool(rng.random() < 0.3),
+        'move_index': rng.uniform(100, 200),
+        'corp_bond_issuance_change': rng.uniform(-100, 0),
+        'vix_change_1d': rng.normal(15, 15)
+    }
+    return {key: value for key, value in candidates.items() if rng.random() < 0.8}
+
+
+def as_tuples(signals) -> list:
+    return [(s.scenario, s.severity, s.confidence, s.triggers, s.metadata) for s in signals]
+
+
+def test_compiled_rules_match_original_checks():
+    rng = np.random.default_rng(0)
+    engine = RuleEngine(Signal, params=RULES)
+    
+    fired = set()
+    for _ in range(2000):
+        state = random_state(rng)
+        expected = original_signals(state)
+        assert as_tuples(engine.evaluate(state)) == expected
+        fired.update((signal[0], signal[1]) for signal in expected)
+    
+    # Every scenario and severity tier was exercised
+    assert fired == {
+        ('korea_capital_outflow', 'warning'), ('korea_capital_outflow', 'critical'),
+        ('risk_off_transition', 'critical'), ('liquidity_crisis', 'emergency'), ('volatility_spike', 'warning')
+    }
+
+
+def test_threshold_sections_from_config():
+    risk_off = {'vix_threshold': 20, 'hyg_spread_threshold': 4.0}
+    state = {'vix': 25, 'tlt_flow': 1.0, 'hyg_spread': 4.5}
+    
+    signals = SignalGenerator({'risk_off': risk_off}).generate_signals(state)
+    
+    assert [signal.scenario for signal in signals] == ['risk_off_transition']
+    assert as_tuples(signals) == original_signals(state, {**RULES, 'risk_off': risk_off})
+    assert SignalGenerator().generate_signals(state) == []
+
+
+def test_config_scenarios_add_override_and_remove():
+    config = {'scenarios': [
+        {
+            'scenario': 'spread_blowout',
+            'conditions': [
+                {'key': 'hyg_spread', 'op': '>=', 'threshold': 8, 'trigger': "HY {hyg_spread:.1f}"},
+                {'key': 'ig_spread', 'op': '>=', 'threshold': 2, 'trigger': "IG {ig_spread:.1f}"}
+            ],
+            'min_conditions': 1,
+            'severity': [[2, 'critical'], [1, 'warning']],
+            'metadata': {'hyg': {'key': 'hyg_spread'}, 'note': 'config'}
+        },
+        {
+            'scenario': 'volatility_spike',
+            'conditions': [{'key': 'vix_change_1d', 'op': '>', 'threshold': 50, 'trigger': "VIX +{vix_change_1d:.0f}%"}],
+            'severity': 'critical',
+            'confidence': 0.9
+        },
+        {'scenario': 'liquidity_crisis', 'enabled': False}
+    ]}
+    generator = SignalGenerator(config)
+    
+    names = [scenario.name for scenario in generator.rule_engine.scenarios]
+    assert names == ['korea_capital_outflow', 'risk_off_transition', 'volatility_spike', 'spread_blowout']
+    assert len(DEFAULT_SCENARIOS) == 4  # defaults are not modified
+    
+    # The override replaces the built-in rule in place
+    assert generator.generate_signals({'vix_change_1d': 30}) == []
+    spike = generator.generate_signals({'vix_change_1d': 60})
+    assert as_tuples(spike) == [('volatility_spike', 'critical', 0.9, ["VIX +60%"], {})]
+    
+    # The disabled scenario no longer fires
+    assert generator.generate_signals({'repo_rate_spike': True, 'move_index': 200}) == []
+    
+    blowout = generator.generate_signals({'hyg_spread': 9.0})
+    assert as_tuples(blowout) == [('spread_blowout', 'warning', 0.5, ["HY 9.0"], {'hyg': 9.0, 'note': 'config'})]
+    blowout = generator.generate_signals({'hyg_spread': 9.0, 'ig_spread': 2.5})
+    assert (blowout[0].severity, blowout[0].confidence) == ('critical', 1.0)
+
+
+def test_unknown_operator_is_rejected():
+    with pytest.raises(ValueError, match="Unknown operator"):
+        RuleEngine(Signal, scenarios=[{'scenario': 'bad', 'conditions': [{'key': 'vix', 'op': '~', 'threshold': 1}]}])
@@ -0,0 +1,152 @@
+"""
+Collected data flowing from DataScheduler through the configured pipeline
+"""
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+import yaml
+
+from src.data_collection.collectors.base_collector import MarketData
+from src.data_collection.scheduler import DataScheduler
+from src.processing.sharded_processor import ShardedStreamProcessor
+
+CONFIG = {
+    'data_collection': {
+        'symbols': {
+            'etf_equity': ['SPY'],
+            'etf_bonds': [],
+            'etf_sectors': [],
+            'etf_international': [],
+            'forex': [],
+            'volatility': ['^VIX']
+        },
+        'update_intervals': {'realtime': 60, 'daily': '16:30'}
+    },
+    'processing': {
+        'stream': {'window_size': 10},
+        'market_state': {'interval': '1d'},
+        'bars': {'intervals': ['1d'], 'max_bars': 10}
+    },
+    'pipeline': {
+        'stages': {
+            'process': {'queue_size': 3, 'overflow': 'block'},
+            'alerts': {'queue_size': 7}
+        }
+    },
+    'alerts': {
+        'channels': {'slack': {'enabled': True, 'min_severity': 'warning', 'timeout_seconds': 5}}
+    }
+}
+
+
+class FakeCollector:
+    """Returns one queued batch per collect call"""
+    
+    def __init__(self, batches):
+        self.batches = list(batches)
+    
+    async def collect(self, symbols):
+        return self.batches.pop(0)
+
+
+class FakeSlack:
+    def __init__(self):
+        self.sent = []
+    
+    def send(self, alert, timeout=None):
+        self.sent.append(alert)
+        return True
+
+
+def make_scheduler(tmp_path, shards=1):
+    config = {**CONFIG, 'processing': {**CONFIG['processing'], 'stream': {'window_size': 10, 'shards': shards}}}
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump(config))
+    return DataScheduler(str(config_path), str(tmp_path / 'missing_secrets.yaml'))
+
+
+def test_pipeline_built_from_config(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+    
+    stages = {stage.name: stage for stage in scheduler.pipeline.stages}
+    assert stages['process'].queue_size == 3
+    assert stages['process'].overflow == 'block'
+    assert stages['alerts'].queue_size == 7
+    assert stages['alerts'].overflow == 'drop_oldest'
+    assert [stage.name for stage in scheduler.pipeline.stages] == ['process', 'anomalies', 'analyze', 'alerts']
+    # Enabled channel without credentials is not registered
+    assert scheduler.alert_engine.notifiers == {}
+
+
+@pytest.mark.parametrize('shards', [1, 2])
+def test_collected_batch_reaches_notifier(tmp_path, shards):
+    scheduler = make_scheduler(tmp_path, shards)
+    slack = FakeSlack()
+    scheduler.alert_engine.register_notifier('slack', slack)
+    scheduler.collectors['yahoo'] = FakeCollector([
+        [MarketData('^VIX', datetime(2024, 1, 2, 15, 59), 20.0), MarketData('SPY', datetime(2024, 1, 2, 15, 59), 470.0)],
+        [MarketData('^VIX', datetime(2024, 1, 3, 15, 59), 45.0), MarketData('SPY', datetime(2024, 1, 3, 15, 59), 455.0)]
+    ])
+    
+    frames = []
+    detect = scheduler.anomaly_detector.detect_anomalies
+    
+    def recording_detect(frame, stream_id=None):
+        frames.append(frame)
+        return detect(frame, stream_id=stream_id)
+    
+    scheduler.anomaly_detector.detect_anomalies = recording_detect
+    
+    async def run():
+        await scheduler.start_pipeline()
+        await scheduler._collect_realtime_data()
+        await scheduler._collect_realtime_data()
+        await scheduler.pipeline.join()
+        assert scheduler.alert_engine.dispatcher.flush(timeout=5)
+        await scheduler.stop_pipeline()
+    
+    asyncio.run(run())
+    
+    assert 'volatility_spike' in {alert['scenario'] for alert in slack.sent}
+    assert isinstance(scheduler.stream_processor, ShardedStreamProcessor) == (shards > 1)
+    metrics = scheduler.pipeline.get_metrics()
+    assert metrics['alerts']['processed'] == 2
+    assert (metrics['anomalies']['processed'], metrics['anomalies']['errors']) == (2, 0)
+    # Only the second batch had closed daily bars to scan
+    assert len(frames) == 1
+    assert list(frames[0].columns) == ['timestamp', 'SPY', '^VIX']
+    assert frames[0][['SPY', '^VIX']].values.tolist() == [[470.0, 20.0]]
+
+
+def test_slow_processing_does_not_delay_collection(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+    scheduler.collectors['yahoo'] = FakeCollector([
+        [MarketData('SPY', datetime(2024, 1, 2, 15, 59), 470.0)],
+        [MarketData('SPY', datetime(2024, 1, 3, 15, 59), 455.0)]
+    ])
+    process_batch = scheduler.stream_processor.process_batch
+    
+    def slow_process_batch(ticks):
+        time.sleep(0.5)
+        return process_batch(ticks)
+    
+    scheduler.stream_processor.process_batch = slow_process_batch
+    
+    async def run():
+        await scheduler.start_pipeline()
+        start = time.monotonic()
+        await scheduler._collect_realtime_data()
+        # The first batch is being processed while the event loop keeps running
+        await asyncio.sleep(0.05)
+        await scheduler._collect_realtime_data()
+        collected = time.monotonic() - start
+        await scheduler.pipeline.join()
+        await scheduler.stop_pipeline()
+        return collected
+    
+    collected = asyncio.run(run())
+    
+    assert collected < 0.3
+    assert scheduler.pipeline.get_metrics()['process']['processed'] == 2
@@ -0,0 +1,102 @@
+"""
+Hash-sharded stream processing against the single-process processor
+"""
+import os
+import signal
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.processing.sharded_processor import ShardedStreamProcessor
+from src.processing.stream_processor import StreamProcessor
+
+SYMBOLS = ['SPY', 'QQQ', 'TLT', 'HYG', '^VIX', 'USDKRW=X', 'GC=F']
+
+
+def make_ticks(cycles=80, seed=0):
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 2, 9, 30)
+    ticks = []
+    for cycle in range(cycles):
+        timestamp = start + timedelta(minutes=cycle)
+        for symbol in SYMBOLS:
+            # Occasional jumps so some ticks are significant
+            jump = rng.choice([0, 0, 0, 0, 0, 0, 0, 0, 0, 5])
+            ticks.append((symbol, 100 + rng.normal() + jump, timestamp))
+    return ticks
+
+
+def signal_key(result):
+    return (result.symbol, result.timestamp, result.value, result.z_score, result.anomaly_score, result.signal_type)
+
+
+def test_sharded_results_match_single_process():
+    ticks = make_ticks()
+    expected = StreamProcessor(window_size=50).process_batch(ticks)
+    
+    with ShardedStreamProcessor(num_shards=3, window_size=50) as sharded:
+        results = []
+        for start in range(0, len(ticks), len(SYMBOLS) * 5):
+            results.extend(sharded.process_batch(ticks[start:start + len(SYMBOLS) * 5]))
+        statistics = sharded.get_statistics('SPY')
+    
+    assert expected
+    assert [signal_key(result) for result in results] == [signal_key(result) for result in expected]
+    assert statistics['count'] == 50
+
+
+def test_close_stops_every_shard():
+    sharded = ShardedStreamProcessor(num_shards=2, window_size=20)
+    processes = list(sharded._processes)
+    sharded.process_batch(make_ticks(cycles=5))
+    sharded.close()
+    
+    assert all(not process.is_alive() and process.exitcode == 0 for process in processes)
+
+
+def test_dead_shard_raises_and_close_is_clean():
+    sharded = ShardedStreamProcessor(num_shards=2, window_size=20)
+    processes = list(sharded._processes)
+    dead = sharded.shard_for('SPY')
+    os.kill(processes[dead].pid, signal.SIGKILL)
+    processes[dead].join(timeout=5)
+    
+    with pytest.raises(RuntimeError, match=f"stream-shard-{dead}"):
+        sharded.process_batch(make_ticks(cycles=2))
+    
+    # The healthy shard's reply was consumed, so it still answers in order
+    healthy_symbol = next(symbol for symbol in SYMBOLS if sharded.shard_for(symbol) != dead)
+    assert sharded.get_statistics(healthy_symbol)['count'] == 2
+    
+    sharded.close()
+    assert not any(process.is_alive() for process in processes)
+
+
+def test_untimestamped_ticks_use_injected_clock():
+    now = datetime(2024, 3, 1, 10, 0)
+    ticks = [('SPY', 100.0 + 0.1 * (i % 3)) for i in range(40)] + [('SPY', 150.0)]
+    
+    with ShardedStreamProcessor(num_shards=2, window_size=50, clock=lambda: now) as sharded:
+        results = sharded.process_batch(ticks)
+    
+    assert results
+    assert all(result.timestamp == now for result in results)
+
+
+def test_mixed_naive_and_aware_timestamps_merge_in_utc_order():
+    start = datetime(2024, 1, 2, 9, 30)
+    kst = timezone(timedelta(hours=9))
+    ticks = []
+    for i in range(40):
+        ticks.append(('SPY', 100.0 + 0.1 * (i % 3), start + timedelta(minutes=i)))
+        ticks.append(('EWY', 60.0 + 0.1 * (i % 3), (start + timedelta(minutes=i)).replace(tzinfo=timezone.utc).astimezone(kst)))
+    # EWY jumps a minute before SPY; its Seoul wall clock reads nine hours later
+    ticks.append(('EWY', 90.0, (start + timedelta(minutes=40)).replace(tzinfo=timezone.utc).astimezone(kst)))
+    ticks.append(('SPY', 150.0, start + timedelta(minutes=41)))
+    
+    with ShardedStreamProcessor(num_shards=2, window_size=50) as sharded:
+        assert sharded.shard_for('SPY') != sharded.shard_for('EWY')
+        results = sharded.process_batch(ticks)
+    
+    assert [result.symbol for result in results] == ['EWY', 'SPY']
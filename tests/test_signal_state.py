@@ -0,0 +1,69 @@
+"""
+Out-of-order cycles and severity transitions in stateful signal emission and risk scoring
+"""
+from datetime import datetime, timedelta
+
+from src.analysis.risk_scorer import IncrementalRiskScorer
+from src.analysis.signal_generator import Signal, SignalGenerator
+from src.analysis.signal_state import SignalStateStore
+
+START = datetime(2024, 1, 2, 9, 0)
+CALM = {'vix': 15, 'vix_change_1d': 0}
+SPIKE = {'vix': 45, 'vix_change_1d': 40}
+
+
+def test_stale_cycle_does_not_clear_active_scenario():
+    generator = SignalGenerator({'emission': 'changes', 'exit_cycles': 1})
+    
+    activated = generator.generate_signals(SPIKE, timestamp=START + timedelta(minutes=1))
+    assert 'volatility_spike' in {signal.scenario for signal in activated}
+    
+    # A calm cycle from before the spike finishing late must not clear it
+    assert generator.generate_signals(CALM, timestamp=START) == []
+    assert generator.state_store.stale_cycles == 1
+    assert generator.state_store.get_state('volatility_spike').active
+    
+    cleared = generator.generate_signals(CALM, timestamp=START + timedelta(minutes=2))
+    assert {signal.metadata['transition'] for signal in cleared} == {'cleared'}
+
+
+def test_stale_state_keeps_current_risk_score():
+    scorer = IncrementalRiskScorer()
+    
+    latest = scorer.calculate_risk_score(SPIKE, timestamp=START + timedelta(minutes=1))
+    stale = scorer.calculate_risk_score(CALM, timestamp=START)
+    
+    assert stale['total_risk_score'] == latest['total_risk_score']
+    assert scorer.stale_cycles == 1
+    assert scorer.update(SPIKE, timestamp=START + timedelta(minutes=2)) is None
+
+
+def make_signal(severity, minute):
+    return Signal(
+        scenario='volatility_spike',
+        severity=severity,
+        confidence=0.8,
+        triggers=['vix'],
+        recommendation='',
+        timestamp=START + timedelta(minutes=minute),
+        metadata={}
+    )
+
+
+def test_pending_deescalation_keeps_active_signal_consistent():
+    store = SignalStateStore(exit_cycles=3)
+    store.update([make_signal('critical', 0)], timestamp=START)
+    state = store.get_state('volatility_spike')
+    
+    # A lower severity is adopted only after exit_cycles cycles
+    for minute in (1, 2):
+        assert store.update([make_signal('warning', minute)], timestamp=START + timedelta(minutes=minute)) == []
+        assert state.severity == 'critical'
+        assert [signal.severity for signal in store.active_signals()] == ['critical']
+    
+    changed = store.update([make_signal('warning', 3)], timestamp=START + timedelta(minutes=3))
+    assert [(signal.severity, signal.metadata['transition'], signal.metadata['previous_severity']) for signal in changed] == [
+        ('warning', 'severity_changed', 'critical')
+    ]
+    assert state.severity == 'warning'
+    assert [signal.severity for signal in store.active_signals()] == ['warning']
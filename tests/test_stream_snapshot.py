@@ -0,0 +1,75 @@
+"""
+Warm restart of StreamProcessor from snapshots
+"""
+import time
+
+import numpy as np
+import pytest
+
+from src.processing.stream_processor import StreamProcessor
+
+
+def feed(processor: StreamProcessor, symbols=('SPY', 'EWY'), ticks: int = 60):
+    for i in range(ticks):
+        for offset, symbol in enumerate(symbols):
+            processor.process_tick(symbol, 100.0 + offset + (i % 7) * 0.5)
+
+
+def state(processor: StreamProcessor):
+    return (
+        {symbol: list(values) for symbol, values in processor.data_buffers.items()},
+        {symbol: sketch.count for symbol, sketch in processor.sketches.items()}
+    )
+
+
+def test_restart_after_idle_gap_without_close(tmp_path):
+    path = str(tmp_path / 'stream.snap')
+    processor = StreamProcessor(window_size=50, snapshot_path=path, snapshot_interval=0.05)
+    feed(processor)
+    expected = state(processor)
+    
+    # Feed goes idle; the timer writes the snapshot without further ticks
+    time.sleep(0.3)
+    
+    # Crash: the processor is never closed
+    restarted = StreamProcessor(window_size=50, snapshot_path=path, snapshot_interval=0.05)
+    try:
+        assert state(restarted) == expected
+    finally:
+        restarted.close()
+        processor.close()
+
+
+def test_close_writes_final_snapshot(tmp_path):
+    path = str(tmp_path / 'stream.snap')
+    processor = StreamProcessor(window_size=50, snapshot_path=path, snapshot_interval=3600)
+    feed(processor)
+    expected = state(processor)
+    processor.close()
+    assert not processor._timer
+    
+    restarted = StreamProcessor(window_size=50, snapshot_path=path, snapshot_interval=3600)
+    try:
+        assert state(restarted) == expected
+    finally:
+        restarted.close()
+
+
+def test_restore_with_new_window_size_rebuilds(tmp_path):
+    path = str(tmp_path / 'stream.snap')
+    processor = StreamProcessor(window_size=50, snapshot_path=path, snapshot_interval=3600)
+    feed(processor)
+    values = {symbol: list(buffer) for symbol, buffer in processor.data_buffers.items()}
+    processor.close()
+    
+    restarted = StreamProcessor(window_size=20, snapshot_path=path, snapshot_interval=3600)
+    try:
+        for symbol, buffer in restarted.data_buffers.items():
+            # The newest values fill the smaller window and statistics match them
+            assert buffer.maxlen == 20
+            assert list(buffer) == values[symbol][-20:]
+            assert restarted.stats_cache[symbol]['mean'] == pytest.approx(np.mean(values[symbol][-20:]))
+            assert restarted.stats_cache[symbol]['std'] == pytest.approx(np.std(values[symbol][-20:]))
+        assert restarted.get_sketch('SPY').count == 60
+    finally:
+        restarted.close()
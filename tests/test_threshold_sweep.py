@@ -0,0 +1,105 @@
+"""
+Threshold and weight sweeps against per-configuration evaluation
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.risk_scorer import RiskScorer
+from src.analysis.signal_generator import SignalGenerator
+from src.analysis.threshold_sweep import ThresholdSweep
+
+
+def make_states(rows: int = 500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    states = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-02 09:00', periods=rows, freq='min'),
+        'vix': 25 + 10 * np.sin(np.arange(rows) / 40) + rng.normal(0, 3, rows),
+        'vix_change_1d': rng.normal(5, 15, rows),
+        'vix_change_5d': rng.normal(5, 15, rows),
+        'tlt_flow': rng.normal(0, 1, rows),
+        'hyg_spread': rng.uniform(3, 8, rows),
+        'gold_change': rng.normal(1, 1, rows),
+        'dxy_change': rng.normal(0.5, 0.5, rows),
+        'volume_ratio': rng.uniform(0.5, 2.0, rows),
+        'move_index': rng.uniform(80, 180, rows),
+        'ig_spread': rng.uniform(0.5, 2.5, rows),
+        'usdjpy_change_1w': rng.normal(0, 3, rows),
+        'oil_volatility': rng.uniform(0, 10, rows)
+    })
+    states.loc[states.index[::13], 'vix'] = np.nan
+    return states
+
+
+def fired_and_alerts(fired: np.ndarray):
+    starts = fired & ~np.concatenate([[False], fired[:-1]])
+    return int(fired.sum()), int(starts.sum())
+
+
+def test_signal_sweep_matches_evaluate_frame():
+    states = make_states()
+    grid = {
+        'risk_off.vix_threshold': [20, 25, 30],
+        'risk_off.hyg_spread_threshold': [4.0, 6.0],
+        'volatility_spike.vix_change_threshold': [10, 20, 30]
+    }
+    
+    report = ThresholdSweep(SignalGenerator()).sweep_signals(states, grid)
+    
+    assert len(report) == 3 * 2 + 3
+    for _, point in report.iterrows():
+        section = 'risk_off' if point['scenario'] == 'risk_off_transition' else 'volatility_spike'
+        config = {
+            section: {
+                param.split('.')[1]: point[param]
+                for param in grid if param.startswith(section + '.')
+            }
+        }
+        fired_frame = SignalGenerator(config).rule_engine.evaluate_frame(states)
+        fired = states['timestamp'].isin(fired_frame.loc[fired_frame['scenario'] == point['scenario'], 'timestamp']).to_numpy()
+    
+        assert (point['fired_rows'], point['alerts']) == fired_and_alerts(fired)
+
+
+def test_requested_scenario_without_swept_params_uses_baseline():
+    states = make_states()
+    report = ThresholdSweep(SignalGenerator()).sweep_signals(
+        states,
+        {'risk_off.vix_threshold': [20, 30]},
+        scenarios=['risk_off_transition', 'volatility_spike']
+    )
+    
+    baseline = report[report['scenario'] == 'volatility_spike']
+    assert len(report) == 3
+    assert len(baseline) == 1
+    assert baseline['risk_off.vix_threshold'].isna().all()
+    
+    fired_frame = SignalGenerator().rule_engine.evaluate_frame(states)
+    fired = states['timestamp'].isin(fired_frame.loc[fired_frame['scenario'] == 'volatility_spike', 'timestamp']).to_numpy()
+    assert (baseline['fired_rows'].iloc[0], baseline['alerts'].iloc[0]) == fired_and_alerts(fired)
+
+
+def test_risk_weight_sweep_matches_calculate_risk_scores():
+    states = make_states(seed=1)
+    scorer = RiskScorer()
+    weights = {'market_volatility': [0.25, 0.4], 'credit_risk': [0.1, 0.2, 0.3]}
+    thresholds = [33.333, 41.111]
+    
+    report = ThresholdSweep(risk_scorer=scorer).sweep_risk_weights(states, weights, thresholds=thresholds)
+    
+    assert len(report) == 2 * 3 * 2
+    for _, point in report.iterrows():
+        config = {'weights': {name: point[f'w_{name}'] for name in scorer.weights}}
+        scores = RiskScorer(config).calculate_risk_scores(states)
+        fired = (scores['total_risk_score'] > point['threshold']).to_numpy()
+    
+        assert (point['fired_rows'], point['alerts']) == fired_and_alerts(fired)
+
+
+def test_sweeps_require_their_evaluator():
+    states = make_states(rows=10)
+    
+    with pytest.raises(ValueError, match='risk_scorer'):
+        ThresholdSweep(SignalGenerator()).sweep_risk_weights(states, {'credit_risk': [0.1]})
+    with pytest.raises(ValueError, match='signal_generator'):
+        ThresholdSweep(risk_scorer=RiskScorer()).sweep_signals(states, {'risk_off.vix_threshold': [20]})